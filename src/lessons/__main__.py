@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Permite ejecutar la carpeta directamente: python src/lessons <subcomando> ...
+(ver cli.py).
+"""
+
+from cli import main
+
+main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+audit_log.py
+Registro de auditoría de las decisiones del bot, con el tiempo de cada etapa.
+
+Cada decisión (una ejecución del bot, o una evaluación del servicio) se
+guarda como UNA línea JSON en un fichero que solo crece (append-only):
+
+{"ts": "...", "bot": "script5", "symbol": "AAPL", "signal": 1,
+ "order_id": "...", "stages_ms": {"fetch": 85.1, "signal": 0.7, ...},
+ "total_ms": 412.9, "error": null}
+
+Etapas típicas: fetch (FMP / almacén), signal (pandas), position, order
+y account (bróker). Así se ve de dónde viene una ejecución lenta.
+
+Uso en código:
+    rec = DecisionRecord("script5", symbol="AAPL")
+    with rec.stage("fetch"):
+        df = get_daily_close(...)
+    rec.set(signal=signal)
+    rec.write()
+
+Informe de percentiles entre ejecuciones:
+python src/lessons/audit_log.py
+python src/lessons/audit_log.py --bot portfolio --last 100
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / "data" / "store" / "audit.jsonl"
+AUDIT_LOG_PATH = Path(os.getenv("AUDIT_LOG_PATH", str(DEFAULT_PATH)))
+
+_write_lock = threading.Lock()
+
+
+class DecisionRecord:
+    """Una decisión del bot: tiempos por etapa + datos de la decisión."""
+
+    def __init__(self, bot: str, **fields):
+        self.bot = bot
+        self.fields = dict(fields)
+        self.stages = {}
+        self.error = None
+        self.start = time.perf_counter()
+        self.ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mide el bloque; si la etapa se repite, se acumula."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.error = f"{name}: {e}"
+            raise
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - t0) * 1000
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def to_dict(self) -> dict:
+        return {
+            "ts": self.ts,
+            "bot": self.bot,
+            **self.fields,
+            "stages_ms": {k: round(v, 3) for k, v in self.stages.items()},
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "error": self.error,
+        }
+
+    def write(self, path=None) -> dict:
+        """Añade el registro al final del fichero (una línea JSON)."""
+        record = self.to_dict()
+        write_record(record, path)
+        return record
+
+
+def write_record(record: dict, path=None):
+    path = Path(path or AUDIT_LOG_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _write_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+# -------------------------
+# Lectura e informe
+# -------------------------
+def read_records(path=None, bot: str = None, last: int = None) -> list:
+    """Registros del fichero (filtrados por bot; los `last` más recientes)."""
+    path = Path(path or AUDIT_LOG_PATH)
+    if not path.exists():
+        return []
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # línea cortada (p.ej. el proceso murió escribiendo)
+            if bot is None or rec.get("bot") == bot:
+                records.append(rec)
+    return records[-last:] if last else records
+
+
+def latency_report(records: list, percentiles=(0.5, 0.9, 0.99)) -> "pd.DataFrame":
+    """
+    Percentiles de duración (ms) por etapa y del total.
+    Filas: etapas; columnas: n, p50, p90, p99, max.
+    """
+    import pandas as pd  # solo para el informe; escribir registros no lo necesita
+
+    if not records:
+        return pd.DataFrame()
+    stages = pd.DataFrame([r.get("stages_ms", {}) for r in records])
+    stages["total"] = [r.get("total_ms") for r in records]
+
+    table = stages.quantile(list(percentiles)).T
+    table.columns = [f"p{int(round(q * 100))}" for q in percentiles]
+    table.insert(0, "n", stages.count())
+    table["max"] = stages.max()
+    return table.round(2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Percentiles de latencia del registro de auditoría.")
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--bot", default=None, help="script5 / portfolio / live / insights / alerts")
+    parser.add_argument("--last", type=int, default=None, help="solo los N registros más recientes")
+    args = parser.parse_args()
+
+    recs = read_records(args.path, args.bot, args.last)
+    if not recs:
+        print("No hay registros.")
+    else:
+        errors = sum(1 for r in recs if r.get("error"))
+        print(f"Registros: {len(recs)} (con error: {errors})\n")
+        print(latency_report(recs).to_string())
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+backtest.py
+Backtest vectorizado de la estrategia SMA crossover del bot.
+
+Reglas (las mismas que tradin_bot_script5.py):
+- Señal +1 y sin posición -> se compran QTY acciones.
+- Señal -1 y con posición -> se vende toda la posición.
+- Las órdenes se ejecutan al cierre de la vela de la señal.
+
+Todo se calcula con operaciones de pandas sobre la serie completa (o sobre un
+panel fechas x símbolos), sin bucles vela a vela en Python.
+
+Uso:
+python src/lessons/backtest.py AAPL --start 2015-01-01 --fast 20 --slow 50
+python src/lessons/backtest.py AAPL MSFT NVDA TSLA --start 2010-01-01
+"""
+
+import argparse
+import math
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from signals import crossover_from_smas, sma_crossover
+
+TRADING_DAYS = 252
+INITIAL_CASH = 10_000.0
+
+
+def positions_from_signals(signals, qty: int = 1):
+    """
+    Acciones en cartera al cierre de cada vela. Como los cruces alternan
+    (alcista, bajista, alcista...), la posición es "larga" si la última
+    señal distinta de 0 fue +1, y plana en otro caso.
+    """
+    state = signals.replace(0, np.nan).ffill()
+    return (state == 1).astype("int64") * qty
+
+
+def simulate(close, signals, qty: int = 1, initial_cash: float = INITIAL_CASH) -> dict:
+    """
+    Simula la cartera para una Series o un panel de cierres.
+    Devuelve dict con position, trades_qty, equity y returns (misma forma que close).
+    """
+    position = positions_from_signals(signals, qty)
+    trades_qty = position.diff().fillna(position).astype("int64")
+
+    price = close.ffill()
+    cash = initial_cash - (trades_qty * price).fillna(0).cumsum()
+    equity = cash + (position * price).fillna(0)
+    returns = equity.pct_change(fill_method=None).fillna(0)
+    return {"position": position, "trades_qty": trades_qty, "equity": equity, "returns": returns}
+
+
+def sharpe_ratio(returns):
+    """Sharpe anualizado (sin tipo libre de riesgo). 0 / NaN si no hay volatilidad."""
+    vol = returns.std()
+    if isinstance(vol, pd.Series):
+        vol = vol.replace(0, np.nan)
+    elif not vol:
+        return 0.0
+    return returns.mean() / vol * math.sqrt(TRADING_DAYS)
+
+
+def performance_stats(equity, returns, trades_qty) -> dict:
+    """Retorno total, drawdown máximo, Sharpe anualizado y nº de operaciones."""
+    return {
+        "total_return": equity.iloc[-1] / equity.iloc[0] - 1,
+        "max_drawdown": (equity / equity.cummax() - 1).min(),
+        "sharpe": sharpe_ratio(returns),
+        "trades": (trades_qty != 0).sum(),
+    }
+
+
+def run_backtest(df, fast: int, slow: int, qty: int = 1, initial_cash: float = INITIAL_CASH) -> dict:
+    """
+    Backtest de un símbolo.
+    df: DataFrame con columnas date y close (como get_daily_close) o Series de cierres.
+
+    Devuelve dict con:
+    - equity: curva de capital (Series)
+    - trades: DataFrame con date, side, qty, price
+    - stats: total_return, max_drawdown, sharpe, trades
+    """
+    close = df.set_index("date")["close"] if isinstance(df, pd.DataFrame) else df
+    close = close.astype(float)
+
+    signals = sma_crossover(close, fast, slow)
+    sim = simulate(close, signals, qty, initial_cash)
+
+    moves = sim["trades_qty"][sim["trades_qty"] != 0]
+    trades = pd.DataFrame({
+        "date": moves.index,
+        "side": np.where(moves.values > 0, "BUY", "SELL"),
+        "qty": moves.abs().values,
+        "price": close.loc[moves.index].values,
+    })
+
+    stats = performance_stats(sim["equity"], sim["returns"], sim["trades_qty"])
+    return {"equity": sim["equity"], "trades": trades, "stats": stats}
+
+
+def backtest_panel(prices: pd.DataFrame, fast: int, slow: int, qty: int = 1,
+                   initial_cash: float = INITIAL_CASH, sma_fast=None, sma_slow=None) -> pd.DataFrame:
+    """
+    Backtest de todos los símbolos de un panel (fechas x símbolos) a la vez.
+    sma_fast / sma_slow: medias ya calculadas (opcional, para reutilizarlas).
+    Devuelve una fila de estadísticas por símbolo.
+    """
+    if sma_fast is None:
+        sma_fast = prices.rolling(fast).mean()
+    if sma_slow is None:
+        sma_slow = prices.rolling(slow).mean()
+
+    signals = crossover_from_smas(sma_fast, sma_slow)
+    sim = simulate(prices, signals, qty, initial_cash)
+    return pd.DataFrame(performance_stats(sim["equity"], sim["returns"], sim["trades_qty"]))
+
+
+if __name__ == "__main__":
+    from ohlcv_store import get_bars
+    from profiling import start_profiling
+
+    start_profiling("backtest")
+
+    parser = argparse.ArgumentParser(description="Backtest SMA crossover (reglas del bot).")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--start", default="2015-01-01")
+    parser.add_argument("--end", default=str(date.today()))
+    parser.add_argument("--fast", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=50)
+    parser.add_argument("--qty", type=int, default=1)
+    args = parser.parse_args()
+
+    if len(args.symbols) == 1:
+        result = run_backtest(get_bars(args.symbols[0], args.start, args.end), args.fast, args.slow, args.qty)
+        print(result["trades"].tail(10))
+        for k, v in result["stats"].items():
+            print(f"{k}: {v:.4f}" if isinstance(v, float) else f"{k}: {v}")
+    else:
+        panel = pd.DataFrame({s: get_bars(s, args.start, args.end).set_index("date")["close"] for s in args.symbols})
+        print(backtest_panel(panel, args.fast, args.slow, args.qty).sort_values("sharpe", ascending=False))
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+bench_compact.py
+Modo compacto (compact.py) frente a precisión completa:
+- Memoria de las velas y de las métricas (script3 / script4 / panel).
+- Comprobación numérica: las métricas calculadas en modo compacto deben
+  coincidir con las de float64 dentro de la tolerancia. Si alguna se sale,
+  el script lo indica y termina con código 1.
+
+Datos sintéticos, sin API.
+
+Uso:
+python src/lessons/bench_compact.py
+python src/lessons/bench_compact.py --bars 5000 --symbols 2000
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+
+from compact import compact_frame, max_errors, memory_report
+from metrics_panel import basic_metrics, compute_panel_metrics
+from script3_visualizacion import add_financial_metrics
+from synthetic import synthetic_ohlcv, synthetic_panel
+
+
+def print_errors(name: str, errors: dict) -> bool:
+    ok = all(e[2] for e in errors.values())
+    print(f"\n{name}: {'OK' if ok else 'FUERA DE TOLERANCIA'}")
+    for col, (err, tol, good) in errors.items():
+        print(f"  {col:<16} error máx {err:.2e}  (tol {tol:.0e}) {'' if good else '<-- !'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=25 * 252, help="velas por símbolo")
+    parser.add_argument("--symbols", type=int, default=1000, help="símbolos del panel")
+    args = parser.parse_args()
+
+    ok = True
+    df = synthetic_ohlcv(args.bars).set_index("date")
+
+    # script3: velas + add_financial_metrics
+    full3 = add_financial_metrics(df, compact=False)
+    small3 = add_financial_metrics(compact_frame(df), compact=True)
+    ok &= print_errors("add_financial_metrics (script3)", max_errors(full3, small3))
+
+    # script4: velas con columna date + basic_metrics (el cálculo de add_basic_metrics)
+    df4 = df.reset_index()
+    full4 = basic_metrics(df4)
+    small4 = compact_frame(basic_metrics(compact_frame(df4)))
+    ok &= print_errors("add_basic_metrics (script4)", max_errors(full4, small4))
+
+    # Panel de muchos símbolos
+    prices = synthetic_panel(args.symbols, args.bars)
+    metrics = ["return", "sma_50", "volatility_20", "drawdown"]
+    full_panel = compute_panel_metrics(prices, metrics)
+    small_prices = compact_frame(prices)
+    small_panel = compute_panel_metrics(small_prices, metrics)
+    flat_full = pd.DataFrame({name: full_panel[name].to_numpy().ravel() for name in metrics})
+    flat_small = pd.DataFrame({name: small_panel[name].to_numpy().ravel() for name in metrics})
+    ok &= print_errors(f"compute_panel_metrics ({args.symbols} símbolos)", max_errors(flat_full, flat_small))
+
+    print("\nMemoria (precisión completa):")
+    print(memory_report({"script3": full3, "script4": full4, "panel": prices}).to_string(index=False))
+    print("\nMemoria (modo compacto):")
+    print(memory_report({"script3": small3, "script4": small4, "panel": small_prices}).to_string(index=False))
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
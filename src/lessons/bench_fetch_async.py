@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+bench_fetch_async.py
+Compara la descarga secuencial (un símbolo detrás de otro, como
+get_historical_df) con la descarga concurrente de fmp_async.
+
+Todo corre contra el servidor local fmp_stub_server (en otro proceso), así
+que no hace falta API key ni red. La latencia artificial simula el viaje de ida y vuelta a FMP.
+
+La ganancia depende de cuánto tiempo se pasa esperando a la red: con la
+configuración por defecto (100 símbolos, 50 ms) la descarga concurrente es
+varias veces más rápida, pero con pocos símbolos o latencias muy bajas el
+coste fijo (bucle asyncio, cliente y conexiones nuevas) se come la ventaja y
+puede salir igual o más lenta que el bucle secuencial.
+
+Uso:
+python src/lessons/bench_fetch_async.py
+python src/lessons/bench_fetch_async.py --symbols 500 --latency 0.08 --concurrency 32
+"""
+
+import argparse
+import time
+
+import fmp_client
+import rate_limit
+from fmp_async import fetch_historical_many
+from fmp_stub_server import start_stub_process
+
+
+def sequential_loop(symbols: list, start_date: str, end_date: str) -> dict:
+    """El bucle actual: una llamada síncrona por símbolo."""
+    out = {}
+    for symbol in symbols:
+        data = fmp_client.call_fmp(f"historical-price-full/{symbol}", {"from": start_date, "to": end_date})
+        out[symbol] = fmp_client.historical_to_df(data.get("historical", []))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="segundos por petición en el stub")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=float, default=1_000_000, help="límite del rate limiter (por defecto sin límite)")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fracción de respuestas 429 en el stub")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default="2024-12-31")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_process(latency=args.latency, throttle_rate=args.throttle, retry_after=0)
+    try:
+        rate_limit.limiter = rate_limit.RateLimiter(rpm=args.rpm, burst=args.concurrency)
+        fmp_client.BASE_URL = base_url
+        fmp_client.API_KEY = "stub"
+
+        symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+
+        t0 = time.perf_counter()
+        seq = sequential_loop(symbols, args.start, args.end)
+        t_seq = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        conc = fetch_historical_many(symbols, args.start, args.end, max_concurrency=args.concurrency)
+        t_conc = time.perf_counter() - t0
+    finally:
+        server.terminate()
+        server.wait()
+
+    same = all(seq[s].equals(conc[s]) for s in symbols)
+    ratio = t_seq / t_conc
+    verdict = f"x{ratio:.1f} más rápido" if ratio >= 1 else f"x{1 / ratio:.1f} más lento"
+    print(f"Símbolos: {args.symbols} | latencia stub: {args.latency * 1000:.0f} ms | concurrencia: {args.concurrency}")
+    print(f"Secuencial : {t_seq:8.2f} s")
+    print(f"Concurrente: {t_conc:8.2f} s  ({verdict})")
+    print(f"Mismos datos: {'sí' if same else 'NO'}")
+    print(f"Limitador: {rate_limit.limiter.status()}")
+    fmp_client.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+bench_hot_paths.py
+Benchmarks de los caminos calientes de las clases, con datos sintéticos
+(no usa la API ni toca data/ salvo para leer data/raw/*.csv).
+
+Casos (por número de velas):
+- json_to_df        bytes JSON de historical-price-full -> DataFrame
+                    (historical_json_to_df: lo que hacen get_historical_df y fmp_async)
+- financial_metrics add_financial_metrics (script3)
+- basic_metrics     basic_metrics (metrics_panel: el cálculo de add_basic_metrics de script4)
+- compute_signal    compute_signal (bot)
+- downsample        velas y medias reducidas al presupuesto del dashboard
+                    (downsample.py: lo que hace build_chart antes de dibujar)
+- csv_load          read_csv de un CSV OHLCV con fechas
+
+Casos (por número de símbolos, 1.000 velas cada uno):
+- panel_signals     señal de hoy para todos los símbolos (portfolio_bot)
+- panel_metrics     compute_panel_metrics (metrics_panel)
+
+Además: csv_load de cada data/raw/*.csv real.
+
+Cada caso se repite y se informa el mínimo y la mediana. Los resultados se
+pueden guardar (--save) y comparar con una ejecución anterior (--compare):
+lo que sea más lento que el umbral sale como REGRESIÓN y el script termina
+con código 1.
+
+Uso:
+python src/lessons/bench_hot_paths.py
+python src/lessons/bench_hot_paths.py --sizes 1k,100k,10M --symbols 10,100,1000,5000
+python src/lessons/bench_hot_paths.py --only csv_load,compute_signal --save data/bench/base.json
+python src/lessons/bench_hot_paths.py --compare data/bench/base.json --threshold 1.2
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from downsample import MAX_CHART_BARS, downsample_ohlcv, lttb_series
+from fmp_client import historical_json_to_df
+from metrics_panel import basic_metrics, compute_panel_metrics
+from portfolio_bot import evaluate_signals
+from script3_visualizacion import add_financial_metrics
+from synthetic import fmp_payload, synthetic_ohlcv, synthetic_panel
+from tradin_bot_script5 import compute_signal
+
+RAW_DIR = Path(__file__).resolve().parents[2] / "data" / "raw"
+
+# Límite de velas de los casos que no escalan a 10M (lista de dicts)
+MAX_BARS = {"json_to_df": 1_000_000}
+
+FAST, SLOW = 20, 50
+
+
+# -------------------------
+# Argumentos
+# -------------------------
+def parse_count(text: str) -> int:
+    """'1k' -> 1000, '10M' -> 10_000_000, '500' -> 500"""
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+# -------------------------
+# Medición
+# -------------------------
+def measure(fn, repeat: int, min_time: float) -> dict:
+    """Repite fn hasta `repeat` veces (menos si cada vuelta ya supera min_time)."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if sum(times) >= min_time and len(times) >= 2:
+            break
+    return {"min": min(times), "median": statistics.median(times), "runs": len(times)}
+
+
+def bar_cases(n_bars: int, tmp: Path, wanted) -> dict:
+    """
+    Casos por número de velas: {nombre: función sin argumentos}.
+    Solo se preparan los datos de los casos pedidos (un CSV de 10M velas tarda).
+    """
+    df = synthetic_ohlcv(n_bars)
+    cases = {}
+
+    if wanted("financial_metrics", n_bars):
+        indexed = df.set_index("date")
+        cases["financial_metrics"] = lambda: add_financial_metrics(indexed)
+    if wanted("basic_metrics", n_bars):
+        cases["basic_metrics"] = lambda: basic_metrics(df)
+    if wanted("compute_signal", n_bars):
+        closes = df[["date", "close"]]
+        cases["compute_signal"] = lambda: compute_signal(closes, FAST, SLOW)
+    if wanted("downsample", n_bars):
+        metrics = basic_metrics(df)
+
+        def downsample():
+            downsample_ohlcv(metrics, MAX_CHART_BARS)
+            for col in ("sma_20", "sma_50"):
+                lttb_series(metrics["date"], metrics[col], MAX_CHART_BARS)
+
+        cases["downsample"] = downsample
+    if wanted("csv_load", n_bars):
+        csv_path = tmp / f"bars_{n_bars}.csv"
+        df.to_csv(csv_path, index=False)
+        cases["csv_load"] = lambda: pd.read_csv(csv_path, parse_dates=["date"])
+    if wanted("json_to_df", n_bars):
+        payload = fmp_payload(df)
+        cases["json_to_df"] = lambda: historical_json_to_df(payload)
+    return cases
+
+
+def symbol_cases(n_symbols: int) -> dict:
+    prices = synthetic_panel(n_symbols)
+    return {
+        "panel_signals": lambda: evaluate_signals(prices, FAST, SLOW),
+        "panel_metrics": lambda: compute_panel_metrics(prices),
+    }
+
+
+def run(sizes: list, symbol_counts: list, only: set, repeat: int, min_time: float) -> list:
+    results = []
+
+    def record(case: str, size_label: str, fn):
+        r = measure(fn, repeat, min_time)
+        results.append({"case": case, "size": size_label, **r})
+        print(f"{case:<18} {size_label:>12}   min {r['min'] * 1000:10.2f} ms   "
+              f"mediana {r['median'] * 1000:10.2f} ms   ({r['runs']} vueltas)", flush=True)
+
+    def wanted(case: str, n_bars: int) -> bool:
+        return (not only or case in only) and n_bars <= MAX_BARS.get(case, n_bars)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            for case, fn in bar_cases(n, Path(tmp), wanted).items():
+                record(case, f"{n} velas", fn)
+
+    for n in symbol_counts:
+        for case, fn in symbol_cases(n).items():
+            if not only or case in only:
+                record(case, f"{n} símbolos", fn)
+
+    if not only or "csv_load" in only:
+        for path in sorted(RAW_DIR.glob("*.csv")):
+            record("csv_load", path.name, lambda p=path: pd.read_csv(p, parse_dates=["date"]))
+
+    return results
+
+
+def compare(results: list, baseline: list, threshold: float) -> list:
+    """Casos cuya mediana supera baseline * threshold."""
+    base = {(r["case"], r["size"]): r["median"] for r in baseline}
+    slower = []
+    for r in results:
+        old = base.get((r["case"], r["size"]))
+        if old and r["median"] > old * threshold:
+            slower.append({**r, "baseline": old, "ratio": r["median"] / old})
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k", help="velas por caso, p.ej. 1k,100k,10M")
+    parser.add_argument("--symbols", default="10,100,1000", help="símbolos por panel, p.ej. 10,1000,5000")
+    parser.add_argument("--only", default="", help="lista de casos a ejecutar")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=1.0, help="segundos por caso antes de dejar de repetir")
+    parser.add_argument("--save", default=None, help="guardar resultados en JSON")
+    parser.add_argument("--compare", default=None, help="JSON de una ejecución anterior")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio de mediana que cuenta como regresión")
+    args = parser.parse_args()
+
+    sizes = [parse_count(s) for s in args.sizes.split(",") if s]
+    symbol_counts = [parse_count(s) for s in args.symbols.split(",") if s]
+    only = {c.strip() for c in args.only.split(",") if c.strip()}
+
+    results = run(sizes, symbol_counts, only, args.repeat, args.min_time)
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResultados guardados en {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        slower = compare(results, baseline, args.threshold)
+        if not slower:
+            print(f"\nSin regresiones (umbral x{args.threshold}).")
+        else:
+            print(f"\nREGRESIONES (mediana > x{args.threshold} de la base):")
+            for r in slower:
+                print(f"  {r['case']:<18} {r['size']:>12}   {r['baseline'] * 1000:.2f} ms -> "
+                      f"{r['median'] * 1000:.2f} ms (x{r['ratio']:.2f})")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
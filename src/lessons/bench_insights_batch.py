@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+bench_insights_batch.py
+Insights por lotes (insights_batch.py) contra el servidor OpenAI falso
+(fake_openai_server.py): sin API key, sin coste y sin red. Los contextos
+son sintéticos (no se llama a FMP).
+
+Compara y comprueba:
+- En serie (generate_insights de insights_with_chatgpt.py, un símbolo
+  detrás de otro) vs. en paralelo con un cliente (pack=1) vs. varios
+  símbolos por prompt (pack=4): tiempo y peticiones.
+- Un único cliente de OpenAI en todo el proceso.
+- pack=4: ceil(N/4) peticiones y una sección por símbolo en la respuesta.
+- Límites: con RPM y TPM bajos, lo enviado nunca supera ráfaga + ritmo
+  por tiempo transcurrido.
+- Caché: 2ª ejecución sin peticiones.
+
+Si alguna comprobación falla, el script lo indica y termina con código 1.
+
+Uso:
+python src/lessons/bench_insights_batch.py
+python src/lessons/bench_insights_batch.py --symbols 40 --latency 1.0
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_openai_server import start_fake_openai
+
+
+def check(name: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'OK   ' if ok else 'FALLO'} {name}" + (f"  ({detail})" if detail else ""))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.5, help="segundos por respuesta del servidor falso")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_openai(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    tmp = tempfile.TemporaryDirectory()
+
+    import insights_batch
+    import insights_with_chatgpt
+    import llm_cache
+
+    llm_cache.ENABLED = False  # primero sin caché: medimos las peticiones reales
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    contexts = {
+        s: insights_with_chatgpt.build_context(
+            s, f"Price trend (last 60 days): uptrend, change: {i * 0.7:.2f}%",
+            f"Company: {s} Inc\nIndustry: Software\nP/E Ratio: {15 + i}", "Recent news: None",
+        )
+        for i, s in enumerate(symbols)
+    }
+    ok = True
+
+    def timed(fn):
+        hits, t0 = server.hits, time.perf_counter()
+        out = fn()
+        return out, time.perf_counter() - t0, server.hits - hits
+
+    _, t_serial, n_serial = timed(lambda: [insights_with_chatgpt.generate_insights(c) for c in contexts.values()])
+    one, t_one, n_one = timed(lambda: insights_batch.run_batch(contexts, pack=1, workers=8))
+    packed, t_packed, n_packed = timed(lambda: insights_batch.run_batch(contexts, pack=4, workers=8))
+
+    print(f"{'modo':<22}{'peticiones':>11}{'tiempo (s)':>12}")
+    for name, n, t in [("en serie", n_serial, t_serial), ("paralelo, pack=1", n_one, t_one),
+                       ("paralelo, pack=4", n_packed, t_packed)]:
+        print(f"{name:<22}{n:>11}{t:>12.2f}")
+    print()
+
+    ok &= check("pack=1: una petición por símbolo", n_one == len(symbols), f"{n_one}")
+    ok &= check("pack=1: más rápido que en serie", t_one < t_serial, f"x{t_serial / t_one:.1f}")
+    ok &= check("pack=1: sin errores", all("error" not in r for r in one.values()))
+    ok &= check("Un único cliente de OpenAI", insights_with_chatgpt.make_openai_client.cache_info().currsize == 1)
+    expected = math.ceil(len(symbols) / 4)
+    ok &= check("pack=4: ceil(N/4) peticiones", n_packed == expected, f"{n_packed} de {expected}")
+    ok &= check("pack=4: una sección por símbolo",
+                all(r.get("batch", 0) > 1 and r.get("insights") for r in packed.values()) or len(symbols) == 1)
+    ok &= check("pack=4: tokens repartidos", sum(r["completion_tokens"] for r in packed.values()) > 0)
+
+    sections = insights_batch.split_sections("### AAA\nuno\n### BBB\n\n### ZZZ\ntres", ["AAA", "BBB", "CCC"])
+    ok &= check("Secciones vacías o ausentes no se aceptan", sections == {"AAA": "uno"})
+
+    # Límites: ráfaga mínima para que se note el ritmo
+    insights_batch.BURST_SECONDS = 0.2
+    rpm, tpm = 300, 60_000
+    few = dict(list(contexts.items())[:10])
+    server.latency = 0.0
+    limited, t_limited, n_limited = timed(lambda: insights_batch.run_batch(few, pack=1, workers=10, rpm=rpm, tpm=tpm))
+    used = sum(r["prompt_tokens"] + r["completion_tokens"] for r in limited.values())
+    burst_req, burst_tok = max(1, int(rpm * 0.2 / 60)), max(1, int(tpm * 0.2 / 60))
+    ok &= check("RPM: peticiones <= ráfaga + ritmo * tiempo",
+                n_limited <= burst_req + t_limited * rpm / 60 + 1e-6, f"{n_limited} en {t_limited:.2f} s")
+    ok &= check("TPM: tokens <= ráfaga + ritmo * tiempo",
+                used <= burst_tok + t_limited * tpm / 60 + 1e-6, f"{used} tokens en {t_limited:.2f} s")
+    ok &= check("Límites: tiempo de espera medido", sum(r["wait_s"] for r in limited.values()) > 0)
+
+    # Caché: 2ª ejecución sin peticiones
+    llm_cache.ENABLED = True
+    llm_cache.CACHE_PATH = Path(tmp.name) / "llm_cache.sqlite"
+    insights_batch.BURST_SECONDS = 10
+    timed(lambda: insights_batch.run_batch(contexts, pack=1, workers=8))
+    again, t_again, n_again = timed(lambda: insights_batch.run_batch(contexts, pack=1, workers=8))
+    ok &= check("Caché: 2ª ejecución sin peticiones", n_again == 0 and all(r["cached"] for r in again.values()),
+                f"{n_again} peticiones, {t_again:.3f} s")
+
+    df = insights_batch.brief_frame(list(one.values()))
+    print("\nInforme (pack=1):")
+    print(df.drop(columns=["insights"]).head().to_string(index=False))
+
+    server.shutdown()
+    tmp.cleanup()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+bench_parquet_load.py
+Tiempo de carga: CSV (read_csv + fechas) frente a Parquet / Feather
+(parquet_store), leyendo todas las columnas o solo `close`.
+
+Genera datos sintéticos en una carpeta temporal, así que no toca data/.
+
+Uso:
+python src/lessons/bench_parquet_load.py
+python src/lessons/bench_parquet_load.py --symbols 500 --years 20
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import parquet_store
+
+
+def synthetic_ohlcv(n_bars: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.003, n_bars))
+    return pd.DataFrame({
+        "date": pd.bdate_range("2000-01-03", periods=n_bars),
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.005,
+        "low": np.minimum(open_, close) * 0.995,
+        "close": close,
+        "volume": rng.integers(1_000_000, 90_000_000, n_bars),
+    })
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    n_bars = args.years * 252
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        csv_dir = tmp / "csv"
+        csv_dir.mkdir()
+        for i, symbol in enumerate(symbols):
+            df = synthetic_ohlcv(n_bars, seed=i)
+            df.to_csv(csv_dir / f"{symbol}_ohlcv.csv", index=False)
+            for fmt in ("parquet", "feather"):
+                parquet_store.write_bars(df, symbol, fmt=fmt, base_dir=tmp / fmt)
+
+        def load_csv(columns=None):
+            for symbol in symbols:
+                pd.read_csv(csv_dir / f"{symbol}_ohlcv.csv", usecols=columns, parse_dates=["date"])
+
+        def load_store(fmt, columns=None):
+            for symbol in symbols:
+                parquet_store.read_bars(symbol, columns=columns, fmt=fmt, base_dir=tmp / fmt)
+
+        results = {
+            "CSV (todas)": timed(load_csv),
+            "CSV (close)": timed(lambda: load_csv(["date", "close"])),
+            "Parquet (todas)": timed(lambda: load_store("parquet")),
+            "Parquet (close)": timed(lambda: load_store("parquet", ["close"])),
+            "Feather (todas)": timed(lambda: load_store("feather")),
+            "Feather (close)": timed(lambda: load_store("feather", ["close"])),
+        }
+
+    print(f"{args.symbols} símbolos x {n_bars} velas")
+    base = results["CSV (todas)"]
+    for name, secs in results.items():
+        print(f"{name:<18} {secs:8.3f} s  (x{base / secs:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+bench_startup.py
+Tiempo de arranque en frío de cada script: lo que paga cada ejecución
+(p.ej. cada vez que cron lanza el bot) antes de empezar a trabajar.
+
+Para cada script:
+- Se importa el módulo en un proceso Python nuevo varias veces y se mide
+  el tiempo total del proceso (mediana).
+- Una ejecución con `python -X importtime` dice qué paquetes pesan más
+  (suma del tiempo propio de todos sus submódulos).
+
+Los scripts solo se importan: no se ejecuta su bloque __main__, así que
+no se llama a ninguna API.
+
+Uso:
+python src/lessons/bench_startup.py
+python src/lessons/bench_startup.py --runs 10 --top 8
+python src/lessons/bench_startup.py tradin_bot_script5 portfolio_bot --save data/bench/startup.json
+python src/lessons/bench_startup.py --compare data/bench/startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+LESSONS_DIR = Path(__file__).resolve().parent
+
+ENTRY_POINTS = [
+    "script_clase1",
+    "script_clase_2_df",
+    "script3_visualizacion",
+    "script4_dashboard",
+    "tradin_bot_script5",
+    "portfolio_bot",
+    "live_trader",
+    "backtest",
+    "param_sweep",
+    "insights_with_chatgpt",
+    "telegram_alerts",
+    "test_open_ai_apikey",
+    "cli",
+]
+
+
+def run_import(module: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", f"import {module}"]
+    env = dict(os.environ, PYTHONPATH=str(LESSONS_DIR))
+    return subprocess.run(cmd, cwd=LESSONS_DIR, env=env, capture_output=True, text=True)
+
+
+def cold_start(module: str, runs: int) -> float:
+    """Mediana (s) de procesos completos `python -c "import module"`."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        r = run_import(module)
+        times.append(time.perf_counter() - t0)
+        if r.returncode != 0:
+            raise RuntimeError(f"{module}: {r.stderr.strip().splitlines()[-1] if r.stderr else 'error'}")
+    return statistics.median(times)
+
+
+def heaviest_imports(module: str, top: int) -> list:
+    """
+    [(paquete, ms)] de los paquetes que más tardan en importarse, sumando el
+    tiempo propio (self) de todos sus submódulos en la salida de -X importtime.
+    """
+    r = run_import(module, importtime=True)
+    packages = {}
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        root = name.strip().split(".")[0]
+        packages[root] = packages.get(root, 0) + int(self_us) / 1000
+    return sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="paquetes más pesados a mostrar")
+    parser.add_argument("--save", default=None, help="guardar resultados en JSON")
+    parser.add_argument("--compare", default=None, help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else {}
+    base_ms = cold_start("sys", args.runs) * 1000
+    print(f"Intérprete vacío: {base_ms:.0f} ms\n")
+
+    results = {}
+    for module in args.modules:
+        try:
+            ms = cold_start(module, args.runs) * 1000
+        except RuntimeError as e:
+            print(f"{module:<24} ERROR: {e}")
+            continue
+        results[module] = ms
+        line = f"{module:<24} {ms:8.0f} ms"
+        if module in baseline:
+            line += f"   (antes {baseline[module]:.0f} ms, x{baseline[module] / ms:.2f})"
+        print(line)
+        heavy = ", ".join(f"{name} {t:.0f}" for name, t in heaviest_imports(module, args.top))
+        print(f"{'':<24} más pesados (ms): {heavy}")
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResultados guardados en {path}")
+
+
+if __name__ == "__main__":
+    main()
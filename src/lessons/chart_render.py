@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+chart_render.py
+Render por lotes de los gráficos de script3_visualizacion.py a ficheros
+PNG/SVG, sin pantalla (backend Agg), para informes desatendidos.
+
+- Cada combinación símbolo x tipo de gráfico se guarda en
+  <out>/<SYMBOL>_<chart>.<png|svg>.
+- Los símbolos se reparten entre procesos (ProcessPoolExecutor).
+- Cada proceso crea UNA figura (con sus ejes) por tipo de gráfico y la
+  reutiliza para todos sus símbolos: se limpian los ejes y se vuelve a
+  dibujar. Crear figuras nuevas es caro y, con pyplot, se acumulan en memoria
+  si no se cierran.
+- Un error en un símbolo no para el lote: queda en la columna error.
+
+Uso:
+python src/lessons/chart_render.py AAPL MSFT NVDA --start 2024-01-01 --out data/charts
+python src/lessons/chart_render.py AAPL --charts candles,drawdown --format svg
+python src/lessons/chart_render.py --synthetic 200 --workers 4     # benchmark sin API
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from script3_visualizacion import (
+    CANDLE_AXES,
+    LINE_CHARTS,
+    add_financial_metrics,
+    candle_style,
+    draw_candles,
+    draw_line_chart,
+)
+
+CHARTS = ["candles"] + list(LINE_CHARTS)
+FORMATS = ["png", "svg"]
+DEFAULT_DPI = 100
+ROOT = Path(__file__).resolve().parents[2]
+CHARTS_DIR = Path(os.getenv("CHARTS_DIR", ROOT / "data" / "charts"))
+
+# Por proceso: {chart: (figura, ejes)} y el estilo de mplfinance
+_figures = {}
+_style = None
+
+
+# -------------------------
+# Figuras reutilizables (una por tipo de gráfico y proceso)
+# -------------------------
+def use_headless():
+    """Backend Agg: dibuja en memoria, sin ventana. Inicializador de cada proceso."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def get_figure(chart: str):
+    """
+    Figura y ejes del tipo de gráfico, vacíos y listos para dibujar.
+    Se crean la primera vez; después se reutilizan limpiando los ejes.
+    Se usa Figure directamente (no pyplot): no queda registrada en ningún
+    gestor global, así que no hay que cerrarla.
+    """
+    if chart not in _figures:
+        from matplotlib.figure import Figure
+
+        if chart == "candles":
+            fig = Figure(figsize=(12, 6))
+            ax = fig.add_axes(CANDLE_AXES[0])
+            ax_volume = fig.add_axes(CANDLE_AXES[1], sharex=ax)
+            axes = (ax, ax_volume)
+        else:
+            fig = Figure(figsize=(12, 4))
+            fig.subplots_adjust(left=0.08, right=0.97, bottom=0.14, top=0.9)
+            axes = (fig.add_subplot(),)
+        _figures[chart] = (fig, axes)
+
+    fig, axes = _figures[chart]
+    for ax in axes:
+        ax.clear()
+    return fig, axes
+
+
+def render_chart(df: pd.DataFrame, symbol: str, chart: str, path: Path, dpi: int = DEFAULT_DPI) -> Path:
+    """Dibuja un gráfico en su figura reutilizable y lo guarda (formato según la extensión)."""
+    global _style
+
+    fig, axes = get_figure(chart)
+    if chart == "candles":
+        _style = _style or candle_style()
+        draw_candles(axes[0], axes[1], df, symbol, _style)
+    else:
+        draw_line_chart(axes[0], df, symbol, chart)
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def render_symbol(symbol: str, df: pd.DataFrame, charts: list, out_dir, fmt: str = "png",
+                  dpi: int = DEFAULT_DPI) -> list:
+    """
+    Todos los gráficos pedidos de un símbolo (las métricas se calculan una vez).
+    Devuelve una fila por gráfico: symbol, chart, path, ms, error.
+    """
+    rows = []
+    try:
+        if "date" in df.columns:
+            df = df.set_index("date")
+        df = add_financial_metrics(df.sort_index(), compact=False)
+    except Exception as e:
+        return [{"symbol": symbol, "chart": c, "path": None, "ms": 0.0, "error": str(e)} for c in charts]
+
+    for chart in charts:
+        path = Path(out_dir) / f"{symbol}_{chart}.{fmt}"
+        t0 = time.perf_counter()
+        try:
+            render_chart(df, symbol, chart, path, dpi)
+            error = None
+        except Exception as e:
+            path, error = None, str(e)
+        rows.append({"symbol": symbol, "chart": chart, "path": path and str(path),
+                     "ms": (time.perf_counter() - t0) * 1000, "error": error})
+    return rows
+
+
+def render_batch(frames: dict, charts: list = None, out_dir=CHARTS_DIR, fmt: str = "png",
+                 workers: int = None, dpi: int = DEFAULT_DPI) -> pd.DataFrame:
+    """
+    Renderiza {symbol: velas} x charts en un pool de procesos.
+    Devuelve una fila por gráfico (ver render_symbol).
+    """
+    charts = charts or CHARTS
+    unknown = [c for c in charts if c not in CHARTS]
+    if unknown:
+        raise ValueError(f"Gráficos desconocidos: {unknown} (opciones: {','.join(CHARTS)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt} (opciones: {','.join(FORMATS)})")
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(frames) == 1:
+        use_headless()
+        results = [render_symbol(s, df, charts, out_dir, fmt, dpi) for s, df in frames.items()]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_headless) as pool:
+            futures = [pool.submit(render_symbol, s, df, charts, out_dir, fmt, dpi) for s, df in frames.items()]
+            results = [f.result() for f in futures]
+
+    return pd.DataFrame([row for rows in results for row in rows],
+                        columns=["symbol", "chart", "path", "ms", "error"])
+
+
+def print_summary(results: pd.DataFrame, elapsed: float):
+    ok = results[results["error"].isna()]
+    print(f"{len(ok)}/{len(results)} gráficos en {elapsed:.1f} s ({len(ok) / elapsed:.1f} gráficos/s)")
+    if not ok.empty:
+        print("\nms por gráfico (dentro de cada proceso):")
+        print(ok.groupby("chart")["ms"].describe(percentiles=[0.5, 0.9])[["count", "50%", "90%", "max"]].round(1).to_string())
+    errors = results[results["error"].notna()]
+    for row in errors.head(10).itertuples():
+        print(f"ERROR {row.symbol} {row.chart}: {row.error}")
+
+
+if __name__ == "__main__":
+    from profiling import start_profiling
+
+    start_profiling("chart_render")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default=str(date.today()))
+    parser.add_argument("--charts", default=",".join(CHARTS))
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--out", default=str(CHARTS_DIR))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--synthetic", type=int, default=0, help="N símbolos sintéticos (sin API)")
+    parser.add_argument("--bars", type=int, default=252, help="velas por símbolo sintético")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from synthetic import synthetic_ohlcv
+
+        frames = {f"SYN{i:04d}": synthetic_ohlcv(args.bars, seed=i) for i in range(args.synthetic)}
+    else:
+        from cli import load_frames, parse_symbols
+
+        frames = load_frames(parse_symbols(args.symbols), args.start, args.end, workers=8)
+
+    t0 = time.perf_counter()
+    res = render_batch(frames, args.charts.split(","), args.out, args.format, args.workers, args.dpi)
+    print_summary(res, time.perf_counter() - t0)
+    print(f"\nFicheros en {args.out}")
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+cli.py
+Punto de entrada único con subcomandos, en lugar de lanzar un script por
+lección y por símbolo (con SYMBOL / START / END fijos en cada __main__).
+
+Todos los símbolos se procesan en UN proceso: la sesión HTTP de fmp_client,
+el almacén local de velas y los clientes (bróker, OpenAI) se crean una vez y
+se reutilizan. Cada subcomando importa solo lo que necesita.
+
+Subcomandos:
+  fetch      velas OHLCV (almacén local + FMP solo lo que falta)
+  metrics    métricas del panel (retorno, SMA, volatilidad, drawdown) o KPIs
+  plot       gráficos de script3_visualizacion por símbolo
+  backtest   backtest SMA crossover de cada símbolo
+  bot        una pasada del bot de cartera (o el servicio con --live)
+  insights   insights con ChatGPT por símbolo
+  alert      insights + Excel + alerta de Telegram por símbolo
+  brief      insights de muchos símbolos a la vez (insights_batch.py)
+
+Uso:
+python src/lessons fetch AAPL MSFT NVDA --start 2020-01-01 --format csv --out data/bars.csv
+python src/lessons fetch AAPL,MSFT --format parquet          # a data/parquet (parquet_store)
+python src/lessons fetch AAPL --refresh                      # descargar de nuevo (splits, ajustes)
+python src/lessons metrics AAPL MSFT --kpis
+python src/lessons metrics AAPL MSFT --metrics return,sma_50 --format json --out m.json
+python src/lessons plot AAPL --start 2024-01-01 --end 2024-03-31 --charts candles,drawdown
+python src/lessons plot AAPL MSFT NVDA --out data/charts --format svg --workers 4
+python src/lessons backtest AAPL MSFT NVDA TSLA --start 2015-01-01 --fast 20 --slow 50
+python src/lessons bot --fake
+python src/lessons bot AAPL --live --fake
+python src/lessons bot AAPL --live --fast 10 --slow 30 --qty 5
+python src/lessons insights AAPL MSFT
+python src/lessons alert AAPL
+python src/lessons brief AAPL MSFT NVDA TSLA --pack 4 --format csv --out brief.csv
+
+(`python src/lessons ...` ejecuta __main__.py de la carpeta, que llama a main()).
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+DEFAULT_START = "2024-01-01"
+DEFAULT_WORKERS = 8
+FORMATS = ["table", "csv", "json", "parquet"]
+CHARTS = ["candles", "returns", "volatility", "drawdown"]
+
+
+# -------------------------
+# Utilidades comunes
+# -------------------------
+def parse_symbols(values: list) -> list:
+    """['AAPL,MSFT', 'nvda'] -> ['AAPL', 'MSFT', 'NVDA'] (sin duplicados, en orden)."""
+    symbols = []
+    for value in values:
+        for s in value.split(","):
+            s = s.strip().upper()
+            if s and s not in symbols:
+                symbols.append(s)
+    return symbols
+
+
+def write_output(df, fmt: str = "table", out: str = None):
+    """Escribe df en el formato pedido: a la salida estándar o al fichero out."""
+    if fmt == "parquet" and not out:
+        raise SystemExit("--format parquet necesita --out (o usar `fetch`, que escribe en parquet_store).")
+    if fmt == "table":
+        text = df.to_string()
+    elif fmt == "csv":
+        text = df.to_csv(index=False)
+    elif fmt == "json":
+        text = df.to_json(orient="records", date_format="iso", indent=2)
+    else:
+        text = None
+
+    if out:
+        path = Path(out)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if text is None:
+            df.to_parquet(path, index=False)
+        else:
+            path.write_text(text + ("" if text.endswith("\n") else "\n"), encoding="utf-8")
+        print(f"{len(df)} filas -> {path}", file=sys.stderr)
+    else:
+        print(text)
+
+
+def load_frames(symbols: list, start: str, end: str, workers: int) -> dict:
+    """{symbol: velas} en paralelo desde el almacén local (FMP solo para lo que falta)."""
+    from ohlcv_store import get_bars
+
+    def load(symbol):
+        try:
+            return symbol, get_bars(symbol, start, end)
+        except Exception as e:
+            print(f"{symbol}: ERROR {e}", file=sys.stderr)
+            return symbol, None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(symbols)))) as pool:
+        results = list(pool.map(load, symbols))
+    return {s: df for s, df in results if df is not None and not df.empty}
+
+
+def load_panel(symbols: list, start: str, end: str, workers: int, value: str = "close"):
+    """Panel ancho fechas x símbolos con la columna value."""
+    from metrics_panel import panel_from_frames
+
+    panel = panel_from_frames(load_frames(symbols, start, end, workers), value)
+    if panel.empty:
+        raise SystemExit("No hay datos para ningún símbolo.")
+    return panel
+
+
+# -------------------------
+# Subcomandos
+# -------------------------
+def cmd_fetch(args):
+    from fmp_async import to_long_format
+
+    if args.refresh:
+        from ohlcv_store import invalidate
+
+        for symbol in args.symbols:
+            invalidate(symbol)
+    frames = load_frames(args.symbols, args.start, args.end, args.workers)
+    if args.format == "parquet" and not args.out:
+        from parquet_store import write_bars
+
+        for symbol, df in frames.items():
+            paths = write_bars(df, symbol)
+            print(f"{symbol}: {len(df)} velas -> {len(paths)} particiones")
+        return
+    write_output(to_long_format(frames), args.format, args.out)
+
+
+def cmd_metrics(args):
+    from metrics_panel import DEFAULT_METRICS, compute_panel_metrics, panel_kpis, to_long
+
+    prices = load_panel(args.symbols, args.start, args.end, args.workers)
+    if args.kpis:
+        out = panel_kpis(prices).round(4).rename_axis("symbol").reset_index()
+    else:
+        metrics = args.metrics.split(",") if args.metrics else DEFAULT_METRICS
+        out = to_long(compute_panel_metrics(prices, metrics))
+        if args.last:
+            out = out.groupby("symbol").tail(args.last).reset_index(drop=True)
+    write_output(out, args.format, args.out)
+
+
+def cmd_plot(args):
+    charts = args.charts.split(",") if args.charts else CHARTS
+    unknown = [c for c in charts if c not in CHARTS]
+    if unknown:
+        raise SystemExit(f"Gráficos desconocidos: {unknown} (opciones: {','.join(CHARTS)})")
+
+    if args.out:
+        # Sin pantalla: PNG/SVG en args.out, repartido entre procesos (chart_render.py)
+        from chart_render import print_summary, render_batch
+
+        frames = load_frames(args.symbols, args.start, args.end, args.workers)
+        t0 = time.perf_counter()
+        results = render_batch(frames, charts, args.out, args.format, args.workers)
+        print_summary(results, time.perf_counter() - t0)
+        return
+
+    from script3_visualizacion import (
+        add_financial_metrics,
+        get_ohlcv_df,
+        plot_candles_ohlcv,
+        plot_daily_returns,
+        plot_drawdown,
+        plot_rolling_volatility,
+    )
+
+    plots = {
+        "candles": plot_candles_ohlcv,
+        "returns": plot_daily_returns,
+        "volatility": plot_rolling_volatility,
+        "drawdown": plot_drawdown,
+    }
+    for symbol in args.symbols:
+        df = add_financial_metrics(get_ohlcv_df(symbol, args.start, args.end))
+        for chart in charts:
+            plots[chart](df, symbol)
+
+
+def cmd_backtest(args):
+    from backtest import backtest_panel
+
+    prices = load_panel(args.symbols, args.start, args.end, args.workers)
+    stats = backtest_panel(prices, args.fast, args.slow, args.qty).sort_values("sharpe", ascending=False)
+    write_output(stats.rename_axis("symbol").reset_index(), args.format, args.out)
+
+
+def cmd_bot(args):
+    if args.live:
+        if len(args.symbols) != 1:
+            raise SystemExit("--live ejecuta el servicio para UN símbolo.")
+        from live_trader import EVAL_OFFSET_MIN, run_service
+        from tradin_bot_script5 import FAST, SLOW
+
+        offset = EVAL_OFFSET_MIN if args.offset_min is None else args.offset_min
+        run_service(args.symbols[0], fake=args.fake, offset_min=offset,
+                    fast=args.fast or FAST, slow=args.slow or SLOW, qty=args.qty)
+        return
+
+    from portfolio_bot import WATCHLIST, run_once
+    from tradin_bot_script5 import FAST, SLOW
+
+    run_once(
+        args.symbols or WATCHLIST,
+        fake=args.fake,
+        fast=args.fast or FAST,
+        slow=args.slow or SLOW,
+        qty=args.qty,
+        max_workers=args.workers,
+    )
+
+
+def cmd_insights(args):
+    from insights_with_chatgpt import main as run_insights
+
+    run_insights(args.symbols, args.workers)
+
+
+def cmd_alert(args):
+    from telegram_alerts import main as run_alert
+
+    run_alert(args.symbols, args.workers)
+
+
+def cmd_brief(args):
+    from insights_batch import OPENAI_RPM, OPENAI_TPM, main as run_brief
+
+    df = run_brief(args.symbols, args.pack, args.workers, args.rpm or OPENAI_RPM, args.tpm or OPENAI_TPM)
+    if args.out:
+        write_output(df, "csv" if args.format == "table" else args.format, args.out)
+
+
+# -------------------------
+# Parser
+# -------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lessons", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # Opciones compartidas por los subcomandos
+    symbols = argparse.ArgumentParser(add_help=False)
+    symbols.add_argument("symbols", nargs="+", help="símbolos separados por espacios o comas")
+
+    dates = argparse.ArgumentParser(add_help=False)
+    dates.add_argument("--start", default=DEFAULT_START)
+    dates.add_argument("--end", default=str(date.today()))
+
+    workers = argparse.ArgumentParser(add_help=False)
+    workers.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="descargas en paralelo")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=FORMATS, default="table")
+    output.add_argument("--out", default=None, help="fichero de salida (por defecto, pantalla)")
+
+    p = sub.add_parser("fetch", parents=[symbols, dates, workers, output], help="velas OHLCV")
+    p.add_argument("--refresh", action="store_true", help="borrar del almacén y descargar de nuevo (splits, ajustes)")
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("metrics", parents=[symbols, dates, workers, output], help="métricas del panel")
+    p.add_argument("--metrics", default=None, help="p.ej. return,sma_50,volatility_20,drawdown")
+    p.add_argument("--kpis", action="store_true", help="una fila de KPIs por símbolo")
+    p.add_argument("--last", type=int, default=None, help="solo las N últimas fechas de cada símbolo")
+    p.set_defaults(func=cmd_metrics)
+
+    p = sub.add_parser("plot", parents=[symbols, dates, workers], help="gráficos de script3")
+    p.add_argument("--charts", default=None, help=f"subconjunto de {','.join(CHARTS)}")
+    p.add_argument("--out", default=None, help="carpeta: guardar en ficheros sin pantalla (chart_render.py)")
+    p.add_argument("--format", choices=["png", "svg"], default="png", help="con --out")
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser("backtest", parents=[symbols, dates, workers, output], help="backtest SMA crossover")
+    p.add_argument("--fast", type=int, default=20)
+    p.add_argument("--slow", type=int, default=50)
+    p.add_argument("--qty", type=int, default=1)
+    p.set_defaults(func=cmd_backtest)
+
+    p = sub.add_parser("bot", parents=[workers], help="bot de cartera (una pasada) o servicio (--live)")
+    p.add_argument("symbols", nargs="*", help="por defecto BOT_WATCHLIST")
+    p.add_argument("--fake", action="store_true", help="usar el bróker falso (fake_broker.py)")
+    p.add_argument("--fast", type=int, default=None)
+    p.add_argument("--slow", type=int, default=None)
+    p.add_argument("--qty", type=int, default=1)
+    p.add_argument("--live", action="store_true", help="servicio de live_trader.py para un símbolo")
+    p.add_argument("--offset-min", type=int, default=None, help="con --live: minutos tras el cierre")
+    p.set_defaults(func=cmd_bot)
+
+    # Insights / alertas: símbolos procesados a la vez (cada uno lanza sus consultas en paralelo)
+    pipeline_workers = argparse.ArgumentParser(add_help=False)
+    pipeline_workers.add_argument("--workers", type=int, default=4, help="símbolos a la vez")
+
+    p = sub.add_parser("insights", parents=[symbols, pipeline_workers], help="insights con ChatGPT")
+    p.set_defaults(func=cmd_insights)
+
+    p = sub.add_parser("alert", parents=[symbols, pipeline_workers], help="insights + Excel + Telegram")
+    p.set_defaults(func=cmd_alert)
+
+    p = sub.add_parser("brief", parents=[symbols, output], help="insights por lotes con límites de OpenAI")
+    p.add_argument("--pack", type=int, default=1, help="símbolos por prompt")
+    p.add_argument("--workers", type=int, default=8, help="peticiones a OpenAI a la vez")
+    p.add_argument("--rpm", type=float, default=None, help="peticiones/minuto (por defecto OPENAI_RPM)")
+    p.add_argument("--tpm", type=float, default=None, help="tokens/minuto (por defecto OPENAI_TPM)")
+    p.set_defaults(func=cmd_brief)
+
+    return parser
+
+
+def main(argv: list = None):
+    args = build_parser().parse_args(argv)
+    args.symbols = parse_symbols(args.symbols)
+
+    from profiling import start_profiling
+    start_profiling(f"cli_{args.command}")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+compact.py
+Modo compacto para DataFrames de velas: menos memoria por símbolo.
+
+- Precios y métricas float64 -> float32 (7 cifras significativas: de sobra
+  para precios con 2-4 decimales).
+- Volumen y otros enteros -> el entero más pequeño en el que caben.
+- Columnas auxiliares (p.ej. cum_max, que solo sirve para calcular el
+  drawdown) se eliminan.
+
+Para un panel de miles de símbolos y décadas de velas, esto reduce la
+memoria aproximadamente a la mitad.
+
+Se activa con la variable de entorno LESSONS_COMPACT=1 (o con compact=True
+en get_ohlcv_df / add_financial_metrics / get_ohlcv / add_basic_metrics).
+
+Ejemplo:
+    df = compact_frame(df)
+    print(memory_report({"AAPL": df}))
+    max_errors(full, compact)   # ¿coinciden las métricas con las de float64?
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+COMPACT = os.getenv("LESSONS_COMPACT", "").strip().lower() in ("1", "true", "yes", "si", "sí")
+
+# Columnas intermedias que no hace falta conservar
+HELPER_COLUMNS = ["cum_max"]
+
+# Tolerancias del modo compacto frente a float64 (max_errors): precios y
+# medias en relativo; retornos, volatilidad y drawdown en absoluto
+RTOL = 1e-5
+ATOL = {"daily_return": 1e-6, "return": 1e-6, "volatility_20": 1e-6, "drawdown": 1e-5}
+
+
+def smallest_int_dtype(values: pd.Series):
+    """int8/16/32/64 más pequeño que contiene todos los valores."""
+    lo, hi = values.min(), values.max()
+    for dtype in ("int8", "int16", "int32"):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return "int64"
+
+
+def compact_frame(df: pd.DataFrame, drop: list = None) -> pd.DataFrame:
+    """
+    Copia compacta de df: float64 -> float32, enteros al tipo mínimo y sin
+    columnas auxiliares (HELPER_COLUMNS por defecto). El índice no se toca.
+    """
+    drop = HELPER_COLUMNS if drop is None else drop
+    df = df.drop(columns=[c for c in drop if c in df.columns])
+
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if dtype == "float64":
+            values = df[col]
+            # Volumen que llega como float (sin huecos): a entero, que es exacto
+            if col == "volume" and values.notna().all() and (values % 1 == 0).all():
+                dtypes[col] = smallest_int_dtype(values)
+            else:
+                dtypes[col] = "float32"
+        elif pd.api.types.is_integer_dtype(dtype) and len(df):
+            dtypes[col] = smallest_int_dtype(df[col])
+    return df.astype(dtypes) if dtypes else df
+
+
+def max_errors(full: pd.DataFrame, small: pd.DataFrame) -> dict:
+    """
+    Compara un resultado compacto con el de precisión completa.
+    {columna: (error máximo, tolerancia, ok)} para las columnas float comunes;
+    un NaN en una sola de las dos cuenta como fallo.
+    """
+    out = {}
+    for col in small.columns:
+        if col not in full.columns or not pd.api.types.is_float_dtype(small[col]):
+            continue
+        a = full[col].to_numpy(dtype="float64")
+        b = small[col].to_numpy(dtype="float64")
+        both = ~(np.isnan(a) | np.isnan(b))
+        if (np.isnan(a) != np.isnan(b)).any():
+            out[col] = (np.inf, 0.0, False)
+            continue
+        if col in ATOL:
+            err, tol = np.abs(a[both] - b[both]).max(initial=0), ATOL[col]
+        else:
+            err, tol = (np.abs(a[both] - b[both]) / np.abs(a[both])).max(initial=0), RTOL
+        out[col] = (err, tol, err <= tol)
+    return out
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """Bytes que ocupa df (índice incluido; deep=True cuenta también los strings)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def memory_report(frames: dict) -> pd.DataFrame:
+    """
+    {nombre: DataFrame} -> tabla con filas, columnas y MB de cada uno,
+    más una fila TOTAL.
+    """
+    rows = [
+        {"frame": name, "rows": len(df), "columns": df.shape[1], "mb": frame_memory(df) / 1e6}
+        for name, df in frames.items()
+    ]
+    table = pd.DataFrame(rows, columns=["frame", "rows", "columns", "mb"])
+    total = {"frame": "TOTAL", "rows": table["rows"].sum(), "columns": table["columns"].sum(), "mb": table["mb"].sum()}
+    table = pd.concat([table, pd.DataFrame([total])], ignore_index=True)
+    table["mb"] = table["mb"].round(3)
+    return table
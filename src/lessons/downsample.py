@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+downsample.py
+Reducir el número de puntos de un gráfico sin cambiar lo que se ve.
+
+Un navegador no puede dibujar (ni el servidor enviar) decenas de miles de
+velas: con rangos de décadas o datos intradía, el dashboard se vuelve lento.
+La pantalla tampoco tiene píxeles para tantas velas, así que:
+
+- Velas OHLCV -> se agrupan en velas más largas (hora, día, semana, mes,
+  trimestre o año), la menor que quepa en el presupuesto de velas, con la
+  agregación correcta: open = primer open, high = máximo, low = mínimo,
+  close = último close, volume = suma.
+- Series de línea (p.ej. medias móviles) -> LTTB (Largest-Triangle-Three-
+  Buckets): se queda con los puntos que mejor conservan la forma de la
+  curva (picos y valles incluidos), no con uno cada N.
+
+Ejemplo:
+    small, label = downsample_ohlcv(df, max_bars=1000)   # label: "semanales", ...
+    idx = lttb_indices(x, y, 1000)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Máximo de velas que se envían al navegador; con más, se agrupan
+MAX_CHART_BARS = int(os.getenv("DASHBOARD_MAX_BARS", "1000"))
+
+# (regla de resample de pandas, etiqueta, duración aproximada), de menor a mayor
+RULES = [
+    ("h", "horarias", pd.Timedelta(hours=1)),
+    ("D", "diarias", pd.Timedelta(days=1)),
+    ("W-FRI", "semanales", pd.Timedelta(days=7)),
+    ("ME", "mensuales", pd.Timedelta(days=30.44)),
+    ("QE", "trimestrales", pd.Timedelta(days=91.31)),
+    ("YE", "anuales", pd.Timedelta(days=365.25)),
+]
+
+# Agregación de cada columna al juntar velas; las demás (SMA, drawdown...) toman
+# el valor del final del periodo, que es el que tenían en esa fecha.
+OHLCV_AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+# -------------------------
+# Velas OHLCV
+# -------------------------
+def choose_rule(dates: pd.Series, max_bars: int):
+    """
+    (regla, etiqueta) de la vela más corta con la que el rango cabe en
+    max_bars, o None si no hace falta agrupar.
+    """
+    if len(dates) <= max_bars:
+        return None
+    span = dates.iloc[-1] - dates.iloc[0]
+    step = dates.diff().median()  # resolución actual (1 día, 1 minuto...)
+    for rule, label, period in RULES:
+        if period > step and span / period <= max_bars:
+            return rule, label
+    return RULES[-1][:2]
+
+
+def resample_ohlcv(df: pd.DataFrame, rule: str, date_col: str = "date") -> pd.DataFrame:
+    """
+    Agrupa velas en periodos `rule`. Cada vela nueva lleva la fecha de su
+    última vela real (no el fin teórico del periodo, que puede ser futuro).
+    """
+    agg = {col: OHLCV_AGG.get(col, "last") for col in df.columns if col != date_col}
+    agg[date_col] = "last"
+    out = df.resample(rule, on=date_col).agg(agg)
+    return out.dropna(subset=["close"]).reset_index(drop=True)[list(df.columns)]
+
+
+def downsample_ohlcv(df: pd.DataFrame, max_bars: int, date_col: str = "date"):
+    """
+    df si ya cabe en max_bars velas; si no, df agrupado con la regla más fina
+    que quepa. Devuelve (DataFrame, etiqueta de la resolución o None).
+    """
+    if df.empty or max_bars <= 0:
+        return df, None
+    choice = choose_rule(df[date_col], max_bars)
+    if choice is None:
+        return df, None
+    rule, label = choice
+    return resample_ohlcv(df, rule, date_col), label
+
+
+# -------------------------
+# Series de línea (LTTB)
+# -------------------------
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices de los n_out puntos que elige LTTB (siempre incluye el primero y
+    el último). x numérico y creciente; y sin NaN.
+
+    Se divide la serie en n_out - 2 cubos; de cada cubo se elige el punto que
+    forma el triángulo de mayor área con el punto elegido antes y con la media
+    del cubo siguiente. El bucle es por cubo (n_out vueltas), no por punto.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, n_out - 1).astype("int64")  # límites de los cubos (sin extremos)
+
+    out = np.empty(n_out, dtype="int64")
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # media del cubo siguiente (el último punto para el último cubo)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def lttb_series(dates: pd.Series, values: pd.Series, n_out: int):
+    """
+    (fechas, valores) reducidos con LTTB. Los NaN del principio (p.ej. las
+    primeras 49 velas de una SMA 50) se quitan antes.
+    """
+    mask = values.notna().to_numpy()
+    dates, values = dates[mask], values[mask]
+    x = dates.to_numpy(dtype="datetime64[ns]").astype("int64")
+    idx = lttb_indices(x, values.to_numpy(), n_out)
+    return dates.iloc[idx], values.iloc[idx]
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+fake_broker.py
+Bróker falso en memoria con la misma interfaz que usamos de alpaca-py
+(TradingClient). Sirve para probar los bots sin cuenta, sin red y sin
+enviar órdenes reales.
+
+Métodos soportados:
+- get_all_positions()
+- get_open_position(symbol)
+- submit_order(order_data)   -> se ejecuta al instante al precio conocido
+- get_account()
+- get_clock() / get_calendar()  -> sesiones de lunes a viernes, 13:30-20:00 UTC
+                                  (horario de invierno de NYSE, sin festivos)
+
+Ejemplo:
+    broker = FakeTradingClient(cash=10_000, prices={"AAPL": 190.0})
+    place_market_order(broker, "AAPL", OrderSide.BUY, 1)
+"""
+
+import threading
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from types import SimpleNamespace
+
+SESSION_OPEN = dtime(13, 30)   # 9:30 en Nueva York (UTC-5)
+SESSION_CLOSE = dtime(20, 0)   # 16:00 en Nueva York
+
+
+def session_bounds(day: date):
+    """(apertura, cierre) en UTC de la sesión de `day`."""
+    return (datetime.combine(day, SESSION_OPEN, tzinfo=timezone.utc),
+            datetime.combine(day, SESSION_CLOSE, tzinfo=timezone.utc))
+
+
+def next_session_day(day: date) -> date:
+    """Primer día laborable a partir de `day` (incluido)."""
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+class FakeAPIError(Exception):
+    """Error simulado del bróker (p.ej. símbolo no negociable)."""
+
+
+class FakeTradingClient:
+    def __init__(self, cash: float = 100_000.0, prices: dict = None, positions: dict = None,
+                 latency: float = 0.0, fail_symbols: set = None, now=None):
+        self.cash = float(cash)
+        self.prices = dict(prices or {})
+        self.positions = {s: int(q) for s, q in (positions or {}).items()}
+        self.latency = latency
+        self.fail_symbols = set(fail_symbols or [])
+        # Hora actual del reloj de mercado (una función, para poder simularla en tests)
+        self.now = now or (lambda: datetime.now(timezone.utc))
+        self.orders = []
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def _call(self, name: str):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    # -------------------------
+    # Posiciones y cuenta
+    # -------------------------
+    def get_all_positions(self) -> list:
+        self._call("get_all_positions")
+        with self.lock:
+            return [
+                SimpleNamespace(symbol=s, qty=str(q), market_value=str(q * self.prices.get(s, 0.0)))
+                for s, q in self.positions.items() if q
+            ]
+
+    def get_open_position(self, symbol: str):
+        self._call("get_open_position")
+        with self.lock:
+            qty = self.positions.get(symbol, 0)
+        if not qty:
+            raise FakeAPIError(f"position does not exist: {symbol}")
+        return SimpleNamespace(symbol=symbol, qty=str(qty))
+
+    def get_account(self):
+        self._call("get_account")
+        with self.lock:
+            equity = self.cash + sum(q * self.prices.get(s, 0.0) for s, q in self.positions.items())
+            return SimpleNamespace(equity=f"{equity:.2f}", cash=f"{self.cash:.2f}", buying_power=f"{self.cash:.2f}")
+
+    # -------------------------
+    # Calendario
+    # -------------------------
+    def get_clock(self):
+        """Reloj como el de Alpaca: abierto durante la sesión; next_open/next_close avanzan con las sesiones."""
+        self._call("get_clock")
+        now = self.now()
+        day = next_session_day(now.date())
+        open_, close = session_bounds(day)
+        if now >= close:
+            day = next_session_day(day + timedelta(days=1))
+            open_, close = session_bounds(day)
+        is_open = open_ <= now
+        next_open = session_bounds(next_session_day(day + timedelta(days=1)))[0] if is_open else open_
+        return SimpleNamespace(timestamp=now, is_open=is_open, next_open=next_open, next_close=close)
+
+    def get_calendar(self, filters=None):
+        """Sesiones (date, open, close) entre filters.start y filters.end."""
+        self._call("get_calendar")
+        start = filters.start if filters is not None and filters.start else self.now().date()
+        end = filters.end if filters is not None and filters.end else start + timedelta(days=30)
+        sessions, day = [], next_session_day(start)
+        while day <= end:
+            open_, close = session_bounds(day)
+            sessions.append(SimpleNamespace(date=day, open=open_, close=close))
+            day = next_session_day(day + timedelta(days=1))
+        return sessions
+
+    # -------------------------
+    # Órdenes
+    # -------------------------
+    def submit_order(self, order_data):
+        self._call("submit_order")
+        symbol = order_data.symbol
+        qty = int(float(order_data.qty))
+        side = str(getattr(order_data.side, "value", order_data.side)).lower()
+
+        if symbol in self.fail_symbols:
+            raise FakeAPIError(f"asset {symbol} is not tradable")
+
+        with self.lock:
+            price = self.prices.get(symbol, 0.0)
+            if side == "buy":
+                self.cash -= qty * price
+                self.positions[symbol] = self.positions.get(symbol, 0) + qty
+            else:
+                self.cash += qty * price
+                self.positions[symbol] = self.positions.get(symbol, 0) - qty
+
+            order = SimpleNamespace(id=str(uuid.uuid4()), symbol=symbol, qty=str(qty), side=side,
+                                    status="filled", filled_avg_price=str(price))
+            self.orders.append(order)
+        return order
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+fake_openai_server.py
+Servidor HTTP local que imita el endpoint de chat de OpenAI
+(POST /v1/chat/completions), para probar y medir los scripts de insights
+sin API key, sin coste y sin red.
+
+- La respuesta es determinista (depende solo del prompt) y tiene la misma
+  forma que la de OpenAI: choices[0].message.content y usage con tokens.
+- Si el prompt trae secciones "### SÍMBOLO" (varios símbolos en un prompt,
+  ver insights_batch.py), responde con una sección por símbolo.
+- Tokens aproximados: 1 token ~ 4 caracteres.
+- latency simula el tiempo de generación; el servidor cuenta las peticiones
+  recibidas (server.hits) para comprobar, p.ej., que la caché funciona.
+
+Uso rápido:
+    server, base_url = start_fake_openai(latency=0.5)   # o start_fake_openai_process(...)
+    os.environ["OPENAI_BASE_URL"] = base_url            # el cliente OpenAI la usa sola
+    ...
+    server.shutdown()
+
+python src/lessons/fake_openai_server.py --latency 1.5
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECTION_RE = re.compile(r"^### (\S+)\s*$", re.MULTILINE)
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def fake_answer(prompt: str) -> str:
+    """Texto con el formato que piden los prompts del curso, distinto para cada prompt."""
+    sections = SECTION_RE.split(prompt)[1:]  # [sym1, texto1, sym2, texto2, ...]
+    if sections:
+        return "\n\n".join(
+            f"### {symbol}\n{fake_answer(body)}" for symbol, body in zip(sections[::2], sections[1::2])
+        )
+
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    first_line = next((line for line in prompt.splitlines() if line.strip()), "")[:60]
+    return (
+        f"1) Market summary\n- Fake summary {digest}\n- Based on: {first_line}\n- Trend noted\n"
+        "2) Key risks\n- Volatility\n- Valuation\n- Macro\n"
+        "3) Potential opportunities\n- Momentum\n- Earnings\n- Product cycle"
+    )
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # silencioso
+
+    def send_json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Endpoint no soportado: {self.path}"}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.hits += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        content = fake_answer(prompt)
+        prompt_tokens, completion_tokens = approx_tokens(prompt), approx_tokens(content)
+        self.send_json(200, {
+            "id": f"chatcmpl-fake-{server.hits}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+def start_fake_openai(latency: float = 0.0, port: int = 0):
+    """Arranca el servidor en un hilo y devuelve (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.hits = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/v1"
+
+
+def start_fake_openai_process(latency: float = 0.0):
+    """
+    Igual que start_fake_openai pero en otro proceso.
+    Devuelve (proceso, base_url); termina con proceso.terminate().
+    """
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--latency", str(latency)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    base_url = proc.stdout.readline().split()[-1]
+    return proc, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor OpenAI falso para pruebas locales.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    srv, url = start_fake_openai(args.latency, args.port)
+    print(f"OpenAI falso escuchando en {url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+fmp_async.py
+Descarga concurrente (asyncio + httpx) de históricos OHLCV para muchos símbolos.
+
+get_historical_df / get_ohlcv_df piden un símbolo cada vez: 500 símbolos son
+500 peticiones en serie. Aquí lanzamos las llamadas a historical-price-full
+en paralelo, con un límite de peticiones simultáneas para no saturar la API.
+
+Compensa cuando hay muchos símbolos y la red es lenta (ver bench_fetch_async.py);
+para un puñado de símbolos el bucle secuencial puede ser igual de rápido.
+
+Ejemplo:
+    from fmp_async import fetch_historical_many
+    dfs = fetch_historical_many(["AAPL", "MSFT"], "2024-01-01", "2024-03-31")
+    long_df = fetch_historical_many(["AAPL", "MSFT"], "2024-01-01", "2024-03-31", long_format=True)
+
+Usa la misma configuración (BASE_URL, API key, timeouts), las mismas
+estadísticas por endpoint que fmp_client y el mismo limitador (rate_limit).
+"""
+
+import asyncio
+import time
+
+import httpx
+import pandas as pd
+
+import fmp_client
+import rate_limit
+
+DEFAULT_CONCURRENCY = 10
+
+
+def resolve_range(symbol: str, start_date: str, end_date: str, ranges: dict):
+    """Rango (from, to) para un símbolo: el de `ranges` si existe, si no el común."""
+    if ranges and symbol in ranges:
+        return ranges[symbol]
+    return start_date, end_date
+
+
+async def fetch_historical_async(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    symbol: str,
+    start_date: str = None,
+    end_date: str = None,
+    columns: list = None,
+) -> pd.DataFrame:
+    """
+    Descarga el histórico de un símbolo (respetando el semáforo) y lo
+    devuelve como DataFrame OHLCV ordenado por fecha.
+    """
+    url = f"{fmp_client.BASE_URL}/historical-price-full/{symbol}"
+    params = {"apikey": fmp_client.API_KEY}
+    if start_date:
+        params["from"] = start_date
+    if end_date:
+        params["to"] = end_date
+
+    async with semaphore:
+        for attempt in range(rate_limit.MAX_RETRIES + 1):
+            await rate_limit.limiter.acquire_async()
+            start = time.perf_counter()
+            try:
+                r = await client.get(url, params=params)
+            except httpx.HTTPError:
+                fmp_client.record_call("historical-price-full", time.perf_counter() - start, 0, ok=False)
+                raise
+            fmp_client.record_call(
+                "historical-price-full", time.perf_counter() - start, len(r.content), ok=r.is_success
+            )
+            if r.status_code not in rate_limit.RETRY_STATUS or attempt == rate_limit.MAX_RETRIES:
+                break
+            await asyncio.sleep(rate_limit.retry_wait(attempt, r.status_code, r.headers.get("Retry-After")))
+
+        if r.is_success:
+            rate_limit.limiter.on_success()
+        r.raise_for_status()
+
+    return fmp_client.historical_json_to_df(r.content, columns)
+
+
+async def fetch_historical_many_async(
+    symbols: list,
+    start_date: str = None,
+    end_date: str = None,
+    ranges: dict = None,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+    columns: list = None,
+    raise_errors: bool = True,
+) -> dict:
+    """
+    Descarga varios símbolos en paralelo y devuelve {symbol: DataFrame}.
+
+    - ranges: dict opcional {symbol: (from, to)} para rangos distintos por símbolo.
+    - max_concurrency: nº máximo de peticiones en vuelo a la vez.
+    - raise_errors: si es False, los símbolos que fallan se avisan y se omiten.
+    """
+    symbols = list(dict.fromkeys(symbols))  # sin duplicados, mismo orden
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    timeout = httpx.Timeout(fmp_client.READ_TIMEOUT, connect=fmp_client.CONNECT_TIMEOUT)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        tasks = []
+        for symbol in symbols:
+            start, end = resolve_range(symbol, start_date, end_date, ranges)
+            tasks.append(fetch_historical_async(client, semaphore, symbol, start, end, columns))
+        results = await asyncio.gather(*tasks, return_exceptions=not raise_errors)
+
+    out = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ {symbol}: no se pudo descargar ({result})")
+            continue
+        out[symbol] = result
+    return out
+
+
+def to_long_format(frames: dict) -> pd.DataFrame:
+    """Une {symbol: DataFrame} en un único DataFrame largo con columna symbol."""
+    if not frames:
+        return pd.DataFrame(columns=["symbol"] + fmp_client.OHLCV_COLUMNS)
+    return pd.concat(frames, names=["symbol", None]).reset_index(level=0).reset_index(drop=True)
+
+
+def fetch_historical_many(
+    symbols: list,
+    start_date: str = None,
+    end_date: str = None,
+    ranges: dict = None,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+    columns: list = None,
+    raise_errors: bool = True,
+    long_format: bool = False,
+):
+    """
+    Versión síncrona de fetch_historical_many_async (para scripts normales).
+    Devuelve {symbol: DataFrame} o, con long_format=True, un DataFrame largo.
+    """
+    frames = asyncio.run(
+        fetch_historical_many_async(
+            symbols, start_date, end_date, ranges, max_concurrency, columns, raise_errors
+        )
+    )
+    return to_long_format(frames) if long_format else frames
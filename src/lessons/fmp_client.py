@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+fmp_client.py
+Cliente HTTP compartido para Financial Modeling Prep (FMP).
+
+Todos los scripts del curso importan este módulo en lugar de llamar a
+requests.get por su cuenta. Así usamos una única requests.Session con pool
+de conexiones keep-alive: varias llamadas seguidas reutilizan la misma
+conexión TCP+TLS en vez de abrir una nueva en cada petición.
+
+Además guarda estadísticas por endpoint (llamadas, latencia y bytes) para
+saber en qué se va el tiempo de cada ejecución, y pasa cada petición por el
+limitador de rate_limit.py (token bucket + reintentos ante 429).
+
+Variables de entorno (todas opcionales salvo la API key):
+FMP_API_KEY=...
+FMP_BASE_URL=https://financialmodelingprep.com/api/v3
+FMP_POOL_CONNECTIONS=10   # nº de hosts distintos que se guardan en el pool
+FMP_POOL_MAXSIZE=20       # conexiones abiertas por host (>= hilos en paralelo)
+FMP_CONNECT_TIMEOUT=5     # segundos
+FMP_READ_TIMEOUT=30       # segundos
+FMP_PRINT_STATS=1         # imprime las estadísticas al terminar el script
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+import rate_limit
+
+try:
+    import orjson  # opcional: decodifica JSON varias veces más rápido
+except ImportError:
+    orjson = None
+
+load_dotenv()
+
+# -------------------------
+# Config
+# -------------------------
+API_KEY = os.getenv("FMP_API_KEY")
+BASE_URL = os.getenv("FMP_BASE_URL", "https://financialmodelingprep.com/api/v3")
+
+POOL_CONNECTIONS = int(os.getenv("FMP_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.getenv("FMP_POOL_MAXSIZE", "20"))
+CONNECT_TIMEOUT = float(os.getenv("FMP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("FMP_READ_TIMEOUT", "30"))
+
+_session = None
+_session_lock = threading.Lock()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+# -------------------------
+# Sesión compartida
+# -------------------------
+def get_session() -> requests.Session:
+    """
+    Devuelve la sesión HTTP compartida (se crea la primera vez).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def close_session():
+    """Cierra la sesión y libera las conexiones del pool."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# -------------------------
+# Estadísticas por endpoint
+# -------------------------
+def endpoint_name(url: str) -> str:
+    """
+    Nombre corto del endpoint para agrupar estadísticas.
+    Ej: .../api/v3/historical-price-full/AAPL -> "historical-price-full"
+    """
+    path = urlsplit(url).path
+    base_path = urlsplit(BASE_URL).path.rstrip("/")
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    return path.strip("/").split("/")[0] or "/"
+
+
+def record_call(endpoint: str, elapsed: float, nbytes: int, ok: bool):
+    """Acumula una llamada en las estadísticas del endpoint."""
+    with _stats_lock:
+        s = _stats.setdefault(
+            endpoint,
+            {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0, "bytes": 0},
+        )
+        s["calls"] += 1
+        s["errors"] += 0 if ok else 1
+        s["total_s"] += elapsed
+        s["max_s"] = max(s["max_s"], elapsed)
+        s["bytes"] += nbytes
+
+
+def get_stats() -> dict:
+    """
+    Devuelve un dict {endpoint: {calls, errors, avg_ms, max_ms, total_s, bytes}}.
+    """
+    with _stats_lock:
+        out = {}
+        for endpoint, s in _stats.items():
+            out[endpoint] = {
+                "calls": s["calls"],
+                "errors": s["errors"],
+                "avg_ms": s["total_s"] / s["calls"] * 1000 if s["calls"] else 0.0,
+                "max_ms": s["max_s"] * 1000,
+                "total_s": s["total_s"],
+                "bytes": s["bytes"],
+            }
+        return out
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def print_stats():
+    """Imprime una tabla sencilla con las estadísticas acumuladas."""
+    stats = get_stats()
+    if not stats:
+        return
+    print("\n--- FMP: estadísticas por endpoint ---")
+    for endpoint, s in sorted(stats.items()):
+        print(
+            f"{endpoint:<28} calls={s['calls']:<5} errors={s['errors']:<3} "
+            f"avg={s['avg_ms']:.1f}ms max={s['max_ms']:.1f}ms bytes={s['bytes']}"
+        )
+
+
+if os.getenv("FMP_PRINT_STATS"):
+    atexit.register(print_stats)
+
+
+# -------------------------
+# Peticiones
+# -------------------------
+def get(url: str, params: dict = None, timeout=None) -> requests.Response:
+    """
+    GET con la sesión compartida. Lanza HTTPError si el status no es 2xx.
+
+    Antes de cada intento pide turno al limitador. Ante 429 / 5xx reintenta
+    con backoff exponencial (respetando Retry-After) hasta FMP_MAX_RETRIES.
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    endpoint = endpoint_name(url)
+
+    for attempt in range(rate_limit.MAX_RETRIES + 1):
+        rate_limit.limiter.acquire()
+        start = time.perf_counter()
+        try:
+            r = get_session().get(url, params=params, timeout=timeout)
+        except requests.RequestException:
+            record_call(endpoint, time.perf_counter() - start, 0, ok=False)
+            raise
+
+        record_call(endpoint, time.perf_counter() - start, len(r.content), ok=r.ok)
+        if r.status_code not in rate_limit.RETRY_STATUS or attempt == rate_limit.MAX_RETRIES:
+            break
+        time.sleep(rate_limit.retry_wait(attempt, r.status_code, r.headers.get("Retry-After")))
+
+    if r.ok:
+        rate_limit.limiter.on_success()
+    r.raise_for_status()
+    return r
+
+
+def loads(content: bytes):
+    """Bytes JSON -> objetos Python (orjson si está instalado; si no, json)."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def get_json(url: str, params: dict = None):
+    """GET a una URL completa y devuelve el JSON."""
+    return loads(get(url, params=params).content)
+
+
+def call_fmp(endpoint: str, params: dict = None, api_key: str = None):
+    """
+    Llama a cualquier endpoint de FMP (relativo a BASE_URL) y devuelve JSON.
+    """
+    params = dict(params or {})
+    params["apikey"] = api_key or API_KEY
+    return get_json(f"{BASE_URL}/{endpoint}", params=params)
+
+
+# -------------------------
+# Conversión JSON -> DataFrame
+# -------------------------
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+
+def historical_to_df(historical: list, columns: list = None) -> "pd.DataFrame":
+    """
+    Convierte la lista "historical" de historical-price-full en un DataFrame
+    ordenado de más antiguo a más reciente (date como columna datetime).
+
+    Se construye columna a columna y solo con `columns`: campos como adjClose,
+    vwap o label no se convierten. Las fechas ISO se parsean de golpe con
+    numpy y, como FMP devuelve lo más reciente primero, basta con invertir
+    el orden (solo se ordena si los datos no vienen ordenados).
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = columns or OHLCV_COLUMNS
+    if not historical:
+        return pd.DataFrame(columns=columns)
+
+    data = {col: column_array([row.get(col) for row in historical], col) for col in columns}
+
+    dates = data["date"] if "date" in data else column_array([row.get("date") for row in historical], "date")
+    if len(dates) > 1 and dates[0] > dates[-1]:
+        order = slice(None, None, -1)
+        if not (dates[1:] <= dates[:-1]).all():
+            order = np.argsort(dates, kind="stable")
+    elif len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+        order = np.argsort(dates, kind="stable")
+    else:
+        order = slice(None)
+
+    return pd.DataFrame({col: values[order] for col, values in data.items()})
+
+
+def column_array(values: list, name: str) -> "np.ndarray":
+    """Lista de valores de un campo -> array numpy tipado (datetime64, int64, float64 u object)."""
+    import numpy as np
+
+    if name == "date":
+        return np.array(values, dtype="datetime64[ns]")
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        # Algún valor ausente (None): números a float con NaN; texto se queda como object
+        try:
+            arr = np.array(values, dtype="float64")
+        except (TypeError, ValueError):
+            pass
+    return arr
+
+
+def historical_json_to_df(content: bytes, columns: list = None) -> "pd.DataFrame":
+    """Respuesta cruda (bytes) de historical-price-full -> DataFrame (ver historical_to_df)."""
+    payload = loads(content)
+    historical = payload.get("historical", []) if isinstance(payload, dict) else []
+    return historical_to_df(historical, columns)
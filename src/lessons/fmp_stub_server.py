@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+fmp_stub_server.py
+Servidor HTTP local que imita los endpoints de FMP que usa el curso.
+
+Sirve datos sintéticos (deterministas por símbolo) para poder probar y medir
+el código sin API key, sin gastar cuota y sin depender de la red.
+
+Uso rápido:
+    server, base_url = start_stub_server(latency=0.05)   # o start_stub_process(...)
+    fmp_client.BASE_URL = base_url
+    ...
+    server.shutdown()
+
+Endpoints soportados:
+- /api/v3/historical-price-full/{symbol}?from=&to=&timeseries=
+- /api/v3/quote/{symbol1,symbol2,...}
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+from functools import lru_cache
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DEFAULT_END = date(2025, 12, 31)
+
+
+def business_days(start: date, end: date) -> list:
+    """Días laborables (lunes-viernes) entre start y end, ambos incluidos."""
+    days = []
+    d = start
+    while d <= end:
+        if d.weekday() < 5:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+def synthetic_bars(symbol: str, days: list) -> list:
+    """
+    Genera velas OHLCV con un paseo aleatorio (misma semilla por símbolo y día,
+    así dos peticiones distintas devuelven el mismo precio para la misma fecha).
+    Se devuelven de más reciente a más antigua, igual que FMP.
+    """
+    bars = [synthetic_bar(symbol, d) for d in days]
+    bars.reverse()
+    return bars
+
+
+@lru_cache(maxsize=None)
+def synthetic_bar(symbol: str, d: date) -> dict:
+    """Una vela sintética; se cachea para que el servidor no sea el cuello de botella."""
+    rng = random.Random(f"{symbol}-{d.isoformat()}")
+    base = 50 + (sum(map(ord, symbol)) % 200) + (d.toordinal() % 365) * 0.1
+    close = base * (1 + rng.uniform(-0.02, 0.02))
+    open_ = close * (1 + rng.uniform(-0.01, 0.01))
+    high = max(open_, close) * (1 + rng.uniform(0, 0.01))
+    low = min(open_, close) * (1 - rng.uniform(0, 0.01))
+    return {
+        "date": d.isoformat(),
+        "open": round(open_, 2),
+        "high": round(high, 2),
+        "low": round(low, 2),
+        "close": round(close, 2),
+        "adjClose": round(close, 2),
+        "volume": rng.randint(1_000_000, 90_000_000),
+        "unadjustedVolume": rng.randint(1_000_000, 90_000_000),
+        "change": round(close - open_, 2),
+        "changePercent": round((close / open_ - 1) * 100, 4),
+        "vwap": round((high + low + close) / 3, 4),
+        "label": d.strftime("%B %d, %y"),
+        "changeOverTime": round(close / open_ - 1, 6),
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 para que el cliente pueda reutilizar la conexión (keep-alive)
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # silencioso
+
+    def send_json(self, status: int, payload, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.hits += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        # Simula el límite del plan: una fracción de peticiones devuelve 429
+        if server.throttle_rate and random.random() < server.throttle_rate:
+            server.throttled += 1
+            self.send_json(429, {"Error Message": "Limit Reach"}, {"Retry-After": str(server.retry_after)})
+            return
+
+        parts = urlsplit(unquote(self.path))
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        path = parts.path.replace("/api/v3/", "", 1).strip("/")
+
+        if path.startswith("historical-price-full/"):
+            symbol = path.split("/", 1)[1]
+            self.send_json(200, self.historical(symbol, query))
+            return
+
+        if path.startswith("quote/"):
+            symbols = [s for s in path.split("/", 1)[1].split(",") if s]
+            self.send_json(200, [self.quote(s) for s in symbols])
+            return
+
+        self.send_json(404, {"Error Message": f"Endpoint no soportado: {path}"})
+
+    def historical(self, symbol: str, query: dict) -> dict:
+        end = date.fromisoformat(query["to"]) if "to" in query else DEFAULT_END
+        if "from" in query:
+            start = date.fromisoformat(query["from"])
+        else:
+            n = int(query.get("timeseries", 250))
+            start = end - timedelta(days=int(n * 7 / 5) + 7)
+        days = business_days(start, end)
+        if "timeseries" in query and "from" not in query:
+            days = days[-int(query["timeseries"]):]
+        return {"symbol": symbol, "historical": synthetic_bars(symbol, days)}
+
+    def quote(self, symbol: str) -> dict:
+        last = synthetic_bars(symbol, [DEFAULT_END])[0]
+        return {
+            "symbol": symbol,
+            "name": f"{symbol} Inc.",
+            "price": last["close"],
+            "changesPercentage": last["changePercent"],
+            "change": last["change"],
+            "dayLow": last["low"],
+            "dayHigh": last["high"],
+            "open": last["open"],
+            "volume": last["volume"],
+            "timestamp": int(time.time()),
+        }
+
+
+class StubServer(ThreadingHTTPServer):
+    # La cola de conexiones por defecto es 5: con más conexiones simultáneas,
+    # las que sobran esperan ~1 s al reintento de TCP y falsean las medidas
+    request_queue_size = 128
+
+
+def start_stub_server(latency: float = 0.0, port: int = 0, throttle_rate: float = 0.0, retry_after: float = 1):
+    """
+    Arranca el servidor en un hilo y devuelve (server, base_url).
+    latency: segundos de espera artificial por petición (simula la red).
+    throttle_rate: probabilidad (0-1) de responder 429 con Retry-After.
+    """
+    server = StubServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.hits = 0
+    server.throttle_rate = throttle_rate
+    server.retry_after = retry_after
+    server.throttled = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/api/v3"
+
+
+def start_stub_process(latency: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1):
+    """
+    Igual que start_stub_server pero en otro proceso, para que el servidor
+    no compita por el GIL con el código que se está midiendo.
+    Devuelve (proceso, base_url); termina con proceso.terminate().
+    """
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--latency", str(latency),
+         "--throttle", str(throttle_rate), "--retry-after", str(retry_after)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    base_url = proc.stdout.readline().split()[-1]
+    return proc, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor FMP falso para pruebas locales.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1)
+    args = parser.parse_args()
+
+    srv, url = start_stub_server(args.latency, args.port, args.throttle, args.retry_after)
+    print(f"Stub FMP escuchando en {url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+indicators.py
+Indicadores "en streaming": reciben una vela nueva cada vez y se actualizan
+en tiempo constante, sin volver a recorrer todo el histórico.
+
+compute_signal (bot) recalcula rolling(fast) y rolling(slow) sobre toda la
+serie en cada ejecución, y el drawdown repite cummax sobre todo el histórico.
+Estos objetos guardan el estado mínimo necesario y se pueden serializar a
+JSON para continuar en la siguiente ejecución (o en el siguiente tick).
+
+Indicadores:
+- SMA(window)             media móvil simple
+- EMA(span)               media exponencial (igual que pandas ewm(adjust=False))
+- RollingStd(window)      desviación típica rolling (ddof=1, como pandas)
+- RunningDrawdown()       máximo acumulado y caída desde el máximo
+- CrossoverSignal(f, s)   señal SMA crossover del bot (1 / -1 / 0)
+
+Ejemplo:
+    sig = load_state("bot_state.json") or CrossoverSignal(20, 50)
+    signal = sig.update(close, date="2025-01-02")
+    save_state("bot_state.json", sig)
+"""
+
+import json
+import math
+from collections import deque
+from pathlib import Path
+
+
+class SMA:
+    """Media móvil simple con suma acumulada."""
+
+    def __init__(self, window: int, values=None, total: float = 0.0):
+        self.window = window
+        self.values = deque(values or [], maxlen=window)
+        self.total = total
+
+    def update(self, x: float):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.values) < self.window:
+            return None
+        return self.total / self.window
+
+    def to_dict(self) -> dict:
+        return {"type": "SMA", "window": self.window, "values": list(self.values), "total": self.total}
+
+
+class EMA:
+    """Media móvil exponencial; la primera vela inicializa la media."""
+
+    def __init__(self, span: int, value: float = None):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.value = value
+
+    def update(self, x: float):
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"type": "EMA", "span": self.span, "value": self.value}
+
+
+class RollingStd:
+    """
+    Desviación típica muestral sobre una ventana fija (Welford con
+    altas y bajas: numéricamente más estable que sumar cuadrados).
+    """
+
+    def __init__(self, window: int, values=None, mean: float = 0.0, m2: float = 0.0):
+        self.window = window
+        self.values = deque(values or [], maxlen=window)
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, x: float):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            n = len(self.values) - 1
+            delta = old - self.mean
+            self.mean -= delta / n if n else self.mean
+            self.m2 -= delta * (old - self.mean)
+        self.values.append(x)
+        n = len(self.values)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.values) < self.window or self.window < 2:
+            return None
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def to_dict(self) -> dict:
+        return {"type": "RollingStd", "window": self.window, "values": list(self.values), "mean": self.mean, "m2": self.m2}
+
+
+class RunningDrawdown:
+    """Máximo acumulado y drawdown actual (close / max - 1)."""
+
+    def __init__(self, peak: float = None, value: float = None):
+        self.peak = peak
+        self.value = value
+
+    def update(self, x: float):
+        self.peak = x if self.peak is None else max(self.peak, x)
+        self.value = x / self.peak - 1
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"type": "RunningDrawdown", "peak": self.peak, "value": self.value}
+
+
+class CrossoverSignal:
+    """
+    Misma regla que compute_signal, vela a vela:
+    +1 si SMA_fast cruza por encima de SMA_slow en esta vela,
+    -1 si cruza por debajo, 0 en otro caso.
+    """
+
+    def __init__(self, fast: int, slow: int, sma_fast: SMA = None, sma_slow: SMA = None,
+                 prev: list = None, last_date: str = None, last_signal: int = 0):
+        self.fast = fast
+        self.slow = slow
+        self.sma_fast = sma_fast or SMA(fast)
+        self.sma_slow = sma_slow or SMA(slow)
+        self.prev = prev  # [sma_fast, sma_slow] de la vela anterior
+        self.last_date = last_date
+        self.last_signal = last_signal
+
+    def update(self, close: float, date: str = None) -> int:
+        f = self.sma_fast.update(close)
+        s = self.sma_slow.update(close)
+        signal = 0
+        if f is not None and s is not None:
+            if self.prev is not None:
+                pf, ps = self.prev
+                if pf <= ps and f > s:
+                    signal = 1
+                elif pf >= ps and f < s:
+                    signal = -1
+            self.prev = [f, s]
+        self.last_signal = signal
+        if date is not None:
+            self.last_date = str(date)
+        return signal
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "CrossoverSignal",
+            "fast": self.fast,
+            "slow": self.slow,
+            "sma_fast": self.sma_fast.to_dict(),
+            "sma_slow": self.sma_slow.to_dict(),
+            "prev": self.prev,
+            "last_date": self.last_date,
+            "last_signal": self.last_signal,
+        }
+
+
+# -------------------------
+# Serialización
+# -------------------------
+def from_dict(d: dict):
+    """Reconstruye cualquier indicador a partir de su to_dict()."""
+    d = dict(d)
+    kind = d.pop("type")
+    if kind == "SMA":
+        # La suma se recalcula con los valores de la ventana: así no arrastra
+        # entre ejecuciones el error de redondeo de tantas restas y sumas
+        d["total"] = sum(d["values"])
+    if kind == "CrossoverSignal":
+        d["sma_fast"] = from_dict(d["sma_fast"])
+        d["sma_slow"] = from_dict(d["sma_slow"])
+    classes = {c.__name__: c for c in (SMA, EMA, RollingStd, RunningDrawdown, CrossoverSignal)}
+    return classes[kind](**d)
+
+
+def save_state(path, indicator):
+    """Guarda el estado en JSON (escritura atómica)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(indicator.to_dict()), encoding="utf-8")
+    tmp.replace(path)
+
+
+def load_state(path):
+    """Carga el estado guardado; None si no existe."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return from_dict(json.loads(path.read_text(encoding="utf-8")))
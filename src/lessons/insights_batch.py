@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+insights_batch.py
+"Morning brief": insights de ChatGPT para toda una lista de símbolos en una
+sola ejecución, en lugar de un símbolo fijo (SYMBOL = "AAPL") por ejecución.
+
+- Contexto (precio, fundamentales, noticias) de todos los símbolos con las
+  consultas a FMP en paralelo (mismas funciones que insights_with_chatgpt.py).
+- Peticiones a OpenAI en paralelo con UN cliente reutilizado (su pool de
+  conexiones), limitadas por peticiones/minuto y tokens/minuto: dos token
+  buckets de rate_limit.py (RateLimiter); en tokens, cada petición gasta su
+  prompt estimado + el máximo de respuesta, y al terminar se devuelve lo que
+  no ha usado (todo, si la respuesta es un 429). Los reintentos ante 429
+  tienen su propia configuración (OPENAI_MAX_RETRIES...), no la de FMP.
+- Opcional (pack > 1): varios símbolos en un mismo prompt con una sección
+  "### SÍMBOLO" por activo; la respuesta se trocea por secciones. Los
+  símbolos cuya sección no aparezca se piden después uno a uno.
+- Caché en disco (llm_cache.py): la clave incluye max_tokens, así que solo
+  se reutilizan respuestas de este mismo script (insights_with_chatgpt.py no
+  fija max_tokens y tiene sus propias entradas).
+- Informe de tokens y latencia por símbolo (en un prompt compartido, los
+  tokens se reparten en proporción al texto de cada símbolo).
+
+Variables de entorno (opcionales):
+OPENAI_RPM=500        # peticiones por minuto de tu cuenta
+OPENAI_TPM=200000     # tokens por minuto de tu cuenta
+OPENAI_MAX_RETRIES=5  # reintentos ante 429
+OPENAI_BACKOFF_BASE=1 # segundos (se duplica en cada intento, con jitter)
+OPENAI_BACKOFF_CAP=60 # espera máxima entre reintentos
+
+Uso:
+python src/lessons/insights_batch.py AAPL MSFT NVDA TSLA
+python src/lessons/insights_batch.py AAPL MSFT NVDA TSLA --pack 4 --workers 8
+python src/lessons brief AAPL MSFT NVDA --pack 3 --format csv --out brief.csv
+
+Educativo. No es asesoramiento financiero.
+"""
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import llm_cache
+import rate_limit
+from insights_with_chatgpt import (
+    OPENAI_MODEL,
+    TEMPERATURE,
+    build_context,
+    build_prompt,
+    get_fundamentals_context,
+    get_news_context,
+    get_price_context,
+    make_openai_client,
+)
+from rate_limit import RateLimiter
+
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "200000"))
+BURST_SECONDS = 10  # ráfaga permitida: lo que da el límite en 10 s
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "1"))
+OPENAI_BACKOFF_CAP = float(os.getenv("OPENAI_BACKOFF_CAP", "60"))
+
+MAX_WORKERS = 8
+MAX_COMPLETION_TOKENS = 400  # por símbolo (3 bloques de 3 viñetas)
+PACK_MAX_PROMPT_TOKENS = 3000  # tope de un prompt con varios símbolos
+
+SECTION_RE = re.compile(r"^#{2,}\s*([A-Z0-9.\-^]+)\s*$", re.MULTILINE)
+
+
+# -------------------------
+# Prompts
+# -------------------------
+def estimate_tokens(text: str) -> int:
+    """Tokens aproximados (1 token ~ 4 caracteres en inglés)."""
+    return max(1, len(text) // 4)
+
+
+def build_packed_prompt(contexts: dict) -> str:
+    """Un prompt para varios símbolos, con una sección por activo."""
+    sections = "\n\n".join(f"### {symbol}\n{context}" for symbol, context in contexts.items())
+    return f"""
+You are a financial analyst.
+You are NOT giving financial advice.
+
+For EACH asset below, provide:
+1) Market summary (3 bullet points)
+2) Key risks (3 bullet points)
+3) Potential opportunities (3 bullet points)
+
+Start the answer for each asset with a line containing only "### " followed
+by its symbol, in the same order as below.
+
+{sections}
+""".strip()
+
+
+def split_sections(text: str, symbols: list) -> dict:
+    """{símbolo: texto} de una respuesta con secciones "### SÍMBOLO"; solo los pedidos."""
+    parts = SECTION_RE.split(text)  # [antes, sym1, texto1, sym2, texto2, ...]
+    wanted = set(symbols)
+    return {
+        symbol: body.strip()
+        for symbol, body in zip(parts[1::2], parts[2::2])
+        if symbol in wanted and body.strip()
+    }
+
+
+def pack_groups(contexts: dict, pack: int, max_prompt_tokens: int = PACK_MAX_PROMPT_TOKENS) -> list:
+    """
+    Agrupa los símbolos (en orden) de `pack` en `pack`, cerrando antes el
+    grupo si el prompt conjunto se pasaría de max_prompt_tokens. Un símbolo
+    con contexto grande va solo.
+    """
+    groups, current, tokens = [], [], 0
+    for symbol, context in contexts.items():
+        cost = estimate_tokens(context)
+        if current and (len(current) >= pack or tokens + cost > max_prompt_tokens):
+            groups.append(current)
+            current, tokens = [], 0
+        current.append(symbol)
+        tokens += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+# -------------------------
+# Contexto (FMP)
+# -------------------------
+def fetch_contexts(symbols: list, workers: int = MAX_WORKERS):
+    """
+    Contexto de cada símbolo con las 3 consultas a FMP de todos los símbolos
+    en paralelo. Devuelve ({símbolo: contexto}, {símbolo: error}).
+    """
+    steps = (get_price_context, get_fundamentals_context, get_news_context)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {s: [pool.submit(step, s) for step in steps] for s in symbols}
+
+    contexts, errors = {}, {}
+    for symbol, parts in futures.items():
+        try:
+            contexts[symbol] = build_context(symbol, *[f.result() for f in parts])
+        except Exception as e:
+            errors[symbol] = str(e)
+    return contexts, errors
+
+
+# -------------------------
+# OpenAI
+# -------------------------
+def make_limiters(rpm: float = OPENAI_RPM, tpm: float = OPENAI_TPM):
+    """(limitador de peticiones, limitador de tokens) por minuto."""
+    requests_limiter = RateLimiter(rpm, burst=max(1, int(rpm * BURST_SECONDS / 60)))
+    tokens_limiter = RateLimiter(tpm, burst=max(1, int(tpm * BURST_SECONDS / 60)))
+    return requests_limiter, tokens_limiter
+
+
+def chat(client, prompt: str, max_tokens: int, limiters) -> dict:
+    """
+    Una petición a OpenAI respetando los dos límites (con caché y reintentos
+    ante 429). Devuelve content, tokens, latencia, espera y si vino de caché.
+    """
+    from openai import RateLimitError
+
+    messages = [{"role": "user", "content": prompt}]
+    params = {"max_tokens": max_tokens}
+    cached = llm_cache.lookup(OPENAI_MODEL, TEMPERATURE, messages, params=params)
+    if cached is not None:
+        return {"content": cached, "prompt_tokens": 0, "completion_tokens": 0,
+                "latency_s": 0.0, "wait_s": 0.0, "cached": True}
+
+    requests_limiter, tokens_limiter = limiters
+    cost = estimate_tokens(prompt) + max_tokens
+    waited = 0.0
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        t0 = time.perf_counter()
+        requests_limiter.acquire()
+        tokens_limiter.acquire(cost)
+        start = time.perf_counter()
+        waited += start - t0
+        try:
+            response = client.chat.completions.create(
+                model=OPENAI_MODEL, messages=messages, temperature=TEMPERATURE, max_tokens=max_tokens,
+            )
+        except RateLimitError as e:
+            retry_after = rate_limit.retry_after_seconds(e.response.headers.get("retry-after"))
+            # Rechazada: no ha gastado tokens (la petición sí cuenta para el RPM)
+            tokens_limiter.refund(cost)
+            requests_limiter.on_throttled(retry_after)
+            tokens_limiter.on_throttled(retry_after)
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            time.sleep(max(retry_after, rate_limit.backoff_delay(attempt, OPENAI_BACKOFF_BASE, OPENAI_BACKOFF_CAP)))
+            continue
+
+        latency = time.perf_counter() - start
+        usage = response.usage
+        used = usage.total_tokens if usage else cost
+        tokens_limiter.refund(max(0, cost - used))
+        requests_limiter.on_success()
+        tokens_limiter.on_success()
+
+        content = response.choices[0].message.content
+        llm_cache.store(OPENAI_MODEL, TEMPERATURE, messages, content, params=params)
+        return {
+            "content": content,
+            "prompt_tokens": usage.prompt_tokens if usage else estimate_tokens(prompt),
+            "completion_tokens": usage.completion_tokens if usage else estimate_tokens(content),
+            "latency_s": latency,
+            "wait_s": waited,
+            "cached": False,
+        }
+
+
+def share(total: int, weights: dict) -> dict:
+    """Reparte `total` tokens en proporción a los pesos (enteros que suman total)."""
+    whole = sum(weights.values()) or 1
+    out = {k: int(total * w / whole) for k, w in weights.items()}
+    if out:
+        first = next(iter(out))
+        out[first] += total - sum(out.values())
+    return out
+
+
+def ask_group(client, contexts: dict, symbols: list, limiters) -> dict:
+    """
+    Insights de un grupo de símbolos (uno o varios en el mismo prompt).
+    Devuelve {símbolo: fila del informe}; faltan los que no tengan sección.
+    """
+    if len(symbols) == 1:
+        symbol = symbols[0]
+        r = chat(client, build_prompt(contexts[symbol]), MAX_COMPLETION_TOKENS, limiters)
+        r["insights"] = r.pop("content")
+        return {symbol: {"symbol": symbol, "batch": 1, **r}}
+
+    r = chat(client, build_packed_prompt({s: contexts[s] for s in symbols}),
+             MAX_COMPLETION_TOKENS * len(symbols), limiters)
+    sections = split_sections(r["content"], symbols)
+    prompt_share = share(r["prompt_tokens"], {s: len(contexts[s]) for s in sections})
+    completion_share = share(r["completion_tokens"], {s: len(text) for s, text in sections.items()})
+    return {
+        s: {
+            "symbol": s,
+            "batch": len(symbols),
+            "insights": text,
+            "prompt_tokens": prompt_share[s],
+            "completion_tokens": completion_share[s],
+            "latency_s": r["latency_s"],
+            "wait_s": r["wait_s"],
+            "cached": r["cached"],
+        }
+        for s, text in sections.items()
+    }
+
+
+def run_batch(contexts: dict, pack: int = 1, workers: int = MAX_WORKERS,
+              rpm: float = OPENAI_RPM, tpm: float = OPENAI_TPM) -> dict:
+    """
+    Insights de todos los símbolos de `contexts` con hasta `workers`
+    peticiones a la vez. Devuelve {símbolo: fila} en el orden de contexts.
+    """
+    if not contexts:
+        return {}
+    # Reintentos solo aquí (avisando a los limitadores), no también dentro del cliente
+    client = make_openai_client().with_options(max_retries=0)
+    limiters = make_limiters(rpm, tpm)
+    results = {}
+
+    def run(groups):
+        def one(group):
+            try:
+                return ask_group(client, contexts, group, limiters)
+            except Exception as e:
+                return {s: {"symbol": s, "batch": len(group), "error": str(e)} for s in group}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(groups)))) as pool:
+            for rows in pool.map(one, groups):
+                results.update(rows)
+
+    run(pack_groups(contexts, max(1, pack)))
+    # Símbolos sin sección en una respuesta compartida: se piden de uno en uno
+    missing = [s for s in contexts if s not in results]
+    if missing:
+        run([[s] for s in missing])
+    return {s: results[s] for s in contexts}
+
+
+# -------------------------
+# Informe
+# -------------------------
+def brief_frame(rows: list) -> pd.DataFrame:
+    """Una fila por símbolo: insights, tokens, latencia, caché y error."""
+    columns = ["symbol", "batch", "cached", "prompt_tokens", "completion_tokens",
+               "latency_s", "wait_s", "error", "insights"]
+    df = pd.DataFrame(rows).reindex(columns=columns)
+    # Enteros con hueco (NaN) en los símbolos que fallan
+    return df.astype({"batch": "Int64", "cached": "boolean",
+                      "prompt_tokens": "Int64", "completion_tokens": "Int64"})
+
+
+def print_brief(df: pd.DataFrame):
+    for row in df.itertuples():
+        print(f"\n=== {row.symbol} ===")
+        print(f"❌ {row.error}" if pd.notna(row.error) else row.insights)
+
+    ok = df["error"].isna()
+    print(f"\n=== TOKENS Y LATENCIA ({int(ok.sum())}/{len(df)} símbolos OK) ===")
+    report = df.drop(columns=["insights"]).copy()
+    report["latency_s"] = report["latency_s"].round(2)
+    report["wait_s"] = report["wait_s"].round(2)
+    print(report.astype("object").fillna("").to_string(index=False))
+    print(f"Total tokens: {int(df['prompt_tokens'].sum())} prompt + "
+          f"{int(df['completion_tokens'].sum())} respuesta · "
+          f"en caché: {int(df['cached'].eq(True).sum())}")
+
+
+def main(symbols: list, pack: int = 1, workers: int = MAX_WORKERS,
+         rpm: float = OPENAI_RPM, tpm: float = OPENAI_TPM) -> pd.DataFrame:
+    t0 = time.perf_counter()
+    contexts, errors = fetch_contexts(symbols, workers)
+    t_context = time.perf_counter() - t0
+
+    results = run_batch(contexts, pack, workers, rpm, tpm)
+    rows = [results.get(s) or {"symbol": s, "error": errors[s]} for s in symbols]
+    df = brief_frame(rows)
+
+    print_brief(df)
+    print(f"Contexto FMP: {t_context:.2f} s · ChatGPT: {time.perf_counter() - t0 - t_context:.2f} s")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--pack", type=int, default=1, help="símbolos por prompt")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="peticiones a la vez")
+    parser.add_argument("--rpm", type=float, default=OPENAI_RPM)
+    parser.add_argument("--tpm", type=float, default=OPENAI_TPM)
+    args = parser.parse_args()
+
+    from profiling import start_profiling
+    start_profiling("insights_batch")
+    main([s.strip().upper() for s in args.symbols], args.pack, args.workers, args.rpm, args.tpm)
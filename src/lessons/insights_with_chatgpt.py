@@ -6,20 +6,23 @@ Genera insights financieros usando:
 - Financial Modeling Prep (datos reales)
 - ChatGPT (interpretación)
 
-Flujo:
-1) Precio (velas)
-2) Fundamentales
-3) Noticias
-4) Contexto -> ChatGPT -> Insights
+Flujo (por símbolo, como DAG: ver pipeline.py):
+1) Precio (velas), fundamentales y noticias, en paralelo
+2) Contexto -> ChatGPT -> Insights
+3) Excel
 
 Educativo. No es asesoramiento financiero.
 """
 
 import os
-import requests
+from functools import lru_cache
+
 import pandas as pd
-from openai import OpenAI
+
+import fmp_client
 from datetime import datetime
+from llm_cache import cached_chat
+from pipeline import MAX_CONCURRENCY, print_stage_report, run_pipeline
 
 os.environ.pop("SSLKEYLOGFILE", None)
 # ------------------------------------------------------------------
@@ -32,6 +35,9 @@ OPENAI_API_KEY = "your_api_key"
 # 🔐 FMP API Key
 FMP_API_KEY = "your_api_key"
 
+OPENAI_MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.3
+
 SYMBOL = "AAPL"
 BASE_URL = "https://financialmodelingprep.com/api/v3"
 
@@ -41,10 +47,8 @@ BASE_URL = "https://financialmodelingprep.com/api/v3"
 # ------------------------------------------------------------------
 
 def safe_get(url: str, params: dict) -> dict:
-    """GET robusto con timeout y errores claros."""
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    """GET robusto con timeout y errores claros (sesión compartida de fmp_client)."""
+    return fmp_client.get_json(url, params)
 
 
 # ------------------------------------------------------------------
@@ -99,10 +103,19 @@ def get_news_context(symbol: str) -> str:
 # CHATGPT
 # ------------------------------------------------------------------
 
-def generate_insights(context: str) -> str:
-    client = OpenAI(api_key=OPENAI_API_KEY)
+@lru_cache(maxsize=1)
+def make_openai_client():
+    """
+    Cliente de OpenAI del proceso: se crea la primera vez y se reutiliza
+    (con su pool de conexiones) en todas las llamadas, también entre hilos.
+    """
+    from openai import OpenAI  # import pesado: solo si hay que llamar a ChatGPT
+
+    return OpenAI(api_key=OPENAI_API_KEY)
+
 
-    prompt = f"""
+def build_prompt(context: str) -> str:
+    return f"""
 You are a financial analyst.
 You are NOT giving financial advice.
 
@@ -115,13 +128,15 @@ Context:
 {context}
 """.strip()
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3,
-    )
 
-    return response.choices[0].message.content
+def generate_insights(context: str) -> str:
+    prompt = build_prompt(context)
+
+    # Si el contexto no ha cambiado desde una ejecución reciente, la respuesta
+    # sale de la caché en disco (llm_cache.py) sin llamar a OpenAI
+    return cached_chat(make_openai_client, OPENAI_MODEL, [{"role": "user", "content": prompt}], TEMPERATURE)
+
+
 def export_to_excel(symbol, price, fundamentals, news, insights):
     df = pd.DataFrame(
         [{
@@ -141,16 +156,12 @@ def export_to_excel(symbol, price, fundamentals, news, insights):
 
 
 # ------------------------------------------------------------------
-# MAIN
+# PIPELINE
 # ------------------------------------------------------------------
 
-def main():
-    price = get_price_context(SYMBOL)
-    fundamentals = get_fundamentals_context(SYMBOL)
-    news = get_news_context(SYMBOL)
-
-    context = f"""
-Asset: {SYMBOL}
+def build_context(symbol: str, price: str, fundamentals: str, news: str) -> str:
+    return f"""
+Asset: {symbol}
 
 {price}
 
@@ -160,15 +171,41 @@ Fundamentals:
 {news}
 """.strip()
 
-    print("=== CONTEXT SENT TO CHATGPT ===")
-    print(context)
 
-    insights = generate_insights(context)
+def build_tasks(symbol: str) -> dict:
+    """
+    DAG de un símbolo (ver pipeline.py): las tres consultas a FMP en
+    paralelo -> ChatGPT -> Excel.
+    """
+    def insights(price, fundamentals, news):
+        return generate_insights(build_context(symbol, price, fundamentals, news))
 
+    return {
+        "price": (lambda: get_price_context(symbol), []),
+        "fundamentals": (lambda: get_fundamentals_context(symbol), []),
+        "news": (lambda: get_news_context(symbol), []),
+        "llm": (insights, ["price", "fundamentals", "news"]),
+        "excel": (lambda price, fundamentals, news, llm: export_to_excel(symbol, price, fundamentals, news, llm),
+                  ["price", "fundamentals", "news", "llm"]),
+    }
+
+
+def print_results(symbol: str, results: dict):
+    print("=== CONTEXT SENT TO CHATGPT ===")
+    print(build_context(symbol, results["price"], results["fundamentals"], results["news"]))
     print("\n=== CHATGPT INSIGHTS ===")
-    print(insights)
-    export_to_excel(SYMBOL, price, fundamentals, news, insights)
+    print(results["llm"])
+
+
+# ------------------------------------------------------------------
+# MAIN
+# ------------------------------------------------------------------
 
+def main(symbols: list = None, max_concurrency: int = MAX_CONCURRENCY):
+    records = run_pipeline(symbols or [SYMBOL], build_tasks, print_results, "insights", max_concurrency)
+    print_stage_report(records)
 
 if __name__ == "__main__":
+    from profiling import start_profiling
+    start_profiling("insights")
     main()
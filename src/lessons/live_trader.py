@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+live_trader.py
+Versión "servicio" del bot (tradin_bot_script5.py): un proceso asyncio que
+se queda en marcha y evalúa la estrategia una vez por sesión de mercado.
+
+Frente a lanzar el script con cron cada día:
+- Un solo arranque: intérprete, imports (pandas, alpaca-py) y TradingClient
+  se crean una vez y se reutilizan.
+- Velas y estado de las SMA (CrossoverSignal) viven en memoria: en cada
+  evaluación solo se piden y procesan las velas nuevas. El estado se guarda
+  en data/store/live_state_{símbolo}.json (distinto del bot con cron) y se
+  recupera al arrancar.
+- El calendario lo marca el reloj del bróker (get_clock): se evalúa
+  EVAL_OFFSET_MIN minutos después de cada cierre. Solo cuentan las velas de
+  sesiones ya cerradas (una evaluación en plena sesión no usa la vela de hoy)
+  y, si FMP aún no ha publicado la vela de la sesión que acaba de cerrar, se
+  reintenta cada RETRY_SECONDS hasta que aparezca. Al arrancar se espera
+  igual a la vela de la última sesión cerrada (calendario del bróker).
+- Ctrl+C / SIGTERM paran el servicio de forma limpia (se guarda el estado).
+
+Uso:
+python src/lessons/live_trader.py
+python src/lessons/live_trader.py --symbol MSFT --offset-min 20
+python src/lessons/live_trader.py --fast 10 --slow 30 --qty 5
+python src/lessons/live_trader.py --fake      # bróker falso, sin Alpaca
+
+DISCLAIMER: educativo, no asesoramiento financiero.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from audit_log import DecisionRecord
+from indicators import load_state, save_state
+from ohlcv_store import get_bars, get_recent_bars
+from tradin_bot_script5 import (
+    DAYS,
+    FAST,
+    QTY,
+    SLOW,
+    STATE_PATH,
+    SYMBOL,
+    advance_signal,
+    completed_bars,
+    get_position_qty,
+    get_trading_client,
+    last_completed_date,
+    place_market_order,
+)
+
+EVAL_OFFSET_MIN = int(os.getenv("LIVE_EVAL_OFFSET_MIN", "15"))  # minutos tras el cierre
+RETRY_SECONDS = int(os.getenv("LIVE_RETRY_SECONDS", "300"))     # reintento si falla una evaluación
+
+
+class BarNotReadyError(RuntimeError):
+    """FMP todavía no ha publicado la vela de la sesión que acaba de cerrar."""
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+
+
+# -------------------------
+# Calendario
+# -------------------------
+def next_evaluation(clock, offset_min: int = EVAL_OFFSET_MIN) -> datetime:
+    """
+    Próximo momento de evaluación: el siguiente cierre de sesión + offset.
+    (next_close de Alpaca ya salta fines de semana y festivos.)
+    """
+    return clock.next_close + timedelta(minutes=offset_min)
+
+
+def last_session_date(trading_client, clock):
+    """
+    Fecha de la última sesión ya cerrada según el calendario del bróker
+    (last_completed_date puede caer en fin de semana o festivo). None si
+    el calendario no devuelve ninguna.
+    """
+    from alpaca.trading.requests import GetCalendarRequest
+
+    until = last_completed_date(clock)
+    sessions = trading_client.get_calendar(GetCalendarRequest(start=until - timedelta(days=10), end=until))
+    return max((s.date for s in sessions), default=None)
+
+
+def seconds_until(when: datetime) -> float:
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+# -------------------------
+# Servicio
+# -------------------------
+class LiveTrader:
+    """Estado del servicio: cliente, velas en memoria y señal incremental."""
+
+    def __init__(self, trading_client, symbol: str = SYMBOL, fast: int = FAST, slow: int = SLOW,
+                 qty: int = QTY, days: int = DAYS):
+        self.trading = trading_client
+        self.symbol = symbol
+        self.fast = fast
+        self.slow = slow
+        self.qty = qty
+        self.days = days
+        self.bars = pd.DataFrame(columns=["date", "close"])
+        # Estado propio del servicio: el de tradin_bot_script5 (cron) va en otro fichero
+        self.state_path = STATE_PATH.with_name(f"live_state_{symbol}.json")
+        self.signal = load_state(self.state_path)  # advance_signal lo valida o lo reconstruye
+        self.last_order_date = None
+        self.stop_event = asyncio.Event()
+
+    # --- datos ---
+    def load_history(self) -> pd.DataFrame:
+        """Primer arranque: histórico reciente completo (advance_signal valida el estado guardado)."""
+        df = get_recent_bars(self.symbol, self.days)
+        if df.empty:
+            raise ValueError(f"No hay histórico para {self.symbol}.")
+        self.bars = df[["date", "close"]].copy()
+        return self.bars
+
+    def fetch_new_bars(self) -> pd.DataFrame:
+        """
+        Velas desde la última en memoria, incluida (el almacén pide a FMP solo
+        el hueco): si la última era provisional, se sustituye por la definitiva.
+        """
+        last = self.bars["date"].iloc[-1]
+        df = get_bars(self.symbol, last, datetime.now().date())
+        if df.empty:
+            return df
+        new = df[["date", "close"]]
+        kept = self.bars[self.bars["date"] < new["date"].iloc[0]]
+        self.bars = pd.concat([kept, new], ignore_index=True).tail(self.days).reset_index(drop=True)
+        return new
+
+    # --- decisión ---
+    def evaluate(self, clock, expected_date=None) -> int:
+        """
+        Una evaluación (síncrona, se ejecuta en un hilo para no bloquear el bucle).
+        Se guarda en el registro de auditoría con el tiempo de cada etapa.
+        clock: reloj del bróker (qué sesiones están cerradas); expected_date:
+        sesión que debe tener ya vela (BarNotReadyError si FMP no la tiene).
+        Devuelve la señal de la última vela cerrada (0 si no hay vela nueva).
+        """
+        rec = DecisionRecord("live", symbol=self.symbol, fast=self.fast, slow=self.slow)
+        try:
+            return self.decide(rec, clock, expected_date)
+        except Exception as e:
+            rec.error = rec.error or str(e)
+            raise
+        finally:
+            rec.write()
+
+    def decide(self, rec: DecisionRecord, clock, expected_date=None) -> int:
+        from alpaca.trading.enums import OrderSide  # ya cargado tras la primera evaluación
+
+        with rec.stage("fetch"):
+            self.load_history() if self.bars.empty else self.fetch_new_bars()
+        done = completed_bars(self.bars, last_completed_date(clock))
+        if done.empty or (expected_date and done["date"].iloc[-1].date() < expected_date):
+            raise BarNotReadyError(f"{self.symbol}: aún no hay vela del {expected_date}")
+
+        with rec.stage("signal"):
+            self.signal, sig, processed = advance_signal(self.signal, done, self.fast, self.slow)
+            save_state(self.state_path, self.signal)
+
+        last_date = self.signal.last_date
+        close = float(done["close"].iloc[-1])
+        rec.set(new_bars=processed, close=close, bar_date=last_date, signal=sig)
+        log(f"{self.symbol}: {processed} velas nuevas, último close {close:.2f} ({last_date}), señal {sig}")
+
+        if last_date == self.last_order_date:
+            # Ya actuamos sobre esta vela (p.ej. reintento tras un error)
+            return sig
+
+        if sig == 1 or sig == -1:
+            with rec.stage("position"):
+                pos_qty = get_position_qty(self.trading, self.symbol)
+            rec.set(position=pos_qty)
+            if sig == 1 and pos_qty == 0:
+                side, qty = OrderSide.BUY, self.qty
+            elif sig == -1 and pos_qty > 0:
+                side, qty = OrderSide.SELL, pos_qty
+            else:
+                return sig
+            with rec.stage("order"):
+                o = place_market_order(self.trading, self.symbol, side, qty)
+            rec.set(side=side.value, qty=qty, order_id=str(o.id))
+            log(f"-> {side.value.upper()} {qty} {self.symbol}: id={o.id}")
+            self.last_order_date = last_date
+        return sig
+
+    # --- bucle ---
+    async def sleep(self, seconds: float) -> bool:
+        """Espera `seconds` o hasta que se pida parar. True si hay que parar."""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self.stop_event.is_set()
+
+    async def run(self, offset_min: int = EVAL_OFFSET_MIN):
+        log(f"Servicio iniciado: {self.symbol} SMA {self.fast}/{self.slow}")
+
+        # Al arrancar se evalúa ya la última sesión cerrada (si el servicio
+        # arranca tras el cierre, espera a la vela de hoy); tras cada cierre,
+        # expected es la sesión cuya vela tiene que estar ya
+        pending, expected = True, None
+        while not self.stop_event.is_set():
+            try:
+                clock = await asyncio.to_thread(self.trading.get_clock)
+            except Exception as e:
+                log(f"⚠️ Sin reloj de mercado ({e}); reintento en {RETRY_SECONDS}s")
+                if await self.sleep(RETRY_SECONDS):
+                    break
+                continue
+
+            if pending:
+                try:
+                    if expected is None:
+                        expected = await asyncio.to_thread(last_session_date, self.trading, clock)
+                    await asyncio.to_thread(self.evaluate, clock, expected)
+                    pending = False
+                except BarNotReadyError as e:
+                    log(f"⏳ {e}; reintento en {RETRY_SECONDS}s")
+                    if await self.sleep(RETRY_SECONDS):
+                        break
+                    continue
+                except Exception as e:
+                    log(f"⚠️ Evaluación fallida ({e}); reintento en {RETRY_SECONDS}s")
+                    if await self.sleep(RETRY_SECONDS):
+                        break
+                    continue
+
+            when = next_evaluation(clock, offset_min)
+            log(f"Próxima evaluación: {when.astimezone().strftime('%Y-%m-%d %H:%M')}")
+            if await self.sleep(seconds_until(when)):
+                break
+            pending, expected = True, clock.next_close.date()
+
+        if self.signal is not None:
+            save_state(self.state_path, self.signal)
+        log("Servicio detenido.")
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def install_signal_handlers(trader: LiveTrader):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, trader.stop)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C llega como KeyboardInterrupt (ver main)
+            pass
+
+
+async def serve(trading_client, symbol: str, offset_min: int, fast: int = FAST, slow: int = SLOW, qty: int = QTY):
+    trader = LiveTrader(trading_client, symbol, fast, slow, qty, days=max(DAYS, slow + 10))
+    install_signal_handlers(trader)
+    await trader.run(offset_min)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot SMA crossover como servicio (una evaluación por sesión).")
+    parser.add_argument("--symbol", default=SYMBOL)
+    parser.add_argument("--offset-min", type=int, default=EVAL_OFFSET_MIN, help="minutos tras el cierre")
+    parser.add_argument("--fast", type=int, default=FAST)
+    parser.add_argument("--slow", type=int, default=SLOW)
+    parser.add_argument("--qty", type=int, default=QTY)
+    parser.add_argument("--fake", action="store_true", help="usar el bróker falso (fake_broker.py)")
+    args = parser.parse_args()
+
+    run_service(args.symbol.upper(), fake=args.fake, offset_min=args.offset_min,
+                fast=args.fast, slow=args.slow, qty=args.qty)
+
+
+def run_service(symbol: str = SYMBOL, fake: bool = False, offset_min: int = EVAL_OFFSET_MIN,
+                fast: int = FAST, slow: int = SLOW, qty: int = QTY):
+    """Arranca el servicio para un símbolo hasta Ctrl+C / SIGTERM."""
+    trading = get_trading_client(fake)
+    try:
+        asyncio.run(serve(trading, symbol, offset_min, fast, slow, qty))
+    except KeyboardInterrupt:
+        log("Servicio detenido.")
+
+
+if __name__ == "__main__":
+    from profiling import start_profiling
+    start_profiling("live_trader")
+    main()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+llm_cache.py
+Caché en disco (SQLite) de las respuestas de ChatGPT.
+
+La llamada a OpenAI es el paso más lento y el único que cuesta dinero. Si el
+contexto de un símbolo (precio, fundamentales, noticias) no ha cambiado
+desde la última ejecución, el prompt es idéntico y la respuesta guardada
+sirve igual.
+
+- Clave: hash SHA-256 de (modelo, temperatura, mensajes y el resto de
+  parámetros de la petición, p.ej. max_tokens). Cualquier cambio en el
+  prompt o en los parámetros da otra clave.
+- TTL: una respuesta caduca a las LLM_CACHE_TTL horas.
+- Tamaño: si la caché pasa de LLM_CACHE_MAX_MB, se borran primero las
+  respuestas usadas hace más tiempo (LRU).
+
+Uso:
+    content = cached_chat(make_client, "gpt-4o-mini", messages, temperature=0.3)
+
+make_client solo se llama si no hay respuesta guardada: con acierto no se
+importa ni se crea el cliente de OpenAI. A mano:
+    cached = lookup(model, temperature, messages, params={"max_tokens": 400})
+    if cached is None:
+        content = client.chat.completions.create(..., max_tokens=400).choices[0].message.content
+        store(model, temperature, messages, content, params={"max_tokens": 400})
+
+Variables de entorno (opcionales):
+LLM_CACHE_PATH=data/store/llm_cache.sqlite
+LLM_CACHE_TTL=24          # horas
+LLM_CACHE_MAX_MB=50
+LLM_CACHE=0               # desactiva la caché
+
+Estado de la caché:
+python src/lessons/llm_cache.py
+python src/lessons/llm_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / "data" / "store" / "llm_cache.sqlite"
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", DEFAULT_PATH))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "24")) * 3600
+MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1e6)
+ENABLED = os.getenv("LLM_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key       TEXT PRIMARY KEY,
+    model     TEXT NOT NULL,
+    content   TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+# Aciertos / fallos de este proceso
+stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def connect(path=None) -> sqlite3.Connection:
+    """Abre (y crea si hace falta) la base de datos de la caché."""
+    path = Path(path or CACHE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def cache_key(model: str, temperature: float, messages: list, params: dict = None) -> str:
+    """
+    Hash estable de la petición (mismos mensajes y parámetros -> misma clave).
+    params: resto de argumentos de chat.completions.create (max_tokens...).
+    """
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages, "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(name: str):
+    with _stats_lock:
+        stats[name] += 1
+
+
+# -------------------------
+# Lectura / escritura
+# -------------------------
+def lookup(model: str, temperature: float, messages: list, ttl: float = CACHE_TTL, path=None,
+           params: dict = None):
+    """Respuesta guardada para esta petición, o None si no hay o ha caducado."""
+    if not ENABLED:
+        return None
+    key = cache_key(model, temperature, messages, params)
+    now = time.time()
+
+    conn = connect(path)
+    try:
+        with conn:
+            row = conn.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] < ttl:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                _count("hits")
+                return row[0]
+            if row:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+    finally:
+        conn.close()
+    _count("misses")
+    return None
+
+
+def store(model: str, temperature: float, messages: list, content: str,
+          max_bytes: int = MAX_BYTES, ttl: float = CACHE_TTL, path=None, params: dict = None):
+    """Guarda la respuesta y aplica la política de tamaño/TTL."""
+    if not ENABLED or content is None:
+        return
+    key = cache_key(model, temperature, messages, params)
+    now = time.time()
+
+    conn = connect(path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, len(content.encode("utf-8")), now, now),
+            )
+            evict(conn, max_bytes, ttl, now)
+    finally:
+        conn.close()
+
+
+def evict(conn: sqlite3.Connection, max_bytes: int = MAX_BYTES, ttl: float = CACHE_TTL, now: float = None) -> int:
+    """
+    Borra las respuestas caducadas y, si aún se pasa de max_bytes, las
+    menos usadas recientemente. Devuelve cuántas se han borrado.
+    """
+    now = now or time.time()
+    removed = conn.execute("DELETE FROM responses WHERE created <= ?", (now - ttl,)).rowcount
+
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total > max_bytes:
+        # Recorremos de la más antigua (last_used) a la más reciente hasta liberar lo que sobra
+        to_free, keys = total - max_bytes, []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            keys.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        removed += len(keys)
+    return removed
+
+
+def cached_chat(make_client, model: str, messages: list, temperature: float, **kwargs) -> str:
+    """
+    chat.completions.create con caché: devuelve el texto de la respuesta,
+    de disco si la petición ya se hizo (y no ha caducado), de OpenAI si no.
+    """
+    content = lookup(model, temperature, messages, params=kwargs)
+    if content is not None:
+        return content
+
+    response = make_client().chat.completions.create(
+        model=model, messages=messages, temperature=temperature, **kwargs
+    )
+    content = response.choices[0].message.content
+    store(model, temperature, messages, content, params=kwargs)
+    return content
+
+
+def cache_info(path=None) -> dict:
+    conn = connect(path)
+    try:
+        n, size, oldest = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(created) FROM responses"
+        ).fetchone()
+    finally:
+        conn.close()
+    return {"entries": n, "mb": size / 1e6, "oldest_hours": (time.time() - oldest) / 3600 if oldest else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estado de la caché de respuestas de ChatGPT.")
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--clear", action="store_true", help="vaciar la caché")
+    args = parser.parse_args()
+
+    if args.clear:
+        conn = connect(args.path)
+        with conn:
+            conn.execute("DELETE FROM responses")
+        conn.close()
+        print("Caché vaciada.")
+    info = cache_info(args.path)
+    oldest = f"{info['oldest_hours']:.1f} h" if info["oldest_hours"] is not None else "—"
+    print(f"Respuestas: {info['entries']} · {info['mb']:.3f} MB · la más antigua: {oldest}")
+    print(f"TTL: {CACHE_TTL / 3600:.0f} h · máximo: {MAX_BYTES / 1e6:.0f} MB · ruta: {args.path or CACHE_PATH}")
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+metrics_panel.py
+Métricas financieras para muchos símbolos a la vez sobre un "panel" ancho
+(filas = fechas, columnas = símbolos).
+
+add_financial_metrics (script3) y add_basic_metrics (script4) trabajan con un
+símbolo cada vez: filtrar 2.000 tickers son 2.000 llamadas con su df.copy().
+Aquí cada métrica se calcula en una sola operación de pandas sobre todas
+las columnas.
+
+Métricas disponibles (lista configurable):
+- "return"          retorno diario (pct_change)
+- "sma_N"           media móvil simple de N días
+- "volatility_N"    desviación típica rolling de N días de los retornos
+- "cum_max"         máximo acumulado
+- "drawdown"        caída desde el máximo acumulado
+
+Ejemplo:
+    from fmp_async import fetch_historical_many
+    from metrics_panel import panel_from_frames, compute_panel_metrics
+
+    prices = panel_from_frames(fetch_historical_many(symbols, "2020-01-01", "2024-12-31"))
+    m = compute_panel_metrics(prices, ["return", "sma_50", "volatility_20", "drawdown"])
+    m["sma_50"]  # DataFrame fechas x símbolos
+"""
+
+import pandas as pd
+
+DEFAULT_METRICS = ["return", "sma_20", "sma_50", "volatility_20", "drawdown"]
+
+
+# -------------------------
+# Panel ancho <-> formato largo
+# -------------------------
+def to_wide(df: pd.DataFrame, value: str = "close", symbol_col: str = "symbol", date_col: str = "date") -> pd.DataFrame:
+    """Formato largo (date, symbol, close, ...) -> panel ancho fechas x símbolos."""
+    return df.pivot_table(index=date_col, columns=symbol_col, values=value, aggfunc="last").sort_index()
+
+
+def panel_from_frames(frames: dict, value: str = "close") -> pd.DataFrame:
+    """{symbol: DataFrame con columna date o índice date} -> panel ancho."""
+    series = {}
+    for symbol, df in frames.items():
+        if df.empty:
+            continue
+        s = df.set_index("date")[value] if "date" in df.columns else df[value]
+        series[symbol] = s
+    return pd.DataFrame(series).sort_index()
+
+
+def to_long(metrics: dict) -> pd.DataFrame:
+    """{métrica: panel ancho} -> DataFrame largo con columnas date, symbol y una por métrica."""
+    stacked = {name: panel.stack(future_stack=True) for name, panel in metrics.items()}
+    out = pd.DataFrame(stacked)
+    out.index.names = ["date", "symbol"]
+    return out.reset_index()
+
+
+# -------------------------
+# Cálculo
+# -------------------------
+def parse_metric(name: str):
+    """"sma_20" -> ("sma", 20); "drawdown" -> ("drawdown", None)."""
+    kind, _, window = name.rpartition("_")
+    if kind and window.isdigit():
+        return kind, int(window)
+    return name, None
+
+
+def compute_panel_metrics(prices: pd.DataFrame, metrics: list = None) -> dict:
+    """
+    Calcula las métricas pedidas para todos los símbolos del panel.
+
+    prices: panel ancho (fechas x símbolos) o DataFrame largo con columna symbol.
+    Devuelve {nombre_métrica: panel ancho}.
+    """
+    if "symbol" in prices.columns:
+        prices = to_wide(prices)
+    metrics = metrics or DEFAULT_METRICS
+
+    # Intermedios compartidos: se calculan una vez aunque varias métricas los usen
+    cache = {}
+
+    def returns():
+        if "return" not in cache:
+            cache["return"] = prices.pct_change(fill_method=None)
+        return cache["return"]
+
+    def cum_max():
+        if "cum_max" not in cache:
+            cache["cum_max"] = prices.cummax()
+        return cache["cum_max"]
+
+    out = {}
+    for name in metrics:
+        kind, window = parse_metric(name)
+        if kind == "return":
+            out[name] = returns()
+        elif kind == "sma" and window:
+            out[name] = prices.rolling(window).mean()
+        elif kind == "volatility" and window:
+            out[name] = returns().rolling(window).std()
+        elif kind == "cum_max":
+            out[name] = cum_max()
+        elif kind == "drawdown":
+            out[name] = prices / cum_max() - 1
+        else:
+            raise ValueError(f"Métrica desconocida: {name}")
+    return out
+
+
+# -------------------------
+# Un símbolo
+# -------------------------
+def basic_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Métricas del dashboard (add_basic_metrics de script4) para las velas de
+    un símbolo: retorno, SMA 20/50, volatilidad 20d, cum_max y drawdown.
+    Sin Streamlit ni caché, para poder usarla (y medirla) fuera del dashboard.
+    """
+    df = df.copy()
+    df["return"] = df["close"].pct_change()
+    df["sma_20"] = df["close"].rolling(20).mean()
+    df["sma_50"] = df["close"].rolling(50).mean()
+    df["volatility_20"] = df["return"].rolling(20).std()
+    df["cum_max"] = df["close"].cummax()
+    df["drawdown"] = (df["close"] - df["cum_max"]) / df["cum_max"]
+    return df
+
+
+def panel_kpis(prices: pd.DataFrame, vol_window: int = 20, metrics: dict = None) -> pd.DataFrame:
+    """
+    KPIs del dashboard para cada símbolo (una fila por símbolo):
+    last_price, total_return (%), max_drawdown (%), vol_N.
+    metrics: resultado de compute_panel_metrics ya calculado (opcional, para
+    reutilizarlo); debe incluir volatility_N y drawdown.
+    """
+    m = metrics or compute_panel_metrics(prices, [f"volatility_{vol_window}", "drawdown"])
+    first = prices.bfill().iloc[0]
+    last = prices.ffill().iloc[-1]
+    return pd.DataFrame({
+        "last_price": last,
+        "total_return": (last / first - 1) * 100,
+        "max_drawdown": m["drawdown"].min() * 100,
+        f"vol_{vol_window}": m[f"volatility_{vol_window}"].iloc[-1],
+    })
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+ohlcv_store.py
+Almacén local (SQLite) de velas diarias OHLCV con refresco incremental.
+
+En lugar de descargar todo el histórico en cada ejecución, guardamos las
+velas en disco (clave: símbolo + fecha) y recordamos qué rangos de fechas ya
+se pidieron a FMP. Al pedir un rango solo se descargan los huecos que faltan;
+el resto sale del disco. Ejemplos:
+- El bot diario pasa de descargar 120 velas a descargar 1.
+- Una descarga larga que se corta continúa donde se quedó.
+
+La vela de hoy nunca se marca como "cubierta" (puede no ser definitiva), así
+que se vuelve a pedir en la siguiente ejecución y se sobrescribe. Tampoco se
+cubre nada que FMP no haya devuelto: una respuesta vacía o de error (símbolo
+inválido, vela de ayer aún sin publicar a primera hora) no marca el rango, y
+en rangos recientes solo se cubre hasta la última vela recibida.
+
+Limitación: si FMP ajusta closes pasados (splits, correcciones), el almacén no
+lo detecta. Para volver a descargar un símbolo entero:
+    invalidate("AAPL")
+    python src/lessons fetch AAPL --refresh
+
+Variables de entorno (opcionales):
+OHLCV_STORE_PATH=data/store/ohlcv.sqlite
+"""
+
+import os
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from fmp_client import OHLCV_COLUMNS, call_fmp
+
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / "data" / "store" / "ohlcv.sqlite"
+STORE_PATH = Path(os.getenv("OHLCV_STORE_PATH", DEFAULT_PATH))
+
+# Un rango que acaba hace más de estos días ya es definitivo: se cubre entero
+# aunque sus últimos días no tengan velas (festivos)
+SETTLED_DAYS = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    open   REAL,
+    high   REAL,
+    low    REAL,
+    close  REAL,
+    volume INTEGER,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT NOT NULL,
+    start  TEXT NOT NULL,
+    end    TEXT NOT NULL,
+    PRIMARY KEY (symbol, start)
+);
+"""
+
+
+def connect(path=None) -> sqlite3.Connection:
+    """Abre (y crea si hace falta) la base de datos del almacén."""
+    path = Path(path or STORE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# -------------------------
+# Rangos de fechas
+# -------------------------
+def merge_ranges(ranges: list) -> list:
+    """Une rangos (start, end) solapados o contiguos. Fechas tipo date."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(covered: list, start: date, end: date) -> list:
+    """
+    Huecos de [start, end] que no están en `covered`.
+    Se descartan los huecos sin ningún día laborable (fines de semana).
+    """
+    gaps = []
+    cursor = start
+    for c_start, c_end in merge_ranges(covered):
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - timedelta(days=1)))
+        cursor = max(cursor, c_end + timedelta(days=1))
+    if cursor <= end:
+        gaps.append((cursor, end))
+
+    return [(a, b) for a, b in gaps if any((a + timedelta(days=i)).weekday() < 5 for i in range((b - a).days + 1))]
+
+
+def read_coverage(conn: sqlite3.Connection, symbol: str) -> list:
+    rows = conn.execute("SELECT start, end FROM coverage WHERE symbol = ?", (symbol,)).fetchall()
+    return [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in rows]
+
+
+def add_coverage(conn: sqlite3.Connection, symbol: str, start: date, end: date):
+    """Registra [start, end] como descargado y compacta los rangos del símbolo."""
+    merged = merge_ranges(read_coverage(conn, symbol) + [(start, end)])
+    conn.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
+    conn.executemany(
+        "INSERT INTO coverage (symbol, start, end) VALUES (?, ?, ?)",
+        [(symbol, s.isoformat(), e.isoformat()) for s, e in merged],
+    )
+
+
+# -------------------------
+# Lectura / escritura
+# -------------------------
+def upsert_bars(conn: sqlite3.Connection, symbol: str, historical: list):
+    """Inserta o reemplaza velas (lista de dicts tal como llegan de FMP)."""
+    conn.executemany(
+        "INSERT OR REPLACE INTO bars (symbol, date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (symbol, bar["date"][:10], bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"])
+            for bar in historical
+        ],
+    )
+
+
+def read_bars(conn: sqlite3.Connection, symbol: str, start: date, end: date) -> pd.DataFrame:
+    """Velas guardadas de un símbolo entre start y end, ordenadas por fecha."""
+    df = pd.read_sql_query(
+        "SELECT date, open, high, low, close, volume FROM bars "
+        "WHERE symbol = ? AND date BETWEEN ? AND ? ORDER BY date",
+        conn,
+        params=(symbol, start.isoformat(), end.isoformat()),
+    )
+    df["date"] = pd.to_datetime(df["date"])
+    return df[OHLCV_COLUMNS]
+
+
+def refresh(conn: sqlite3.Connection, symbol: str, start: date, end: date) -> int:
+    """
+    Descarga de FMP solo los huecos de [start, end] y los guarda.
+    Devuelve cuántas velas se han descargado.
+    """
+    today = date.today()
+    downloaded = 0
+    for gap_start, gap_end in missing_ranges(read_coverage(conn, symbol), start, end):
+        params = {"from": gap_start.isoformat(), "to": gap_end.isoformat()}
+        data = call_fmp(f"historical-price-full/{symbol}", params)
+        historical = data.get("historical", []) if isinstance(data, dict) else []
+        settled = gap_end < today - timedelta(days=SETTLED_DAYS)
+        if not historical:
+            # Error: no se marca nada, se volverá a pedir. Vacío: solo se marca
+            # si el rango ya es definitivo (p.ej. un hueco que son solo festivos)
+            if settled and isinstance(data, dict) and "Error Message" not in data:
+                with conn:
+                    add_coverage(conn, symbol, gap_start, gap_end)
+            continue
+        with conn:
+            upsert_bars(conn, symbol, historical)
+            # Hoy no cuenta como cubierto (la vela aún puede cambiar) y, en
+            # rangos recientes, tampoco lo posterior a la última vela recibida
+            last_bar = max(date.fromisoformat(bar["date"][:10]) for bar in historical)
+            covered_end = min(gap_end if settled else last_bar, today - timedelta(days=1))
+            if covered_end >= gap_start:
+                add_coverage(conn, symbol, gap_start, covered_end)
+        downloaded += len(historical)
+    return downloaded
+
+
+def invalidate(symbol: str, path=None) -> int:
+    """
+    Borra las velas y la cobertura de un símbolo (p.ej. tras un split o un
+    ajuste de closes pasados): la siguiente lectura lo descarga de nuevo.
+    Devuelve cuántas velas se han borrado.
+    """
+    conn = connect(path)
+    try:
+        with conn:
+            removed = conn.execute("DELETE FROM bars WHERE symbol = ?", (symbol,)).rowcount
+            conn.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
+    finally:
+        conn.close()
+    return removed
+
+
+def get_bars(symbol: str, start_date, end_date, path=None) -> pd.DataFrame:
+    """
+    Devuelve velas OHLCV (columna date + open/high/low/close/volume) entre
+    start_date y end_date, descargando de FMP solo lo que falte en disco.
+    """
+    start = pd.Timestamp(start_date).date()
+    end = min(pd.Timestamp(end_date).date(), date.today())
+
+    conn = connect(path)
+    try:
+        if start <= end:
+            refresh(conn, symbol, start, end)
+        return read_bars(conn, symbol, start, end)
+    finally:
+        conn.close()
+
+
+def get_recent_bars(symbol: str, bars: int, path=None) -> pd.DataFrame:
+    """
+    Últimas `bars` velas hasta hoy (equivalente a timeseries=bars en FMP).
+    Pide una ventana de calendario algo mayor para cubrir fines de semana y festivos.
+    """
+    end = date.today()
+    start = end - timedelta(days=int(bars * 7 / 5) + 10)
+    df = get_bars(symbol, start, end, path)
+    return df.tail(bars).reset_index(drop=True)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+param_sweep.py
+Búsqueda en rejilla de ventanas (FAST, SLOW) para la estrategia SMA crossover,
+repartida entre varios procesos.
+
+- Los símbolos se reparten en trozos; cada proceso recibe un trozo del panel.
+- Dentro de cada trozo, la media móvil de cada longitud de ventana se calcula
+  UNA vez y se reutiliza en todas las combinaciones que la usan.
+- Cada combinación se evalúa con backtest_panel (vectorizado sobre símbolos).
+
+Resultado: tabla ordenada (por defecto por Sharpe medio entre símbolos).
+
+Uso:
+python src/lessons/param_sweep.py AAPL MSFT NVDA --start 2010-01-01 --fast 5:50:5 --slow 20:200:10
+python src/lessons/param_sweep.py AAPL MSFT --fast 10,20,30 --slow 50,100 --workers 4 --per-symbol
+"""
+
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import pandas as pd
+
+from backtest import INITIAL_CASH, backtest_panel
+
+STAT_COLUMNS = ["total_return", "max_drawdown", "sharpe", "trades"]
+
+
+def parse_windows(spec: str) -> list:
+    """
+    "10,20,30" -> [10, 20, 30]
+    "5:50:5"   -> [5, 10, ..., 50]   (inicio:fin:paso, fin incluido)
+    """
+    if ":" in spec:
+        parts = [int(p) for p in spec.split(":")]
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) > 2 else 1
+        return list(range(start, stop + 1, step))
+    return [int(p) for p in spec.split(",") if p]
+
+
+def grid_pairs(fasts: list, slows: list) -> list:
+    """Combinaciones válidas (fast < slow)."""
+    return [(f, s) for f in fasts for s in slows if f < s]
+
+
+def sweep_chunk(prices: pd.DataFrame, pairs: list, qty: int = 1, initial_cash: float = INITIAL_CASH) -> pd.DataFrame:
+    """
+    Evalúa todas las combinaciones para un trozo de símbolos.
+    Devuelve formato largo: symbol, fast, slow + estadísticas.
+    """
+    windows = sorted({w for pair in pairs for w in pair})
+    smas = {w: prices.rolling(w).mean() for w in windows}  # una vez por ventana
+
+    frames = []
+    for fast, slow in pairs:
+        stats = backtest_panel(prices, fast, slow, qty, initial_cash, smas[fast], smas[slow])
+        stats.index.name = "symbol"
+        stats = stats.reset_index()
+        stats["fast"] = fast
+        stats["slow"] = slow
+        frames.append(stats)
+    return pd.concat(frames, ignore_index=True)
+
+
+def split_columns(prices: pd.DataFrame, chunk_size: int) -> list:
+    cols = list(prices.columns)
+    return [prices[cols[i:i + chunk_size]] for i in range(0, len(cols), chunk_size)]
+
+
+def run_sweep(
+    prices: pd.DataFrame,
+    fasts: list,
+    slows: list,
+    workers: int = None,
+    qty: int = 1,
+    initial_cash: float = INITIAL_CASH,
+    chunk_size: int = None,
+) -> pd.DataFrame:
+    """
+    Ejecuta la rejilla completa en un pool de procesos.
+    prices: panel ancho de cierres (fechas x símbolos).
+    Devuelve los resultados por símbolo y combinación (formato largo).
+    """
+    pairs = grid_pairs(fasts, slows)
+    if not pairs:
+        raise ValueError("No hay combinaciones válidas: cada FAST debe ser menor que algún SLOW.")
+
+    workers = workers or os.cpu_count() or 1
+    # Trozos pequeños (máx. 50 símbolos) para repartir bien la carga y limitar memoria
+    chunk_size = chunk_size or max(1, min(50, math.ceil(prices.shape[1] / (workers * 4))))
+    chunks = split_columns(prices, chunk_size)
+
+    if workers == 1 or len(chunks) == 1:
+        results = [sweep_chunk(chunk, pairs, qty, initial_cash) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(sweep_chunk, chunk, pairs, qty, initial_cash) for chunk in chunks]
+            results = [f.result() for f in futures]
+
+    return pd.concat(results, ignore_index=True)[["symbol", "fast", "slow"] + STAT_COLUMNS]
+
+
+def rank_params(results: pd.DataFrame, by: str = "sharpe") -> pd.DataFrame:
+    """Media de cada estadística entre símbolos por (fast, slow), ordenada de mejor a peor."""
+    table = results.groupby(["fast", "slow"])[STAT_COLUMNS].mean()
+    table["symbols"] = results.groupby(["fast", "slow"])["symbol"].nunique()
+    return table.sort_values(by, ascending=False).reset_index()
+
+
+if __name__ == "__main__":
+    from ohlcv_store import get_bars
+    from profiling import start_profiling
+
+    start_profiling("param_sweep")
+
+    parser = argparse.ArgumentParser(description="Grid search de FAST/SLOW en paralelo.")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--start", default="2010-01-01")
+    parser.add_argument("--end", default=str(date.today()))
+    parser.add_argument("--fast", default="5:50:5", help="lista '10,20' o rango 'inicio:fin:paso'")
+    parser.add_argument("--slow", default="20:200:10")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--qty", type=int, default=1)
+    parser.add_argument("--rank-by", default="sharpe", choices=STAT_COLUMNS)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--per-symbol", action="store_true", help="mostrar la mejor combinación de cada símbolo")
+    args = parser.parse_args()
+
+    panel = pd.DataFrame({s: get_bars(s, args.start, args.end).set_index("date")["close"] for s in args.symbols})
+    res = run_sweep(panel, parse_windows(args.fast), parse_windows(args.slow), args.workers, args.qty)
+
+    print(rank_params(res, args.rank_by).head(args.top).to_string(index=False))
+    if args.per_symbol:
+        best = res.sort_values(args.rank_by, ascending=False).groupby("symbol").head(1)
+        print("\nMejor combinación por símbolo:")
+        print(best.to_string(index=False))
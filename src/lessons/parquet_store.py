@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+parquet_store.py
+Almacenamiento columnar (Parquet o Feather/Arrow) para históricos de velas.
+
+Sustituye a los CSV de data/raw: con años de velas y miles de símbolos, leer
+CSV (parsear texto + convertir fechas) es lo que más tarda. Aquí guardamos
+ficheros tipados, particionados por símbolo y año:
+
+    data/parquet/<dataset>/symbol=AAPL/year=2024/data.parquet
+
+Lectura:
+- memory_map=True: el fichero se mapea en memoria en vez de copiarse.
+- Con Feather (Arrow IPC sin comprimir) la lectura es zero-copy.
+- columns=["close"]: solo se decodifica esa columna (proyección).
+
+Conversión de los CSV existentes:
+python src/lessons/parquet_store.py            # convierte data/raw/*.csv
+python src/lessons/parquet_store.py --format feather
+
+Variables de entorno (opcionales):
+PARQUET_STORE_DIR=data/parquet
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parents[2]
+STORE_DIR = Path(os.getenv("PARQUET_STORE_DIR", ROOT / "data" / "parquet"))
+RAW_DIR = ROOT / "data" / "raw"
+
+EXTENSIONS = {"parquet": "parquet", "feather": "feather"}
+
+# Columnas numéricas conocidas (velas de FMP y métricas de script3/script4)
+NUMERIC_COLUMNS = {
+    "open", "high", "low", "close", "volume", "adjClose", "unadjustedVolume", "vwap",
+    "change", "changePercent", "changeOverTime", "daily_return", "volatility_20",
+    "cum_max", "drawdown",
+}
+
+
+# -------------------------
+# Rutas y tipos
+# -------------------------
+def partition_path(dataset: str, symbol: str, year: int, fmt: str = "parquet", base_dir=None) -> Path:
+    base_dir = Path(base_dir or STORE_DIR)
+    return base_dir / dataset / f"symbol={symbol}" / f"year={year}" / f"data.{EXTENSIONS[fmt]}"
+
+
+def normalize_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deja `date` como columna datetime y tipos numéricos fijos:
+    precios/métricas float64 y volumen int64 (float64 si le faltan valores:
+    un hueco no se convierte en volumen 0).
+
+    Solo se convierten las columnas conocidas (NUMERIC_COLUMNS, que pueden
+    llegar como texto desde un CSV) y las que ya son numéricas; el resto
+    (label, símbolo...) se deja tal cual.
+    """
+    df = df.copy()
+    if "date" not in df.columns:
+        df = df.reset_index()  # date como índice (p.ej. get_ohlcv_df)
+    df["date"] = pd.to_datetime(df["date"])
+    for col in df.columns:
+        if col == "date":
+            continue
+        if col not in NUMERIC_COLUMNS and not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        if col == "volume" and values.notna().all():
+            df[col] = values.astype("int64")
+        else:
+            df[col] = values.astype("float64")
+    return df.sort_values("date").drop_duplicates("date", keep="last").reset_index(drop=True)
+
+
+# -------------------------
+# Escritura
+# -------------------------
+def write_partition(table: pa.Table, path: Path, fmt: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    if fmt == "feather":
+        # Sin compresión para que la lectura con memory map sea zero-copy
+        feather.write_feather(table, tmp, compression="uncompressed")
+    else:
+        pq.write_table(table, tmp, compression="snappy")
+    tmp.replace(path)  # escritura atómica: nunca queda un fichero a medias
+
+
+def write_bars(df: pd.DataFrame, symbol: str, dataset: str = "ohlcv", fmt: str = "parquet", base_dir=None) -> list:
+    """
+    Guarda un DataFrame de velas de un símbolo, una partición por año.
+    Si la partición ya existe se fusiona (las fechas nuevas sustituyen a las viejas).
+    Devuelve la lista de ficheros escritos.
+    """
+    df = normalize_types(df)
+    written = []
+    for year, part in df.groupby(df["date"].dt.year):
+        path = partition_path(dataset, symbol, int(year), fmt, base_dir)
+        if path.exists():
+            part = normalize_types(pd.concat([read_partition(path, fmt), part], ignore_index=True))
+        table = pa.Table.from_pandas(part.reset_index(drop=True), preserve_index=False)
+        write_partition(table, path, fmt)
+        written.append(path)
+    return written
+
+
+# -------------------------
+# Lectura
+# -------------------------
+def read_table(path: Path, fmt: str, columns: list = None) -> pa.Table:
+    """Lee una partición como tabla Arrow (memory map + proyección de columnas)."""
+    if fmt == "feather":
+        return feather.read_table(path, columns=columns, memory_map=True)
+    # ParquetFile evita el coste fijo de la API de datasets (importa con ficheros pequeños)
+    return pq.ParquetFile(path, memory_map=True).read(columns=columns, use_threads=False)
+
+
+def read_partition(path: Path, fmt: str, columns: list = None) -> pd.DataFrame:
+    return read_table(path, fmt, columns).to_pandas()
+
+
+def list_years(dataset: str, symbol: str, fmt: str = "parquet", base_dir=None) -> list:
+    folder = Path(base_dir or STORE_DIR) / dataset / f"symbol={symbol}"
+    if not folder.exists():
+        return []
+    return sorted(
+        int(p.name.split("=", 1)[1])
+        for p in folder.glob("year=*")
+        if (p / f"data.{EXTENSIONS[fmt]}").exists()
+    )
+
+
+def read_bars(
+    symbol: str,
+    start_date=None,
+    end_date=None,
+    columns: list = None,
+    dataset: str = "ohlcv",
+    fmt: str = "parquet",
+    base_dir=None,
+) -> pd.DataFrame:
+    """
+    Lee las velas de un símbolo (date + columnas pedidas) entre dos fechas.
+    Solo se abren los ficheros de los años necesarios y solo las columnas pedidas.
+    """
+    start = pd.Timestamp(start_date) if start_date else None
+    end = pd.Timestamp(end_date) if end_date else None
+    read_cols = ["date"] + [c for c in columns if c != "date"] if columns else None
+
+    tables = []
+    for year in list_years(dataset, symbol, fmt, base_dir):
+        if (start is not None and year < start.year) or (end is not None and year > end.year):
+            continue
+        tables.append(read_table(partition_path(dataset, symbol, year, fmt, base_dir), fmt, read_cols))
+
+    if not tables:
+        return pd.DataFrame(columns=read_cols or ["date"])
+
+    # Unimos y filtramos en Arrow; solo se convierte a pandas una vez al final.
+    # "permissive": un año con huecos de volumen (float64) se une a otro int64
+    table = pa.concat_tables(tables, promote_options="permissive")
+    if start is not None:
+        table = table.filter(pc.greater_equal(table["date"], pa.scalar(start, table.schema.field("date").type)))
+    if end is not None:
+        table = table.filter(pc.less_equal(table["date"], pa.scalar(end, table.schema.field("date").type)))
+    return table.to_pandas()
+
+
+def read_panel(symbols: list, column: str = "close", start_date=None, end_date=None, **kwargs) -> pd.DataFrame:
+    """Tabla ancha (fechas x símbolos) con una sola columna de cada símbolo."""
+    series = {}
+    for symbol in symbols:
+        df = read_bars(symbol, start_date, end_date, columns=[column], **kwargs)
+        if not df.empty:
+            series[symbol] = df.set_index("date")[column]
+    return pd.DataFrame(series).sort_index()
+
+
+# -------------------------
+# Conversión de CSV existentes
+# -------------------------
+def parse_csv_name(path: Path):
+    """
+    "AAPL_ohlcv_with_metrics.csv" -> ("AAPL", "ohlcv_with_metrics")
+    "AAPL_historical.csv"         -> ("AAPL", "historical")
+    """
+    symbol, _, dataset = path.stem.partition("_")
+    return symbol.upper(), dataset or "ohlcv"
+
+
+def convert_csv(path: Path, fmt: str = "parquet", base_dir=None) -> list:
+    """Convierte un CSV de velas a particiones columnar. Devuelve ficheros escritos."""
+    symbol, dataset = parse_csv_name(Path(path))
+    df = pd.read_csv(path)
+    return write_bars(df, symbol, dataset=dataset, fmt=fmt, base_dir=base_dir)
+
+
+def convert_all(raw_dir=RAW_DIR, fmt: str = "parquet", base_dir=None) -> list:
+    written = []
+    for path in sorted(Path(raw_dir).glob("*.csv")):
+        files = convert_csv(path, fmt, base_dir)
+        print(f"✅ {path.name} -> {len(files)} fichero(s) {fmt}")
+        written.extend(files)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte data/raw/*.csv a Parquet/Feather particionado.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--out-dir", default=STORE_DIR)
+    parser.add_argument("--format", choices=sorted(EXTENSIONS), default="parquet")
+    args = parser.parse_args()
+
+    convert_all(args.raw_dir, args.format, args.out_dir)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+pipeline.py
+Ejecutar un pipeline por símbolo como un grafo de tareas (DAG): cada tarea
+arranca en cuanto terminan las tareas de las que depende, así las que son
+independientes (p.ej. precio, fundamentales y noticias) van en paralelo.
+
+Un pipeline se describe con un dict:
+
+    tasks = {
+        "price": (lambda: get_price(symbol), []),
+        "news": (lambda: get_news(symbol), []),
+        "llm": (lambda price, news: ask_llm(price, news), ["price", "news"]),
+    }
+
+Cada función recibe los resultados de sus dependencias como argumentos con
+el mismo nombre. El tiempo de cada tarea queda en un DecisionRecord
+(audit_log.py), que se guarda en el registro de auditoría: así
+`python src/lessons/audit_log.py --bot alerts` da los percentiles por etapa.
+
+Para muchos símbolos, run_pipeline procesa hasta max_concurrency símbolos a
+la vez; el fallo de un símbolo no para a los demás.
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from audit_log import DecisionRecord, latency_report
+
+MAX_CONCURRENCY = 4
+
+_print_lock = threading.Lock()
+
+
+def run_dag(tasks: dict, pool: ThreadPoolExecutor, rec: DecisionRecord = None) -> dict:
+    """
+    Ejecuta las tareas en `pool` respetando sus dependencias.
+    Devuelve {nombre: resultado}. Si una tarea falla, no se lanzan las que
+    faltan y se relanza el error (las que ya estaban en marcha terminan).
+    """
+    for name, (_, deps) in tasks.items():
+        unknown = [d for d in deps if d not in tasks]
+        if unknown:
+            raise ValueError(f"Tarea {name}: dependencias desconocidas {unknown}")
+
+    def timed(name, fn, kwargs):
+        if rec is None:
+            return fn(**kwargs)
+        with rec.stage(name):
+            return fn(**kwargs)
+
+    results, running, pending = {}, {}, dict(tasks)
+    error = None
+    while pending or running:
+        if error is None:
+            for name, (fn, deps) in list(pending.items()):
+                if all(d in results for d in deps):
+                    running[pool.submit(timed, name, fn, {d: results[d] for d in deps})] = name
+                    del pending[name]
+        if not running:
+            if error is None:
+                raise ValueError(f"Dependencias circulares entre: {sorted(pending)}")
+            break
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                error = error or e
+
+    if error is not None:
+        raise error
+    return results
+
+
+def run_pipeline(symbols: list, build_tasks, on_done=None, bot: str = "pipeline",
+                 max_concurrency: int = MAX_CONCURRENCY) -> list:
+    """
+    Ejecuta el DAG de build_tasks(symbol) para cada símbolo, con como mucho
+    max_concurrency símbolos a la vez. on_done(symbol, results) se llama al
+    terminar cada símbolo (p.ej. para imprimir). Devuelve los registros.
+    """
+    # Un pool para los símbolos y otro para sus tareas: los símbolos esperan a
+    # sus tareas, así que no pueden compartir pool sin riesgo de bloquearse.
+    max_concurrency = max(1, min(max_concurrency, len(symbols)))
+    records = []
+
+    def run_one(symbol):
+        rec = DecisionRecord(bot, symbol=symbol)
+        try:
+            results = run_dag(build_tasks(symbol), task_pool, rec)
+            if on_done:
+                with _print_lock:
+                    on_done(symbol, results)
+        except Exception as e:
+            rec.error = rec.error or str(e)
+            with _print_lock:
+                print(f"❌ {symbol}: {rec.error}")
+        finally:
+            records.append(rec.write())
+
+    with ThreadPoolExecutor(max_workers=max_concurrency * 4) as task_pool, \
+            ThreadPoolExecutor(max_workers=max_concurrency) as symbol_pool:
+        list(symbol_pool.map(run_one, symbols))
+    return records
+
+
+def print_stage_report(records: list):
+    """Resumen de la ejecución: símbolos OK / con error y ms por etapa."""
+    errors = sum(1 for r in records if r.get("error"))
+    print(f"\n=== TIEMPOS POR ETAPA ({len(records) - errors}/{len(records)} símbolos OK) ===")
+    if records:
+        print(latency_report(records).to_string())
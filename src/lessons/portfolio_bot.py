@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+portfolio_bot.py
+Modo cartera del bot: la misma estrategia SMA crossover de
+tradin_bot_script5.py, pero para una lista de símbolos.
+
+Flujo:
+1) Velas de todos los símbolos en paralelo (almacén local + FMP solo lo nuevo).
+2) Señal de todos los símbolos en un solo paso vectorizado (signals.py),
+   solo con velas de sesiones ya cerradas (la de hoy, provisional, no entra);
+   si el panel tiene huecos, cada símbolo se calcula sobre sus propias velas.
+3) Todas las posiciones abiertas con UNA llamada (get_all_positions).
+4) Órdenes enviadas en paralelo; si una falla, las demás siguen.
+
+Uso:
+python src/lessons/portfolio_bot.py --symbols AAPL,MSFT,NVDA,TSLA
+python src/lessons/portfolio_bot.py --fake        # bróker falso, sin Alpaca
+
+Variables de entorno:
+FMP_API_KEY, ALPACA_API_KEY, ALPACA_SECRET_KEY
+BOT_WATCHLIST=AAPL,MSFT,NVDA,TSLA   (opcional)
+
+DISCLAIMER: educativo, no asesoramiento financiero.
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from audit_log import DecisionRecord
+from ohlcv_store import get_recent_bars
+from signals import last_signal, sma_crossover
+from tradin_bot_script5 import (
+    DAYS,
+    FAST,
+    QTY,
+    SLOW,
+    get_trading_client,
+    last_completed_date,
+    place_market_order,
+)
+
+WATCHLIST = [s.strip().upper() for s in os.getenv("BOT_WATCHLIST", "AAPL,MSFT,NVDA,TSLA").split(",") if s.strip()]
+MAX_WORKERS = 16
+
+
+# -------------------------
+# Datos y señales
+# -------------------------
+def load_closes(symbols: list, days: int, max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Cierres de todos los símbolos como panel ancho (fechas x símbolos).
+    Los símbolos que fallan se avisan y se omiten.
+    """
+    def fetch(symbol):
+        try:
+            return symbol, get_recent_bars(symbol, days)
+        except Exception as e:
+            print(f"⚠️ {symbol}: sin datos ({e})")
+            return symbol, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(fetch, symbols))
+
+    series = {s: df.set_index("date")["close"] for s, df in results if df is not None and not df.empty}
+    return pd.DataFrame(series).sort_index()
+
+
+def completed_closes(closes: pd.DataFrame, until) -> pd.DataFrame:
+    """Filas del panel de sesiones ya cerradas (date <= until), como completed_bars."""
+    return closes[closes.index.normalize() <= pd.Timestamp(until)]
+
+
+def evaluate_signals(closes: pd.DataFrame, fast: int, slow: int) -> pd.Series:
+    """
+    Señal de la última vela (1 / -1 / 0) de cada símbolo.
+
+    Sin huecos, todo el panel en un solo cálculo. El panel une las fechas de
+    todos los símbolos: si a uno le falta alguna (festivo propio, sin vela
+    hoy todavía), un NaN rompería sus SMA, así que ese símbolo se calcula
+    sobre su propia serie sin huecos y se toma su última vela.
+    """
+    if closes.empty:
+        return pd.Series(dtype="int8")
+    if not closes.isna().to_numpy().any():
+        return sma_crossover(closes, fast, slow).iloc[-1]
+    return pd.Series(
+        {symbol: last_signal(closes[symbol].dropna(), fast, slow) for symbol in closes.columns},
+        dtype="int8",
+    )
+
+
+def get_positions(trading_client) -> dict:
+    """{symbol: qty} de todas las posiciones abiertas (una sola llamada)."""
+    return {p.symbol: int(float(p.qty)) for p in trading_client.get_all_positions()}
+
+
+def plan_orders(signals: pd.Series, positions: dict, qty: int) -> list:
+    """Mismas reglas que el bot: BUY si señal 1 y plano; SELL todo si señal -1 y largo."""
+    from alpaca.trading.enums import OrderSide
+
+    orders = []
+    for symbol, signal in signals.items():
+        pos_qty = positions.get(symbol, 0)
+        if signal == 1 and pos_qty == 0:
+            orders.append((symbol, OrderSide.BUY, qty))
+        elif signal == -1 and pos_qty > 0:
+            orders.append((symbol, OrderSide.SELL, pos_qty))
+    return orders
+
+
+def submit_orders(trading_client, orders: list, max_workers: int = MAX_WORKERS) -> list:
+    """
+    Envía las órdenes en paralelo. Cada orden se aísla: un error no para
+    las demás. Devuelve una lista de dicts con el resultado de cada una.
+    """
+    def submit(order):
+        symbol, side, qty = order
+        try:
+            o = place_market_order(trading_client, symbol, side, qty)
+            return {"symbol": symbol, "side": side.value, "qty": qty, "id": str(o.id), "error": None}
+        except Exception as e:
+            return {"symbol": symbol, "side": side.value, "qty": qty, "id": None, "error": str(e)}
+
+    if not orders:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(orders))) as pool:
+        return list(pool.map(submit, orders))
+
+
+# -------------------------
+# Ejecución
+# -------------------------
+def run_portfolio(trading_client, symbols: list, fast: int = FAST, slow: int = SLOW,
+                  qty: int = QTY, days: int = DAYS, max_workers: int = MAX_WORKERS,
+                  closes: pd.DataFrame = None) -> dict:
+    """
+    Una pasada completa del bot para toda la lista (closes: panel ya cargado, opcional).
+    La decisión se guarda en el registro de auditoría (audit_log.py) con el tiempo de cada etapa.
+    """
+    rec = DecisionRecord("portfolio", symbols=len(symbols), fast=fast, slow=slow)
+    try:
+        with rec.stage("fetch"):
+            if closes is None:
+                closes = load_closes(symbols, days, max_workers)
+        with rec.stage("clock"):
+            until = last_completed_date(trading_client.get_clock())
+        closes = completed_closes(closes, until)
+        rec.set(until=until.isoformat())
+        with rec.stage("signal"):
+            signals = evaluate_signals(closes, fast, slow)
+        with rec.stage("position"):
+            positions = get_positions(trading_client)
+        orders = plan_orders(signals, positions, qty)
+        with rec.stage("order"):
+            results = submit_orders(trading_client, orders, max_workers)
+        rec.set(
+            evaluated=len(signals),
+            orders=[{k: r[k] for k in ("symbol", "side", "qty", "id", "error")} for r in results],
+        )
+        with rec.stage("account"):
+            account = trading_client.get_account()
+    except Exception as e:
+        rec.error = rec.error or str(e)
+        raise
+    finally:
+        rec.write()
+    return {"closes": closes, "signals": signals, "positions": positions, "orders": results, "account": account}
+
+
+def print_report(out: dict, n_symbols: int):
+    """Resumen de una pasada: señales, órdenes enviadas y estado de la cuenta."""
+    print(f"\nSímbolos evaluados: {len(out['signals'])}/{n_symbols}")
+    counts = out["signals"].value_counts().to_dict()
+    print(f"Señales: BUY={counts.get(1, 0)} SELL={counts.get(-1, 0)} HOLD={counts.get(0, 0)}")
+    for r in out["orders"]:
+        status = f"id={r['id']}" if r["error"] is None else f"ERROR: {r['error']}"
+        print(f"-> {r['side'].upper()} {r['qty']} {r['symbol']}: {status}")
+    if not out["orders"]:
+        print("-> No se ejecuta ninguna orden hoy.")
+
+    acct = out["account"]
+    print("\n--- Cuenta ---")
+    print(f"Equity: {acct.equity}")
+    print(f"Cash: {acct.cash}")
+    print(f"Buying power: {acct.buying_power}")
+
+
+def run_once(symbols: list, fake: bool = False, fast: int = FAST, slow: int = SLOW, qty: int = QTY,
+             max_workers: int = MAX_WORKERS) -> dict:
+    """Crea el cliente, carga los cierres, ejecuta una pasada e imprime el resumen."""
+    trading = get_trading_client(fake)
+
+    closes = load_closes(symbols, max(DAYS, slow + 10), max_workers)
+    if fake and not closes.empty:
+        # El bróker falso ejecuta al último cierre conocido
+        trading.prices.update(closes.ffill().iloc[-1].to_dict())
+
+    out = run_portfolio(trading, symbols, fast, slow, qty, max_workers=max_workers, closes=closes)
+    print_report(out, len(symbols))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot SMA crossover para una lista de símbolos.")
+    parser.add_argument("--symbols", default=",".join(WATCHLIST), help="lista separada por comas")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--fake", action="store_true", help="usar el bróker falso (fake_broker.py)")
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    run_once(symbols, fake=args.fake, max_workers=args.workers)
+
+
+if __name__ == "__main__":
+    from profiling import start_profiling
+    start_profiling("portfolio_bot")
+    main()
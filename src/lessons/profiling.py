@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+profiling.py
+Interruptor de perfilado para los scripts de las clases (desactivado por defecto).
+
+Se activa con la variable de entorno LESSONS_PROFILE:
+- LESSONS_PROFILE=cprofile     -> tiempo por función (cProfile)
+- LESSONS_PROFILE=tracemalloc  -> memoria: pico y líneas que más reservan
+
+Al terminar el script se imprime un resumen y se guarda el detalle en
+data/profiles/ (el .prof de cProfile se puede abrir con snakeviz).
+
+Uso en un script (una línea al principio del bloque __main__):
+    from profiling import start_profiling
+    start_profiling("script3")
+
+Ejemplo:
+LESSONS_PROFILE=cprofile python src/lessons/script3_visualizacion.py
+LESSONS_PROFILE=tracemalloc python src/lessons/backtest.py AAPL
+"""
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_MODE = os.getenv("LESSONS_PROFILE", "").strip().lower()
+PROFILE_DIR = Path(os.getenv("LESSONS_PROFILE_DIR", str(Path(__file__).resolve().parents[2] / "data" / "profiles")))
+TOP_N = int(os.getenv("LESSONS_PROFILE_TOP", "25"))
+
+
+def output_path(name: str, suffix: str) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    return PROFILE_DIR / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}{suffix}"
+
+
+def start_profiling(name: str, mode: str = None) -> bool:
+    """
+    Empieza a perfilar si LESSONS_PROFILE (o mode) lo pide; el informe sale al terminar
+    el proceso (atexit). Devuelve True si el perfilado quedó activo.
+    """
+    mode = (mode or PROFILE_MODE).lower()
+    if not mode:
+        return False
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        atexit.register(report_cprofile, profiler, name)
+    elif mode == "tracemalloc":
+        tracemalloc.start(25)
+        atexit.register(report_tracemalloc, name)
+    else:
+        print(f"⚠️ LESSONS_PROFILE={mode!r} no reconocido (usa cprofile o tracemalloc)")
+        return False
+    return True
+
+
+def report_cprofile(profiler: cProfile.Profile, name: str):
+    profiler.disable()
+    path = output_path(name, ".prof")
+    profiler.dump_stats(str(path))
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP_N)
+    print(f"\n===== cProfile: {name} (top {TOP_N} por tiempo acumulado) =====")
+    print(out.getvalue())
+    print(f"Detalle guardado en {path}")
+
+
+def report_tracemalloc(name: str):
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = snapshot.statistics("lineno")
+    path = output_path(name, ".txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"actual={current} pico={peak}\n")
+        for stat in stats[:200]:
+            f.write(f"{stat}\n")
+
+    print(f"\n===== tracemalloc: {name} =====")
+    print(f"Memoria actual: {current / 1e6:.1f} MB | pico: {peak / 1e6:.1f} MB")
+    print(f"Top {TOP_N} líneas por memoria reservada:")
+    for stat in stats[:TOP_N]:
+        print(f"  {stat}")
+    print(f"Detalle guardado en {path}")
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+quotes.py
+Servicio de cotizaciones (endpoint quote/{symbols}) con troceo y caché.
+
+- Listas largas de símbolos se parten en trozos que caben en una URL y los
+  trozos se piden en paralelo (con la sesión compartida de fmp_client).
+- Cada cotización se guarda unos segundos en memoria: si el dashboard o un
+  bucle de alertas vuelve a pedir el mismo ticker enseguida, no se llama a la API.
+
+Ejemplo:
+    from quotes import get_quotes_df
+    df = get_quotes_df(["AAPL", "MSFT", "TSLA"])
+
+Variables de entorno (opcionales):
+QUOTE_TTL=5                 # segundos que una cotización se considera fresca
+QUOTE_CHUNK_SIZE=50         # máximo de símbolos por petición
+QUOTE_MAX_WORKERS=4         # trozos pedidos a la vez
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from dotenv import load_dotenv
+
+from fmp_client import call_fmp
+
+load_dotenv()
+
+QUOTE_TTL = float(os.getenv("QUOTE_TTL", "5"))
+CHUNK_SIZE = int(os.getenv("QUOTE_CHUNK_SIZE", "50"))
+MAX_WORKERS = int(os.getenv("QUOTE_MAX_WORKERS", "4"))
+MAX_PATH_CHARS = 1500  # margen de sobra frente a los ~2000 que aceptan proxies/servidores
+
+_cache = {}  # symbol -> (timestamp, quote dict)
+_cache_lock = threading.Lock()
+
+
+def chunk_symbols(symbols: list, chunk_size: int = CHUNK_SIZE, max_chars: int = MAX_PATH_CHARS) -> list:
+    """
+    Parte la lista en trozos de como mucho `chunk_size` símbolos y cuya
+    ruta codificada ("AAPL,MSFT,...") no pase de `max_chars` caracteres.
+    """
+    chunks, current, length = [], [], 0
+    for symbol in symbols:
+        extra = len(quote(symbol, safe="")) + (3 if current else 0)  # ","  -> "%2C" en el peor caso
+        if current and (len(current) >= chunk_size or length + extra > max_chars):
+            chunks.append(current)
+            current, length = [], 0
+            extra = len(quote(symbol, safe=""))
+        current.append(symbol)
+        length += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def fetch_chunk(symbols: list) -> list:
+    """Una llamada a quote/ para un trozo de símbolos."""
+    data = call_fmp(f"quote/{','.join(symbols)}")
+    return data if isinstance(data, list) else []
+
+
+def get_quotes(symbols: list, ttl: float = QUOTE_TTL, max_workers: int = MAX_WORKERS) -> dict:
+    """
+    Devuelve {symbol: quote} usando la caché para los símbolos frescos y
+    pidiendo a FMP (en paralelo, por trozos) solo los que faltan.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))  # sin duplicados, mismo orden
+    now = time.monotonic()
+
+    result, missing = {}, []
+    with _cache_lock:
+        for symbol in symbols:
+            cached = _cache.get(symbol)
+            if cached and now - cached[0] < ttl:
+                result[symbol] = cached[1]
+            else:
+                missing.append(symbol)
+
+    if missing:
+        chunks = chunk_symbols(missing)
+        if len(chunks) == 1:
+            fetched = [fetch_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                fetched = list(pool.map(fetch_chunk, chunks))
+
+        stamp = time.monotonic()
+        with _cache_lock:
+            for rows in fetched:
+                for row in rows:
+                    symbol = str(row.get("symbol", "")).upper()
+                    _cache[symbol] = (stamp, row)
+                    result[symbol] = row
+
+    return {s: result[s] for s in symbols if s in result}
+
+
+def get_quote(symbol: str, ttl: float = QUOTE_TTL) -> dict:
+    """Cotización de un solo símbolo (pasa por la misma caché)."""
+    quotes = get_quotes([symbol], ttl=ttl)
+    if symbol.upper() not in quotes:
+        raise ValueError(f"FMP no devolvió cotización para {symbol}.")
+    return quotes[symbol.upper()]
+
+
+def get_quotes_df(symbols: list, ttl: float = QUOTE_TTL, max_workers: int = MAX_WORKERS) -> "pd.DataFrame":
+    """Cotizaciones como DataFrame, en el mismo orden que `symbols`."""
+    import pandas as pd  # solo aquí: get_quote / get_quotes no necesitan pandas
+
+    return pd.DataFrame(list(get_quotes(symbols, ttl, max_workers).values()))
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
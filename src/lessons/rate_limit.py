@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+rate_limit.py
+Limitador de peticiones para FMP: token bucket + presupuesto diario +
+backoff adaptativo cuando la API responde 429 (Too Many Requests).
+
+Idea:
+- El "cubo" se rellena a `rpm / 60` fichas por segundo. Cada petición gasta
+  una ficha; si no hay, espera lo justo hasta que la haya.
+- Si llega un 429, se baja el ritmo a la mitad y se respeta Retry-After.
+  Con cada respuesta correcta el ritmo vuelve a subir poco a poco hasta el
+  máximo configurado (aumento aditivo, reducción multiplicativa).
+- El presupuesto diario cuenta peticiones por día (UTC) dentro del proceso.
+- Una petición puede gastar más de una ficha (cost): así el mismo cubo sirve
+  para limitar tokens por minuto (p.ej. los de OpenAI en insights_batch.py).
+
+Variables de entorno (opcionales):
+FMP_RPM=300            # peticiones por minuto de tu plan
+FMP_BURST=10           # ráfaga máxima sin esperar
+FMP_DAILY_LIMIT=0      # 0 = sin límite diario
+FMP_MAX_RETRIES=5      # reintentos ante 429 / 5xx
+FMP_BACKOFF_BASE=1     # segundos (se duplica en cada intento, con jitter)
+FMP_BACKOFF_CAP=60     # espera máxima entre reintentos
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Reducción del ritmo ante un 429 y recuperación por cada respuesta correcta
+DECREASE_FACTOR = 0.5
+RECOVERY_STEP = 0.02  # fracción del ritmo máximo que se recupera por éxito
+MIN_RATE_FRACTION = 0.05
+
+
+class QuotaExceededError(RuntimeError):
+    """Se ha agotado el presupuesto diario de peticiones."""
+
+
+def retry_after_seconds(value) -> float:
+    """
+    Convierte la cabecera Retry-After (segundos o fecha HTTP) a segundos.
+    Devuelve 0 si no viene o no se entiende.
+    """
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Backoff exponencial con "full jitter": aleatorio entre 0 y base * 2^attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RateLimiter:
+    """
+    Token bucket seguro entre hilos (y usable desde asyncio con acquire_async).
+    """
+
+    def __init__(self, rpm: float, burst: int = 10, daily_limit: int = 0):
+        self.max_rate = rpm / 60.0  # fichas por segundo
+        self.rate = self.max_rate
+        self.min_rate = self.max_rate * MIN_RATE_FRACTION
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.daily_limit = daily_limit
+        self.day = None
+        self.used_today = 0
+        self.blocked_until = 0.0
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, cost: float = 1) -> float:
+        """
+        Reserva `cost` fichas y devuelve cuántos segundos hay que esperar antes
+        de hacer la petición. Lanza QuotaExceededError si no queda cuota diaria.
+        """
+        with self.lock:
+            today = datetime.now(timezone.utc).date()
+            if today != self.day:
+                self.day = today
+                self.used_today = 0
+            if self.daily_limit and self.used_today >= self.daily_limit:
+                raise QuotaExceededError(
+                    f"Presupuesto diario agotado ({self.daily_limit} peticiones). Vuelve a intentarlo mañana."
+                )
+            self.used_today += 1
+
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+            # Si no hay ficha, la "tomamos prestada": el saldo queda negativo y
+            # la espera es el tiempo que tarda en volver a cero.
+            self.tokens -= cost
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self, cost: float = 1):
+        wait = self.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, cost: float = 1):
+        wait = self.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def refund(self, amount: float):
+        """Devuelve fichas reservadas de más (p.ej. tokens estimados y no usados)."""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def on_success(self):
+        """Respuesta correcta: recuperamos ritmo poco a poco."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+    def on_throttled(self, retry_after: float = 0.0):
+        """Respuesta 429: bajamos el ritmo y bloqueamos hasta Retry-After."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                "rpm": round(self.rate * 60, 1),
+                "max_rpm": round(self.max_rate * 60, 1),
+                "used_today": self.used_today,
+                "daily_limit": self.daily_limit,
+            }
+
+
+# -------------------------
+# Limitador compartido (config desde .env)
+# -------------------------
+MAX_RETRIES = int(os.getenv("FMP_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("FMP_BACKOFF_BASE", "1"))
+BACKOFF_CAP = float(os.getenv("FMP_BACKOFF_CAP", "60"))
+
+limiter = RateLimiter(
+    rpm=float(os.getenv("FMP_RPM", "300")),
+    burst=int(os.getenv("FMP_BURST", "10")),
+    daily_limit=int(os.getenv("FMP_DAILY_LIMIT", "0")),
+)
+
+
+def retry_wait(attempt: int, status: int, retry_after_header) -> float:
+    """
+    Avisa al limitador del resultado y devuelve cuánto esperar antes del
+    siguiente intento (Retry-After manda si es mayor que el backoff).
+    """
+    retry_after = retry_after_seconds(retry_after_header)
+    if status == 429:
+        limiter.on_throttled(retry_after)
+    return max(retry_after, backoff_delay(attempt, BACKOFF_BASE, BACKOFF_CAP))
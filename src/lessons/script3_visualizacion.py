@@ -1,9 +1,11 @@
 import os
-import requests
 import pandas as pd
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
-import mplfinance as mpf
+from compact import COMPACT, compact_frame, memory_report
+from ohlcv_store import get_bars
+
+# matplotlib / mplfinance (y pyarrow para guardar) se importan dentro de las
+# funciones que dibujan: cargar datos o calcular métricas no los necesita.
 
 # =========================
 # 1) CONFIGURACIÓN
@@ -12,50 +14,42 @@ import mplfinance as mpf
 load_dotenv()
 API_KEY = os.getenv("FMP_API_KEY")
 
-BASE_URL = "https://financialmodelingprep.com/api/v3"
-
 
-def get_ohlcv_df(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+def get_ohlcv_df(symbol: str, start_date: str, end_date: str, compact: bool = COMPACT) -> pd.DataFrame:
     """
     Descarga datos OHLCV (open, high, low, close, volume) desde FMP y devuelve un DataFrame
     listo para usar con mplfinance.
 
     - Índice: date (datetime)
     - Columnas: open, high, low, close, volume
+    - compact=True: precios en float32 y volumen en el entero mínimo (compact.py)
     """
     if not API_KEY:
         raise ValueError("❌ No se encontró FMP_API_KEY. Revisa tu archivo .env (debe llamarse .env).")
 
-    params = {"from": start_date, "to": end_date, "apikey": API_KEY}
-    url = f"{BASE_URL}/historical-price-full/{symbol}"
-
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-
-    payload = r.json()
-    historical = payload.get("historical", [])
+    # Almacén local: solo se descargan de FMP las fechas que aún no tenemos en disco
+    df = get_bars(symbol, start_date, end_date)
 
-    if not historical:
+    if df.empty:
         raise ValueError("❌ No se recibieron datos. Revisa el símbolo o el rango de fechas.")
 
-    df = pd.DataFrame(historical)
-
-    # Convertimos y dejamos el formato que espera mplfinance
-    df["date"] = pd.to_datetime(df["date"])
+    # Dejamos el formato que espera mplfinance
     df = df.set_index("date").sort_index()
 
     # Nos quedamos con OHLCV en el orden correcto
     df = df[["open", "high", "low", "close", "volume"]]
 
-    return df
+    return compact_frame(df) if compact else df
 
 
-def add_financial_metrics(df: pd.DataFrame) -> pd.DataFrame:
+def add_financial_metrics(df: pd.DataFrame, compact: bool = COMPACT) -> pd.DataFrame:
     """
     Añade métricas típicas para visualización:
     - daily_return: retorno diario (% en decimal)
     - volatility_20: volatilidad rolling 20 días (std de retornos)
     - drawdown: caída desde máximos
+
+    compact=True: métricas en float32 y sin la columna auxiliar cum_max.
     """
     df = df.copy()
 
@@ -69,74 +63,117 @@ def add_financial_metrics(df: pd.DataFrame) -> pd.DataFrame:
     df["cum_max"] = df["close"].cummax()
     df["drawdown"] = (df["close"] - df["cum_max"]) / df["cum_max"]
 
-    return df
+    return compact_frame(df) if compact else df
+
 
+# Gráficos de línea: columna de add_financial_metrics, título y etiqueta del eje Y
+LINE_CHARTS = {
+    "returns": ("daily_return", "Retornos diarios", "Retorno (decimal)"),
+    "volatility": ("volatility_20", "Volatilidad rolling (20 días)", "Volatilidad (std)"),
+    "drawdown": ("drawdown", "Drawdown", "Drawdown (decimal)"),
+}
 
-def plot_candles_ohlcv(df: pd.DataFrame, symbol: str):
+# Posición [izq, abajo, ancho, alto] de los ejes de precio y de volumen en la figura de velas
+CANDLE_AXES = ([0.07, 0.36, 0.86, 0.56], [0.07, 0.14, 0.86, 0.2])
+
+
+def candle_style():
+    import mplfinance as mpf
+
+    return mpf.make_mpf_style(base_mpf_style="charles", rc={"font.size": 9})
+
+
+def draw_candles(ax, ax_volume, df: pd.DataFrame, symbol: str, style=None):
     """
-    Gráfico OHLCV con velas + volumen + medias móviles usando mplfinance.
+    Velas + volumen + medias móviles (mplfinance) sobre ejes ya creados.
+    Lo usan plot_candles_ohlcv y el render por lotes de chart_render.py.
     """
-    style = mpf.make_mpf_style(
-        base_mpf_style="charles",
-        rc={"font.size": 9}
-    )
+    import mplfinance as mpf
 
     mpf.plot(
-        df,
+        df[["open", "high", "low", "close", "volume"]],
         type="candle",
-        volume=True,
-        style=style,
-        title=f"{symbol} – OHLCV (Velas + Volumen)",
+        ax=ax,
+        volume=ax_volume,
+        style=style or candle_style(),
+        axtitle=f"{symbol} – OHLCV (Velas + Volumen)",
         ylabel="Precio",
         ylabel_lower="Volumen",
         mav=(20, 50),  # Medias móviles simples
-        figsize=(12, 6)
+        warn_too_much_data=len(df) + 1,  # rangos largos: sin el aviso de "demasiados datos"
     )
+    ax.tick_params(labelbottom=False)  # las fechas ya salen bajo el volumen
 
 
-def plot_daily_returns(df: pd.DataFrame, symbol: str):
+def draw_line_chart(ax, df: pd.DataFrame, symbol: str, chart: str):
+    """Un gráfico de LINE_CHARTS (retornos, volatilidad o drawdown) sobre ax."""
+    column, title, ylabel = LINE_CHARTS[chart]
+    values = df[column].dropna()
+
+    ax.plot(values.index, values.values)
+    ax.set_title(f"{symbol} – {title}")
+    ax.set_xlabel("Fecha")
+    ax.set_ylabel(ylabel)
+
+
+def show_or_save(fig, save_path: str = None):
+    """Sin save_path: ventana interactiva. Con save_path: guarda (PNG/SVG según extensión) y cierra."""
+    import matplotlib.pyplot as plt
+
+    if save_path:
+        fig.savefig(save_path)
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+def plot_candles_ohlcv(df: pd.DataFrame, symbol: str, save_path: str = None):
+    """
+    Gráfico OHLCV con velas + volumen + medias móviles usando mplfinance.
+    """
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(12, 6))
+    ax = fig.add_axes(CANDLE_AXES[0])
+    ax_volume = fig.add_axes(CANDLE_AXES[1], sharex=ax)
+    draw_candles(ax, ax_volume, df, symbol)
+    show_or_save(fig, save_path)
+
+
+def plot_daily_returns(df: pd.DataFrame, symbol: str, save_path: str = None):
     """
     Gráfico de retornos diarios.
     """
-    returns = df["daily_return"].dropna()
+    import matplotlib.pyplot as plt
 
-    plt.figure(figsize=(12, 4))
-    plt.plot(returns.index, returns.values)
-    plt.title(f"{symbol} – Retornos diarios")
-    plt.xlabel("Fecha")
-    plt.ylabel("Retorno (decimal)")
-    plt.tight_layout()
-    plt.show()
+    fig, ax = plt.subplots(figsize=(12, 4))
+    draw_line_chart(ax, df, symbol, "returns")
+    fig.tight_layout()
+    show_or_save(fig, save_path)
 
 
-def plot_rolling_volatility(df: pd.DataFrame, symbol: str):
+def plot_rolling_volatility(df: pd.DataFrame, symbol: str, save_path: str = None):
     """
     Volatilidad rolling 20 días (std de retornos).
     """
-    vol = df["volatility_20"].dropna()
+    import matplotlib.pyplot as plt
 
-    plt.figure(figsize=(12, 4))
-    plt.plot(vol.index, vol.values)
-    plt.title(f"{symbol} – Volatilidad rolling (20 días)")
-    plt.xlabel("Fecha")
-    plt.ylabel("Volatilidad (std)")
-    plt.tight_layout()
-    plt.show()
+    fig, ax = plt.subplots(figsize=(12, 4))
+    draw_line_chart(ax, df, symbol, "volatility")
+    fig.tight_layout()
+    show_or_save(fig, save_path)
 
 
-def plot_drawdown(df: pd.DataFrame, symbol: str):
+def plot_drawdown(df: pd.DataFrame, symbol: str, save_path: str = None):
     """
     Drawdown: caídas desde máximos acumulados.
     """
-    dd = df["drawdown"].dropna()
+    import matplotlib.pyplot as plt
 
-    plt.figure(figsize=(12, 4))
-    plt.plot(dd.index, dd.values)
-    plt.title(f"{symbol} – Drawdown")
-    plt.xlabel("Fecha")
-    plt.ylabel("Drawdown (decimal)")
-    plt.tight_layout()
-    plt.show()
+    fig, ax = plt.subplots(figsize=(12, 4))
+    draw_line_chart(ax, df, symbol, "drawdown")
+    fig.tight_layout()
+    show_or_save(fig, save_path)
 
 
 # =========================
@@ -144,6 +181,9 @@ def plot_drawdown(df: pd.DataFrame, symbol: str):
 # =========================
 
 if __name__ == "__main__":
+    from profiling import start_profiling
+    start_profiling("script3")
+
     SYMBOL = "AAPL"
     START = "2024-01-01"
     END = "2024-03-31"
@@ -153,6 +193,7 @@ if __name__ == "__main__":
 
     # 2) Añadir métricas financieras útiles (retornos, volatilidad, drawdown)
     df = add_financial_metrics(df)
+    print(memory_report({SYMBOL: df}).to_string(index=False))
 
     # 3) Gráfico pro: velas + volumen + MAs
     plot_candles_ohlcv(df, SYMBOL)
@@ -162,6 +203,8 @@ if __name__ == "__main__":
     plot_rolling_volatility(df, SYMBOL)
     plot_drawdown(df, SYMBOL)
 
-    # Extra: guardar CSV para siguientes clases (automatización / dashboard)
-    df.to_csv(f"{SYMBOL}_ohlcv_with_metrics.csv")
-    print(f"✅ Guardado: {SYMBOL}_ohlcv_with_metrics.csv")
+    # Extra: guardar en Parquet (tipado, por símbolo/año) para siguientes clases
+    from parquet_store import write_bars
+
+    files = write_bars(df, SYMBOL, dataset="ohlcv_with_metrics")
+    print(f"✅ Guardado: {files[-1].parent.parent}")
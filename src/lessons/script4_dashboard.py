@@ -1,101 +1,199 @@
 import os
-import requests
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 from datetime import date
 import plotly.graph_objects as go
+from compact import COMPACT, compact_frame, frame_memory
+from downsample import MAX_CHART_BARS, downsample_ohlcv, lttb_series
+from metrics_panel import basic_metrics, compute_panel_metrics, panel_from_frames, panel_kpis
+from ohlcv_store import get_bars
 
 # ======================
 # CONFIG
 # ======================
 load_dotenv()
 API_KEY = os.getenv("FMP_API_KEY")
-BASE_URL = "https://financialmodelingprep.com/api/v3"
 
-st.set_page_config(page_title="Dashboard Financiero", layout="wide")
-st.title("📊 Dashboard Financiero Interactivo (Python + APIs)")
+# Segundos que se reutilizan los datos descargados (compartidos entre usuarios)
+CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "900"))
 
-if not API_KEY:
-    st.error("❌ No se encontró FMP_API_KEY. Revisa tu archivo .env")
-    st.stop()
+SYMBOLS = ["AAPL", "MSFT", "TSLA", "NVDA"]
 
 
 # ======================
 # FUNCIONES
 # ======================
-def get_ohlcv(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-    """Descarga OHLCV desde la API y devuelve DataFrame."""
-    params = {"from": start_date, "to": end_date, "apikey": API_KEY}
-    url = f"{BASE_URL}/historical-price-full/{symbol}"
-
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-
-    historical = r.json().get("historical", [])
-    if not historical:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(historical)
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
-    return df[["date", "open", "high", "low", "close", "volume"]]
-
-
-def add_basic_metrics(df: pd.DataFrame) -> pd.DataFrame:
-    """Añade SMA 20/50, retorno, volatilidad 20d y drawdown."""
-    df = df.copy()
-    df["return"] = df["close"].pct_change()
-    df["sma_20"] = df["close"].rolling(20).mean()
-    df["sma_50"] = df["close"].rolling(50).mean()
-    df["volatility_20"] = df["return"].rolling(20).std()
-    df["cum_max"] = df["close"].cummax()
-    df["drawdown"] = (df["close"] - df["cum_max"]) / df["cum_max"]
-    return df
-
-
-def build_chart(df: pd.DataFrame, symbol: str, show_volume: bool) -> go.Figure:
-    """Crea velas interactivas + medias móviles + (opcional) volumen."""
+@st.cache_data(ttl=CACHE_TTL, show_spinner="Descargando datos...")
+def get_ohlcv(symbol: str, start_date: str, end_date: str, compact: bool = COMPACT) -> pd.DataFrame:
+    """
+    Descarga OHLCV desde la API (solo lo que falte en el almacén local) y devuelve DataFrame.
+    compact=True: float32 / enteros mínimos (menos memoria en la caché compartida).
+    """
+    df = get_bars(symbol, start_date, end_date)
+    return compact_frame(df) if compact else df
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=64)
+def add_basic_metrics(df: pd.DataFrame, compact: bool = COMPACT) -> pd.DataFrame:
+    """
+    Añade SMA 20/50, retorno, volatilidad 20d y drawdown.
+    Streamlit cachea el resultado por el contenido (hash) de df; el cálculo
+    es basic_metrics (metrics_panel.py).
+    compact=True: métricas en float32 y sin la columna auxiliar cum_max.
+    """
+    df = basic_metrics(df)
+    return compact_frame(df) if compact else df
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner="Descargando datos...")
+def get_closes_panel(symbols: tuple, start_date: str, end_date: str, compact: bool = COMPACT) -> pd.DataFrame:
+    """
+    Cierres de varios símbolos descargados a la vez (fmp_async: peticiones
+    concurrentes), como panel ancho fechas x símbolos. Los símbolos que
+    fallan se omiten.
+    """
+    from fmp_async import fetch_historical_many
+
+    frames = fetch_historical_many(list(symbols), start_date, end_date, columns=["date", "close"], raise_errors=False)
+    prices = panel_from_frames(frames)
+    return compact_frame(prices) if compact else prices
+
+
+def compare_metrics(prices: pd.DataFrame) -> dict:
+    """
+    Todo lo que muestra la vista de comparación, con UN cálculo sobre el
+    panel (metrics_panel) en vez de add_basic_metrics símbolo a símbolo:
+    KPIs por símbolo, rendimiento normalizado (base 100) y correlación de
+    los retornos diarios.
+    """
+    m = compute_panel_metrics(prices, ["return", "volatility_20", "drawdown"])
+    return {
+        "kpis": panel_kpis(prices, metrics=m),
+        "normalized": prices / prices.bfill().iloc[0] * 100,
+        "correlation": m["return"].corr(),
+    }
+
+
+def build_comparison_chart(normalized: pd.DataFrame) -> go.Figure:
+    """Una línea por símbolo, todas empezando en 100."""
+    fig = go.Figure()
+    for symbol in normalized.columns:
+        s = normalized[symbol].dropna()
+        fig.add_trace(go.Scatter(x=s.index, y=s.values, mode="lines", name=symbol))
+    fig.update_layout(
+        title="Rendimiento normalizado (base 100)",
+        xaxis_title="Fecha",
+        yaxis_title="Valor (inicio = 100)",
+        height=500,
+        margin=dict(l=20, r=20, t=60, b=20),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    )
+    return fig
+
+
+def build_correlation_chart(corr: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(
+        go.Heatmap(
+            z=corr.values,
+            x=list(corr.columns),
+            y=list(corr.index),
+            zmin=-1,
+            zmax=1,
+            colorscale="RdBu",
+            text=corr.round(2).values,
+            texttemplate="%{text}",
+        )
+    )
+    fig.update_layout(title="Correlación de retornos diarios", height=450, margin=dict(l=20, r=20, t=60, b=20))
+    return fig
+
+
+def render_comparison(symbols: list, start, end):
+    """Vista de comparación: fila de KPIs por símbolo, rendimiento y correlación."""
+    prices = get_closes_panel(tuple(symbols), str(start), str(end))
+    if prices.empty:
+        st.warning("No se recibieron datos para esos activos/fechas.")
+        st.stop()
+    missing = [s for s in symbols if s not in prices.columns]
+    if missing:
+        st.warning(f"Sin datos para: {', '.join(missing)}")
+
+    out = compare_metrics(prices)
+
+    # KPIs: una fila por símbolo
+    for symbol, row in out["kpis"].iterrows():
+        c0, c1, c2, c3, c4 = st.columns([1, 2, 2, 2, 2])
+        c0.subheader(symbol)
+        c1.metric("Precio actual", f"${row['last_price']:.2f}")
+        c2.metric("Retorno total", f"{row['total_return']:.2f}%")
+        c3.metric("Volatilidad (20d)", f"{row['vol_20']:.4f}" if pd.notna(row["vol_20"]) else "—")
+        c4.metric("Drawdown máx", f"{row['max_drawdown']:.2f}%")
+
+    st.divider()
+    st.plotly_chart(build_comparison_chart(out["normalized"]), use_container_width=True)
+    if prices.shape[1] > 1:
+        st.plotly_chart(build_correlation_chart(out["correlation"]), use_container_width=True)
+
+    with st.expander("📄 Ver cierres"):
+        st.dataframe(prices.tail(50), use_container_width=True)
+        st.caption(f"{prices.shape[1]} símbolos · {len(prices)} fechas · {frame_memory(prices) / 1e6:.2f} MB en memoria")
+
+
+def build_chart(df: pd.DataFrame, symbol: str, show_volume: bool, max_bars: int = None) -> go.Figure:
+    """
+    Crea velas interactivas + medias móviles + volumen.
+    El volumen siempre se añade; show_volume solo decide si se ve
+    (así la misma figura sirve para los dos valores del checkbox).
+
+    max_bars: si df tiene más velas, se agrupan en velas semanales/mensuales...
+    (OHLC correcto) y las medias se reducen con LTTB a max_bars puntos.
+    """
     fig = go.Figure()
+    bars, resolution = downsample_ohlcv(df, max_bars) if max_bars else (df, None)
 
     # Velas (OHLC)
     fig.add_trace(
         go.Candlestick(
-            x=df["date"],
-            open=df["open"],
-            high=df["high"],
-            low=df["low"],
-            close=df["close"],
+            x=bars["date"],
+            open=bars["open"],
+            high=bars["high"],
+            low=bars["low"],
+            close=bars["close"],
             name="OHLC",
         )
     )
 
-    # Medias móviles
-    fig.add_trace(go.Scatter(x=df["date"], y=df["sma_20"], mode="lines", name="SMA 20"))
-    fig.add_trace(go.Scatter(x=df["date"], y=df["sma_50"], mode="lines", name="SMA 50"))
+    # Medias móviles (calculadas con todas las velas diarias)
+    for col, name in [("sma_20", "SMA 20"), ("sma_50", "SMA 50")]:
+        x, y = lttb_series(df["date"], df[col], max_bars) if resolution else (df["date"], df[col])
+        fig.add_trace(go.Scatter(x=x, y=y, mode="lines", name=name))
 
     # Volumen (segundo eje)
-    if show_volume:
-        fig.add_trace(
-            go.Bar(
-                x=df["date"],
-                y=df["volume"],
-                name="Volumen",
-                yaxis="y2",
-                opacity=0.3,
-            )
+    fig.add_trace(
+        go.Bar(
+            x=bars["date"],
+            y=bars["volume"],
+            name="Volumen",
+            yaxis="y2",
+            opacity=0.3,
         )
-        fig.update_layout(
-            yaxis2=dict(
-                title="Volumen",
-                overlaying="y",
-                side="right",
-                showgrid=False,
-            )
+    )
+    fig.update_layout(
+        yaxis2=dict(
+            title="Volumen",
+            overlaying="y",
+            side="right",
+            showgrid=False,
         )
+    )
+    set_volume_visible(fig, show_volume)
 
+    title = f"{symbol} — OHLCV Interactivo"
+    if resolution:
+        title += f" (velas {resolution}: {len(df)} velas agrupadas en {len(bars)}; acerca el zoom para ver el detalle)"
     fig.update_layout(
-        title=f"{symbol} — OHLCV Interactivo",
+        title=title,
         xaxis_title="Fecha",
         yaxis_title="Precio",
         xaxis_rangeslider_visible=False,
@@ -107,46 +205,117 @@ def build_chart(df: pd.DataFrame, symbol: str, show_volume: bool) -> go.Figure:
     return fig
 
 
-# ======================
-# SIDEBAR
-# ======================
-st.sidebar.header("⚙️ Parámetros")
+def set_volume_visible(fig: go.Figure, show_volume: bool):
+    """Muestra u oculta la traza de volumen y su eje sin reconstruir la figura."""
+    fig.update_traces(visible=show_volume, selector=dict(name="Volumen"))
+    fig.update_layout(yaxis2_visible=show_volume)
+
 
-symbol = st.sidebar.selectbox("Activo", ["AAPL", "MSFT", "TSLA", "NVDA"])
-start = st.sidebar.date_input("Fecha inicio", date(2024, 1, 1))
-end = st.sidebar.date_input("Fecha fin", date.today())
+def get_chart(df: pd.DataFrame, symbol: str, data_key: tuple, show_volume: bool, max_bars: int = None) -> go.Figure:
+    """
+    Reutiliza la figura de la sesión mientras los datos no cambien
+    (p.ej. al marcar/desmarcar "Mostrar volumen").
+    """
+    cached = st.session_state.get("chart")
+    if cached is None or cached["key"] != data_key:
+        cached = {"key": data_key, "fig": build_chart(df, symbol, show_volume, max_bars)}
+        st.session_state["chart"] = cached
+
+    fig = cached["fig"]
+    set_volume_visible(fig, show_volume)
+    return fig
 
-show_volume = st.sidebar.checkbox("Mostrar volumen", value=True)
 
 # ======================
-# MAIN
+# APP
 # ======================
-df = get_ohlcv(symbol, str(start), str(end))
+def main():
+    st.set_page_config(page_title="Dashboard Financiero", layout="wide")
+    st.title("📊 Dashboard Financiero Interactivo (Python + APIs)")
+
+    if not API_KEY:
+        st.error("❌ No se encontró FMP_API_KEY. Revisa tu archivo .env")
+        st.stop()
+
+    # ----------------------
+    # SIDEBAR
+    # ----------------------
+    st.sidebar.header("⚙️ Parámetros")
+
+    mode = st.sidebar.radio("Modo", ["Un activo", "Comparar activos"], horizontal=True)
+    if mode == "Comparar activos":
+        symbols = st.sidebar.multiselect(
+            "Activos", SYMBOLS, default=SYMBOLS[:2], accept_new_options=True,
+            help="Elige de la lista o escribe otro símbolo.",
+        )
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    else:
+        symbol = st.sidebar.selectbox("Activo", SYMBOLS)
+    start = st.sidebar.date_input("Fecha inicio", date(2024, 1, 1))
+    end = st.sidebar.date_input("Fecha fin", date.today())
+
+    if mode == "Comparar activos":
+        if not symbols:
+            st.info("Elige al menos un activo en la barra lateral.")
+            st.stop()
+        render_comparison(symbols, start, end)
+        return
+
+    show_volume = st.sidebar.checkbox("Mostrar volumen", value=True)
+    max_bars = st.sidebar.number_input(
+        "Máx. velas en el gráfico", min_value=100, max_value=20_000, value=MAX_CHART_BARS, step=100,
+        help="Con más velas en el rango visible, se agrupan en semanas/meses para que el gráfico vaya fluido.",
+    )
+
+    # ----------------------
+    # MAIN
+    # ----------------------
+    df = get_ohlcv(symbol, str(start), str(end))
+
+    if df.empty:
+        st.warning("No se recibieron datos para ese rango/activo. Prueba otras fechas o símbolo.")
+        st.stop()
+
+    df = add_basic_metrics(df)
+
+    # KPIs
+    last_price = df["close"].iloc[-1]
+    total_return = (df["close"].iloc[-1] / df["close"].iloc[0] - 1) * 100
+    max_drawdown = df["drawdown"].min() * 100
+    vol_20 = df["volatility_20"].iloc[-1]
 
-if df.empty:
-    st.warning("No se recibieron datos para ese rango/activo. Prueba otras fechas o símbolo.")
-    st.stop()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Precio actual", f"${last_price:.2f}")
+    c2.metric("Retorno total", f"{total_return:.2f}%")
+    c3.metric("Volatilidad (20d)", f"{vol_20:.4f}" if pd.notna(vol_20) else "—")
+    c4.metric("Drawdown máx", f"{max_drawdown:.2f}%")
 
-df = add_basic_metrics(df)
+    st.divider()
 
-# KPIs
-last_price = df["close"].iloc[-1]
-total_return = (df["close"].iloc[-1] / df["close"].iloc[0] - 1) * 100
-max_drawdown = df["drawdown"].min() * 100
-vol_20 = df["volatility_20"].iloc[-1]
+    # Zoom: solo las velas del rango elegido. Si caben en max_bars se ven a
+    # resolución completa; si no, agrupadas (ver build_chart).
+    view = df
+    if len(df) > max_bars:
+        first, last = df["date"].iloc[0].date(), df["date"].iloc[-1].date()
+        zoom = st.slider("🔍 Zoom (rango visible)", min_value=first, max_value=last, value=(first, last),
+                         format="YYYY-MM-DD")
+        in_zoom = (df["date"] >= pd.Timestamp(zoom[0])) & (df["date"] < pd.Timestamp(zoom[1]) + pd.Timedelta(days=1))
+        view = df[in_zoom]
+    else:
+        zoom = None
 
-c1, c2, c3, c4 = st.columns(4)
-c1.metric("Precio actual", f"${last_price:.2f}")
-c2.metric("Retorno total", f"{total_return:.2f}%")
-c3.metric("Volatilidad (20d)", f"{vol_20:.4f}" if pd.notna(vol_20) else "—")
-c4.metric("Drawdown máx", f"{max_drawdown:.2f}%")
+    # Gráfico interactivo (la figura se reutiliza si solo cambian opciones de visualización)
+    data_key = (symbol, str(start), str(end), len(df), str(df["date"].iloc[-1]), zoom, max_bars)
+    fig = get_chart(view, symbol, data_key, show_volume, max_bars)
+    st.plotly_chart(fig, use_container_width=True)
 
-st.divider()
+    # Tabla
+    with st.expander("📄 Ver últimos datos"):
+        st.dataframe(df.tail(50), use_container_width=True)
+        st.caption(f"{len(df)} velas · {frame_memory(df) / 1e6:.2f} MB en memoria")
 
-# Gráfico interactivo
-fig = build_chart(df, symbol, show_volume)
-st.plotly_chart(fig, use_container_width=True)
 
-# Tabla
-with st.expander("📄 Ver últimos datos"):
-    st.dataframe(df.tail(50), use_container_width=True)
+# Streamlit ejecuta el script como __main__; importarlo (p.ej. desde los
+# benchmarks) solo define las funciones, sin dibujar la app.
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,37 @@
-import requests
 import os
 from dotenv import load_dotenv
+from fmp_client import call_fmp
+from quotes import get_quote
 load_dotenv()  # ahora SÍ encuentra el archivo .env
 # Cargamos la API key desde el archivo .env
 API_KEY = os.getenv("FMP_API_KEY")
 
-print(API_KEY)  # solo para comprobar en clase (luego se quita)
 
 
-BASE_URL = "https://financialmodelingprep.com/api/v3"
 
 def get_market_data(endpoint, params=None):
     """
     Llama a un endpoint de Market Data (Quote, Batch, etc.)
     """
-    if params is None:
-        params = {}
-
-    params["apikey"] = API_KEY
-    url = f"{BASE_URL}/{endpoint}"
-
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-
-    return response.json()
+    # La sesión HTTP compartida (fmp_client) reutiliza la conexión entre llamadas
+    return call_fmp(endpoint, params, api_key=API_KEY)
 
 def get_stock_quote(symbol):
     """
     Obtiene el precio actual de una acción.
     """
-    data = get_market_data(f"quote/{symbol}")
-    return data[0]  # FMP devuelve una lista con un elemento
+    # quotes.get_quote guarda la cotización unos segundos: pedirla otra vez no llama a la API
+    return get_quote(symbol)
 
 
+# La demo solo corre al ejecutar el script (importarlo no llama a la API)
+if __name__ == "__main__":
+    print(API_KEY)  # solo para comprobar en clase (luego se quita)
 
-quote = get_stock_quote("AAPL")
-print(quote)
+    quote = get_stock_quote("AAPL")
+    print(quote)
 
-print("Symbol:", quote["symbol"])
-print("Price:", quote["price"])
-print("Change %:", quote["changesPercentage"])
-print(quote["earningsAnnouncement"])
+    print("Symbol:", quote["symbol"])
+    print("Price:", quote["price"])
+    print("Change %:", quote["changesPercentage"])
+    print(quote["earningsAnnouncement"])
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+signals.py
+Señal SMA crossover vectorizada: se calcula para toda la serie (o para todas
+las columnas de un panel fechas x símbolos) en una sola pasada.
+
+Regla (la misma que usa el bot):
++1 = SMA_fast cruza por encima de SMA_slow en esa vela
+-1 = SMA_fast cruza por debajo de SMA_slow en esa vela
+ 0 = nada
+"""
+
+import pandas as pd
+
+
+def crossover_from_smas(sma_fast, sma_slow):
+    """
+    Señales 1 / -1 / 0 a partir de dos medias ya calculadas
+    (Series o DataFrames con la misma forma).
+    """
+    prev_fast = sma_fast.shift(1)
+    prev_slow = sma_slow.shift(1)
+
+    up = (prev_fast <= prev_slow) & (sma_fast > sma_slow)
+    down = (prev_fast >= prev_slow) & (sma_fast < sma_slow)
+    return up.astype("int8") - down.astype("int8")
+
+
+def sma_crossover(close, fast: int, slow: int):
+    """Señales para una Series de cierres o un panel ancho de cierres."""
+    return crossover_from_smas(close.rolling(fast).mean(), close.rolling(slow).mean())
+
+
+def last_signal(close: pd.Series, fast: int, slow: int) -> int:
+    """Señal de la última vela (lo que necesita el bot para decidir hoy)."""
+    signals = sma_crossover(close, fast, slow)
+    return int(signals.iloc[-1]) if len(signals) else 0
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+synthetic.py
+Datos sintéticos (sin API) para benchmarks, tests y demos:
+
+- synthetic_ohlcv: velas OHLCV aleatorias con columna date.
+- synthetic_panel: cierres de muchos símbolos (fechas x símbolos).
+- fmp_payload: las velas como respuesta JSON de historical-price-full.
+
+Deterministas: la misma semilla da siempre los mismos datos.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+PANEL_BARS = 1_000
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """
+    OHLCV aleatorio con columna date. Diario mientras quepa en el calendario
+    de pandas; para tamaños enormes, velas de 1 minuto.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.003, n_bars))
+    freq = "B" if n_bars <= 50_000 else "min"
+    return pd.DataFrame({
+        "date": pd.date_range("2000-01-03", periods=n_bars, freq=freq),
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.005,
+        "low": np.minimum(open_, close) * 0.995,
+        "close": close,
+        "volume": rng.integers(1_000_000, 90_000_000, n_bars),
+    })
+
+
+def fmp_payload(df: pd.DataFrame) -> bytes:
+    """Respuesta de historical-price-full (más reciente primero, campos extra incluidos)."""
+    out = df.iloc[::-1].copy()
+    out["date"] = out["date"].dt.strftime("%Y-%m-%d" if len(df) <= 50_000 else "%Y-%m-%d %H:%M:%S")
+    out["adjClose"] = out["close"]
+    out["unadjustedVolume"] = out["volume"]
+    out["change"] = out["close"] - out["open"]
+    out["changePercent"] = (out["close"] / out["open"] - 1) * 100
+    out["vwap"] = (out["high"] + out["low"] + out["close"]) / 3
+    out["label"] = "label"
+    out["changeOverTime"] = out["close"] / out["open"] - 1
+    return json.dumps({"symbol": "SYN", "historical": out.to_dict("records")}).encode()
+
+
+def synthetic_panel(n_symbols: int, n_bars: int = PANEL_BARS) -> pd.DataFrame:
+    """Cierres aleatorios de n_symbols símbolos (S00000, S00001...) en días laborables."""
+    rng = np.random.default_rng(n_symbols)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0))
+    return pd.DataFrame(values, index=pd.bdate_range("2015-01-01", periods=n_bars),
+                        columns=[f"S{i:05d}" for i in range(n_symbols)])
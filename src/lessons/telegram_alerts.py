@@ -2,11 +2,12 @@
 """
 pipeline_insights_telegram.py
 
-Pipeline completo (Clase 3):
-- FMP: velas + fundamentales + noticias
+Pipeline completo (Clase 3), por símbolo y como DAG (ver pipeline.py):
+- FMP: velas + fundamentales + noticias (en paralelo)
 - ChatGPT: genera insights
-- Excel: exporta resultados
-- Telegram: envía alerta con resumen
+- Excel: exporta resultados  } en paralelo
+- Telegram: envía alerta     }
+Con varios símbolos, se procesan varios a la vez (MAX_CONCURRENCY).
 
 Educativo. No es asesoramiento financiero.
 """
@@ -14,8 +15,12 @@ Educativo. No es asesoramiento financiero.
 from datetime import datetime
 import requests
 import pandas as pd
-from openai import OpenAI
+
+import fmp_client
 import os
+from functools import lru_cache
+from llm_cache import cached_chat
+from pipeline import MAX_CONCURRENCY, print_stage_report, run_pipeline
 os.environ.pop("SSLKEYLOGFILE", None)
 
 # ------------------------------------------------------------
@@ -31,6 +36,7 @@ FMP_BASE_URL = "https://financialmodelingprep.com/api/v3"
 # 🔐 OpenAI API Key (hardcodeada para simplificar la clase)
 OPENAI_API_KEY = "you_api_key"
 OPENAI_MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.3
 # 🔐 FMP API Key
 FMP_API_KEY = "your_api_key"
 
@@ -44,9 +50,8 @@ TELEGRAM_CHAT_ID = "438535917"
 # ------------------------------------------------------------
 
 def safe_get(url: str, params: dict):
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    # FMP: sesión compartida con pool keep-alive (fmp_client)
+    return fmp_client.get_json(url, params)
 
 def safe_post(url: str, data: dict):
     r = requests.post(url, data=data, timeout=30)
@@ -119,9 +124,15 @@ def get_news(symbol: str, limit: int = 3) -> str:
 # ChatGPT Insights
 # ------------------------------------------------------------
 
-def generate_insights(symbol: str, context: str) -> str:
-    client = OpenAI(api_key=OPENAI_API_KEY)
+@lru_cache(maxsize=1)
+def make_openai_client():
+    """Cliente de OpenAI del proceso: se crea una vez y se reutiliza."""
+    from openai import OpenAI  # import pesado: solo si hay que llamar a ChatGPT
+
+    return OpenAI(api_key=OPENAI_API_KEY)
 
+
+def generate_insights(symbol: str, context: str) -> str:
     prompt = f"""
 You are a finance analyst.
 You are NOT giving financial advice.
@@ -139,18 +150,18 @@ Context:
 {context}
 """.strip()
 
-    resp = client.chat.completions.create(
-        model=OPENAI_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3,
-    )
-    return resp.choices[0].message.content
+    # Contexto sin cambios desde una ejecución reciente -> respuesta de la caché (llm_cache.py)
+    return cached_chat(make_openai_client, OPENAI_MODEL, [{"role": "user", "content": prompt}], TEMPERATURE)
 
 
 # ------------------------------------------------------------
 # Excel Export
 # ------------------------------------------------------------
 
+def excel_filename(symbol: str) -> str:
+    return f"financial_insights_{symbol}.xlsx"
+
+
 def export_to_excel(symbol: str, price: str, fundamentals: str, news: str, insights: str) -> str:
     df = pd.DataFrame([{
         "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -161,7 +172,7 @@ def export_to_excel(symbol: str, price: str, fundamentals: str, news: str, insig
         "chatgpt_insights": insights
     }])
 
-    filename = f"financial_insights_{symbol}.xlsx"
+    filename = excel_filename(symbol)
     df.to_excel(filename, index=False)
     return filename
 
@@ -189,23 +200,19 @@ def build_telegram_message(symbol: str, price: str, insights: str, excel_filenam
         f"*Asset:* {symbol}\n\n"
         f"*Price:* {price}\n\n"
         f"*Insights:*\n{insights}\n\n"
-        f"✅ Excel generado: {excel_filename}"
+        # Se envía en paralelo con el Excel: aún no sabemos si se ha generado
+        # (si falla, build_tasks manda un segundo aviso)
+        f"📄 Excel: {excel_filename}"
     )
     return msg
 
 
 # ------------------------------------------------------------
-# Main
+# Pipeline
 # ------------------------------------------------------------
 
-def main():
-    # 1) Datos FMP
-    price = get_price_summary(SYMBOL, days=60)
-    fundamentals = get_fundamentals(SYMBOL)
-    news = get_news(SYMBOL, limit=3)
-
-    # 2) Contexto para ChatGPT
-    context = f"""
+def build_context(price: str, fundamentals: str, news: str) -> str:
+    return f"""
 {price}
 
 Fundamentals:
@@ -214,24 +221,59 @@ Fundamentals:
 {news}
 """.strip()
 
-    print("=== CONTEXT SENT TO CHATGPT ===")
-    print(context)
 
-    # 3) Insights
-    insights = generate_insights(SYMBOL, context)
+def build_tasks(symbol: str) -> dict:
+    """
+    DAG de un símbolo (ver pipeline.py):
+    1) Datos FMP: precio, fundamentales y noticias en paralelo
+    2) Insights con ChatGPT (necesita los tres)
+    3) Excel y Telegram en paralelo (el mensaje ya sabe el nombre del Excel;
+       si el Excel falla, se avisa con otro mensaje)
+    """
+    def insights(price, fundamentals, news):
+        return generate_insights(symbol, build_context(price, fundamentals, news))
+
+    def excel(price, fundamentals, news, llm):
+        try:
+            return export_to_excel(symbol, price, fundamentals, news, llm)
+        except Exception:
+            try:
+                send_telegram_message(f"⚠️ *{symbol}*: no se pudo generar el Excel {excel_filename(symbol)}")
+            except Exception as notify_error:
+                print(f"⚠️ No se pudo avisar del fallo del Excel por Telegram: {notify_error}")
+            raise
+
+    def telegram(price, llm):
+        send_telegram_message(build_telegram_message(symbol, price, llm, excel_filename(symbol)))
+
+    return {
+        "price": (lambda: get_price_summary(symbol, days=60), []),
+        "fundamentals": (lambda: get_fundamentals(symbol), []),
+        "news": (lambda: get_news(symbol, limit=3), []),
+        "llm": (insights, ["price", "fundamentals", "news"]),
+        "excel": (excel, ["price", "fundamentals", "news", "llm"]),
+        "telegram": (telegram, ["price", "llm"]),
+    }
+
 
+def print_results(symbol: str, results: dict):
+    print(f"=== CONTEXT SENT TO CHATGPT ({symbol}) ===")
+    print(build_context(results["price"], results["fundamentals"], results["news"]))
     print("\n=== CHATGPT INSIGHTS ===")
-    print(insights)
+    print(results["llm"])
+    print(f"\nExcel generado: {results['excel']}")
+    print("Mensaje enviado a Telegram ✅\n")
 
-    # 4) Export Excel
-    excel_file = export_to_excel(SYMBOL, price, fundamentals, news, insights)
-    print(f"\nExcel generado: {excel_file}")
 
-    # 5) Telegram
-    telegram_text = build_telegram_message(SYMBOL, price, insights, excel_file)
-    send_telegram_message(telegram_text)
-    print("\nMensaje enviado a Telegram ✅")
+# ------------------------------------------------------------
+# Main
+# ------------------------------------------------------------
 
+def main(symbols: list = None, max_concurrency: int = MAX_CONCURRENCY):
+    records = run_pipeline(symbols or [SYMBOL], build_tasks, print_results, "alerts", max_concurrency)
+    print_stage_report(records)
 
 if __name__ == "__main__":
+    from profiling import start_profiling
+    start_profiling("telegram_alerts")
     main()
@@ -1,15 +1,14 @@
 from dotenv import load_dotenv
-from openai import OpenAI
 import os
 os.environ.pop("SSLKEYLOGFILE", None)
 load_dotenv()
 
-from openai import OpenAI
-
 # PEGA AQUÍ TU API KEY (una sola línea, sin espacios)
 OPENAI_API_KEY = "YOUR_API_KEY"
 
 def main():
+    from openai import OpenAI  # import pesado: solo cuando de verdad se llama a la API
+
     client = OpenAI(api_key=OPENAI_API_KEY)
 
     response = client.chat.completions.create(
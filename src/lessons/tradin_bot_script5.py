@@ -16,49 +16,53 @@ DISCLAIMER: educativo, no asesoramiento financiero.
 """
 
 import os
-import requests
+from datetime import date, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
 import pandas as pd
 from dotenv import load_dotenv
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
+from ohlcv_store import get_recent_bars
+from indicators import CrossoverSignal, load_state, save_state
+from signals import last_signal
+from audit_log import DecisionRecord
+
+# alpaca-py tarda en importarse (~1 s): se importa dentro de las funciones que
+# hablan con el bróker, así los módulos que solo reutilizan la lógica de la
+# señal (backtest, benchmarks, portfolio_bot --fake...) no lo pagan.
+if TYPE_CHECKING:
+    from alpaca.trading.client import TradingClient
+    from alpaca.trading.enums import OrderSide
 
 load_dotenv()
 # -------------------------
 # Config mínima
 # -------------------------
 SYMBOL = "AAPL"
-DAYS = 120
-FAST = 20
-SLOW = 50
+# Ventanas de las medias: elígelas con param_sweep.py y ajústalas en .env si quieres
+FAST = int(os.getenv("BOT_FAST", "20"))
+SLOW = int(os.getenv("BOT_SLOW", "50"))
+DAYS = max(120, SLOW + 10)  # velas suficientes para que exista SMA_slow de ayer y de hoy
 QTY = 1  # súper simple: comprar/vender 1 acción
 
+# Estado de las medias móviles entre ejecuciones (ver indicators.py)
+STATE_PATH = Path(__file__).resolve().parents[2] / "data" / "store" / f"bot_state_{SYMBOL}.json"
+
 FMP_API_KEY = os.getenv("FMP_API_KEY")
 ALPACA_API_KEY = os.getenv("ALPACA_API_KEY")
 ALPACA_SECRET_KEY = os.getenv("ALPACA_SECRET_KEY")
 
-FMP_BASE = "https://financialmodelingprep.com/api/v3"
 os.environ.pop("SSLKEYLOGFILE", None)
 
 def get_daily_close(symbol: str, days: int) -> pd.DataFrame:
     """
     Descarga histórico diario desde FMP y devuelve DataFrame ordenado con date y close.
+    Usa el almacén local: en una ejecución diaria solo se descarga la vela nueva.
     """
-    url = f"{FMP_BASE}/historical-price-full/{symbol}"
-    params = {"timeseries": days, "apikey": FMP_API_KEY}
-
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    data = r.json()
+    df = get_recent_bars(symbol, days)
+    if df.empty:
+        raise ValueError(f"No hay histórico para {symbol}.")
 
-    hist = data.get("historical", [])
-    if not hist:
-        raise ValueError(f"No hay histórico para {symbol}. Respuesta: {data}")
-
-    df = pd.DataFrame(hist)[["date", "close"]].copy()
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date").reset_index(drop=True)
-    return df
+    return df[["date", "close"]].copy()
 
 
 def compute_signal(df: pd.DataFrame, fast: int, slow: int) -> int:
@@ -67,30 +71,77 @@ def compute_signal(df: pd.DataFrame, fast: int, slow: int) -> int:
     +1 = compra si SMA_fast cruza por encima de SMA_slow hoy
     -1 = venta si cruza por debajo hoy
      0 = nada
+
+    La señal se calcula vectorizada para toda la serie (signals.py, la misma
+    función que usa backtest.py) y nos quedamos con la de la última vela.
     """
-    df = df.copy()
-    df["sma_fast"] = df["close"].rolling(fast).mean()
-    df["sma_slow"] = df["close"].rolling(slow).mean()
+    return last_signal(df["close"], fast, slow)
 
-    df = df.dropna().reset_index(drop=True)
-    if len(df) < 2:
-        return 0
 
-    prev = df.iloc[-2]
-    last = df.iloc[-1]
+def last_completed_date(clock=None) -> date:
+    """
+    Última fecha cuyas velas ya son definitivas.
+    - Con el reloj del bróker (get_clock): si el mercado está abierto, la
+      sesión de hoy no ha cerrado -> ayer; si está cerrado, todo lo anterior
+      a la próxima apertura (después del cierre, hoy incluido).
+    - Sin reloj: ayer (la vela de hoy puede ser provisional).
+    """
+    if clock is None:
+        return date.today() - timedelta(days=1)
+    if clock.is_open:
+        return clock.timestamp.date() - timedelta(days=1)
+    return clock.next_open.date() - timedelta(days=1)
 
-    # Cruce alcista
-    if prev["sma_fast"] <= prev["sma_slow"] and last["sma_fast"] > last["sma_slow"]:
-        return 1
 
-    # Cruce bajista
-    if prev["sma_fast"] >= prev["sma_slow"] and last["sma_fast"] < last["sma_slow"]:
-        return -1
+def completed_bars(df: pd.DataFrame, until: date) -> pd.DataFrame:
+    """Solo las velas de sesiones ya cerradas (date <= until)."""
+    return df[df["date"].dt.date <= until]
 
-    return 0
 
+def advance_signal(state, df: pd.DataFrame, fast: int, slow: int):
+    """
+    Avanza el estado de las SMA con las velas de df posteriores a
+    state.last_date. Devuelve (estado, señal, velas procesadas); la señal es 0
+    si no hay vela nueva (no se repite el cruce de una ejecución anterior).
+
+    df debe traer solo velas definitivas (completed_bars) y ser continuo. El
+    estado se reconstruye con todo df si no sirve: primera vez, otras
+    ventanas, un hueco (df ya no contiene state.last_date) o un close
+    distinto para esa fecha (vela corregida o guardada provisional).
+    """
+    closes = dict(zip(df["date"].dt.strftime("%Y-%m-%d"), df["close"].astype(float)))
+    usable = (
+        isinstance(state, CrossoverSignal)
+        and (state.fast, state.slow) == (fast, slow)
+        and state.last_date in closes
+        and state.sma_slow.values
+        and abs(state.sma_slow.values[-1] - closes[state.last_date]) <= 1e-9 * abs(closes[state.last_date])
+    )
+    if not usable:
+        state = CrossoverSignal(fast, slow)
 
-def get_position_qty(trading_client: TradingClient, symbol: str) -> int:
+    processed = 0
+    for day, close in closes.items():
+        if state.last_date is None or day > state.last_date:
+            state.update(close, day)
+            processed += 1
+    return state, (state.last_signal if processed else 0), processed
+
+
+def compute_signal_incremental(df: pd.DataFrame, fast: int, slow: int, state_path, until: date = None) -> int:
+    """
+    Igual que compute_signal sobre las velas cerradas, pero guardando el
+    estado de las SMA en disco: solo se procesan las velas posteriores a la
+    última ya vista (O(1) por vela). until: última fecha definitiva
+    (last_completed_date); la vela de hoy, aún provisional, no entra.
+    """
+    df = completed_bars(df, until or last_completed_date())
+    state, signal, _ = advance_signal(load_state(state_path), df, fast, slow)
+    save_state(state_path, state)
+    return signal
+
+
+def get_position_qty(trading_client: "TradingClient", symbol: str) -> int:
     """
     Devuelve cantidad de la posición actual. Si no existe, 0.
     """
@@ -102,7 +153,10 @@ def get_position_qty(trading_client: TradingClient, symbol: str) -> int:
         return 0
 
 
-def place_market_order(trading_client: TradingClient, symbol: str, side: OrderSide, qty: int):
+def place_market_order(trading_client: "TradingClient", symbol: str, side: "OrderSide", qty: int):
+    from alpaca.trading.enums import TimeInForce
+    from alpaca.trading.requests import MarketOrderRequest
+
     order = MarketOrderRequest(
         symbol=symbol,
         qty=qty,
@@ -112,40 +166,76 @@ def place_market_order(trading_client: TradingClient, symbol: str, side: OrderSi
     return trading_client.submit_order(order_data=order)
 
 
-def main():
+def get_trading_client(fake: bool = False):
+    """
+    Cliente del bróker: Alpaca paper (paper=True) o, con fake=True, el bróker
+    falso en memoria de fake_broker.py. Comprueba antes las claves necesarias.
+    """
     if not FMP_API_KEY:
         raise RuntimeError("Falta FMP_API_KEY en variables de entorno.")
+    if fake:
+        from fake_broker import FakeTradingClient
+        return FakeTradingClient()
+
     if not ALPACA_API_KEY or not ALPACA_SECRET_KEY:
         raise RuntimeError("Faltan ALPACA_API_KEY y/o ALPACA_SECRET_KEY en variables de entorno.")
+    from alpaca.trading.client import TradingClient
 
     # Alpaca paper = paper=True
-    trading = TradingClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=True)
-
-    df = get_daily_close(SYMBOL, DAYS)
-    signal = compute_signal(df, FAST, SLOW)
+    return TradingClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=True)
 
-    pos_qty = get_position_qty(trading, SYMBOL)
 
-    print(f"\nSymbol: {SYMBOL}")
-    print(f"Último close: {df.iloc[-1]['close']:.2f}")
-    print(f"Posición actual: {pos_qty} acciones")
-    print(f"Señal: {signal} (1=BUY, -1=SELL, 0=HOLD)")
-
-    if signal == 1 and pos_qty == 0:
-        print(f"-> Enviando orden BUY {QTY} (paper)...")
-        o = place_market_order(trading, SYMBOL, OrderSide.BUY, QTY)
-        print(f"Orden enviada: id={o.id}")
+def main():
+    from alpaca.trading.enums import OrderSide
 
-    elif signal == -1 and pos_qty > 0:
-        # cerramos todo (simple)
-        print(f"-> Enviando orden SELL {pos_qty} (paper) para cerrar posición...")
-        o = place_market_order(trading, SYMBOL, OrderSide.SELL, pos_qty)
-        print(f"Orden enviada: id={o.id}")
+    trading = get_trading_client()
 
-    else:
-        print("-> No se ejecuta ninguna orden hoy.")
+    # Cada decisión queda en el registro de auditoría con el tiempo de cada etapa
+    rec = DecisionRecord("script5", symbol=SYMBOL, fast=FAST, slow=SLOW)
+    try:
+        with rec.stage("fetch"):
+            df = get_daily_close(SYMBOL, DAYS)
+        with rec.stage("clock"):
+            until = last_completed_date(trading.get_clock())
+        with rec.stage("signal"):
+            signal = compute_signal_incremental(df, FAST, SLOW, STATE_PATH, until)
+        with rec.stage("position"):
+            pos_qty = get_position_qty(trading, SYMBOL)
+        rec.set(close=float(df.iloc[-1]["close"]), bar_date=df.iloc[-1]["date"].strftime("%Y-%m-%d"),
+                signal=signal, position=pos_qty)
+
+        print(f"\nSymbol: {SYMBOL}")
+        print(f"Último close: {df.iloc[-1]['close']:.2f}")
+        print(f"Posición actual: {pos_qty} acciones")
+        print(f"Señal: {signal} (1=BUY, -1=SELL, 0=HOLD)")
+
+        if signal == 1 and pos_qty == 0:
+            print(f"-> Enviando orden BUY {QTY} (paper)...")
+            with rec.stage("order"):
+                o = place_market_order(trading, SYMBOL, OrderSide.BUY, QTY)
+            rec.set(side="buy", qty=QTY, order_id=str(o.id))
+            print(f"Orden enviada: id={o.id}")
+
+        elif signal == -1 and pos_qty > 0:
+            # cerramos todo (simple)
+            print(f"-> Enviando orden SELL {pos_qty} (paper) para cerrar posición...")
+            with rec.stage("order"):
+                o = place_market_order(trading, SYMBOL, OrderSide.SELL, pos_qty)
+            rec.set(side="sell", qty=pos_qty, order_id=str(o.id))
+            print(f"Orden enviada: id={o.id}")
+
+        else:
+            print("-> No se ejecuta ninguna orden hoy.")
+
+        with rec.stage("account"):
+            acct = trading.get_account()
+    except Exception as e:
+        # Fallos fuera de una etapa (p.ej. sin velas): que el registro no quede con error null
+        rec.error = rec.error or str(e)
+        raise
+    finally:
+        rec.write()
 
-    acct = trading.get_account()
     print("\n--- Cuenta (Alpaca Paper) ---")
     print(f"Equity: {acct.equity}")
     print(f"Cash: {acct.cash}")
@@ -153,4 +243,6 @@ def main():
 
 
 if __name__ == "__main__":
+    from profiling import start_profiling
+    start_profiling("script5")
     main()
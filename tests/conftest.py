@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Los scripts de src/lessons se importan entre sí como módulos sueltos
+(`from fmp_client import ...`), así que los tests ponen esa carpeta en sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "lessons"))
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Señal incremental del bot (tradin_bot_script5) frente a la vectorizada."""
+
+import json
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import CrossoverSignal, load_state, save_state
+from tradin_bot_script5 import compute_signal, compute_signal_incremental
+
+FAST, SLOW = 5, 12
+
+
+def make_bars(n: int = 160) -> pd.DataFrame:
+    """Cierres con ondas: hay cruces en las dos direcciones."""
+    dates = pd.bdate_range("2024-01-01", periods=n)
+    close = 100 + 10 * np.sin(np.arange(n) / 6) + np.arange(n) * 0.05
+    return pd.DataFrame({"date": dates, "close": close})
+
+
+def day(df: pd.DataFrame, i: int):
+    return df["date"].iloc[i].date()
+
+
+def test_incremental_matches_vectorized_with_refetched_same_day_bar(tmp_path):
+    bars = make_bars()
+    state_path = tmp_path / "state.json"
+    signals = []
+
+    for k in range(SLOW + 5, len(bars)):
+        # Vela de hoy (k) aún provisional: el almacén la trae con otro close
+        provisional = bars.iloc[: k + 1].copy()
+        provisional.loc[provisional.index[-1], "close"] += 7.5
+        until = day(bars, k - 1)
+
+        # Dos ejecuciones en el mismo día (vela de hoy re-descargada con otro close)
+        first = compute_signal_incremental(provisional, FAST, SLOW, state_path, until)
+        provisional.loc[provisional.index[-1], "close"] -= 3.0
+        second = compute_signal_incremental(provisional, FAST, SLOW, state_path, until)
+
+        expected = compute_signal(bars.iloc[:k], FAST, SLOW)
+        assert first == expected
+        assert second == 0  # sin vela nueva no se repite el cruce
+        signals.append(first)
+
+    assert {1, -1} <= set(signals)
+
+
+def test_rebuilds_after_gap_larger_than_window(tmp_path):
+    bars = make_bars()
+    state_path = tmp_path / "state.json"
+    compute_signal_incremental(bars.iloc[:60], FAST, SLOW, state_path, day(bars, 59))
+
+    # Varios días sin ejecutar: la ventana descargada ya no llega a la última vela vista
+    window = bars.iloc[100:150]
+    for k in range(len(window) - 20, len(window)):
+        got = compute_signal_incremental(window.iloc[: k + 1], FAST, SLOW, state_path, day(window, k))
+        assert got == compute_signal(window.iloc[: k + 1], FAST, SLOW)
+
+
+def test_state_with_stale_close_is_rebuilt(tmp_path):
+    """Un estado guardado con un close provisional (o corregido después) no se arrastra."""
+    bars = make_bars()
+    state_path = tmp_path / "state.json"
+    stale = CrossoverSignal(FAST, SLOW)
+    for row in bars.iloc[:80].itertuples(index=False):
+        stale.update(float(row.close) + (9.0 if row.date == bars["date"].iloc[79] else 0.0),
+                     row.date.strftime("%Y-%m-%d"))
+    save_state(state_path, stale)
+
+    for k in range(80, 100):
+        got = compute_signal_incremental(bars.iloc[: k + 1], FAST, SLOW, state_path, day(bars, k))
+        assert got == compute_signal(bars.iloc[: k + 1], FAST, SLOW)
+
+
+def test_default_cutoff_excludes_today(tmp_path):
+    """Sin reloj del bróker, la vela de hoy (provisional) no entra en el estado."""
+    bars = make_bars(40)
+    today = pd.Timestamp.today().normalize()
+    bars["date"] = pd.date_range(end=today, periods=len(bars))
+    compute_signal_incremental(bars, FAST, SLOW, tmp_path / "state.json")
+    assert load_state(tmp_path / "state.json").last_date == str((today - timedelta(days=1)).date())
+
+
+def test_main_records_error_raised_outside_a_stage(tmp_path, monkeypatch):
+    import audit_log
+    import tradin_bot_script5 as bot
+    from fake_broker import FakeTradingClient
+
+    audit_path = tmp_path / "audit.jsonl"
+    monkeypatch.setattr(audit_log, "AUDIT_LOG_PATH", audit_path)
+    monkeypatch.setattr(bot, "STATE_PATH", tmp_path / "state.json")
+    monkeypatch.setattr(bot, "get_trading_client", lambda fake=False: FakeTradingClient())
+    # Sin velas: la señal (0) sale bien, pero df.iloc[-1] falla fuera de las etapas
+    monkeypatch.setattr(bot, "get_daily_close",
+                        lambda symbol, days: make_bars().iloc[:0])
+
+    with pytest.raises(IndexError):
+        bot.main()
+
+    record = json.loads(audit_path.read_text(encoding="utf-8").splitlines()[-1])
+    assert record["error"]
+    assert "signal" in record["stages_ms"]
+
+
+def test_loaded_sma_recomputes_total(tmp_path):
+    sig = CrossoverSignal(FAST, SLOW)
+    for i, close in enumerate(make_bars()["close"]):
+        sig.update(float(close), str(i))
+    sig.sma_slow.total += 1e-6  # deriva acumulada de sumas y restas
+    state_path = tmp_path / "state.json"
+    save_state(state_path, sig)
+
+    loaded = load_state(state_path)
+    assert loaded.sma_slow.total == sum(loaded.sma_slow.values)
+    assert loaded.sma_fast.total == sum(loaded.sma_fast.values)
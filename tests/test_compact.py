@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Modo compacto (compact.py): mismas métricas y velas agrupadas que en float64."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from compact import compact_frame, max_errors
+from downsample import resample_ohlcv
+from metrics_panel import basic_metrics, compute_panel_metrics
+from script3_visualizacion import add_financial_metrics
+from synthetic import synthetic_ohlcv, synthetic_panel
+
+BARS = 10 * 252
+
+
+def assert_within_tolerance(full: pd.DataFrame, small: pd.DataFrame):
+    errors = max_errors(full, small)
+    assert errors, "no hay columnas float que comparar"
+    bad = {col: (err, tol) for col, (err, tol, ok) in errors.items() if not ok}
+    assert not bad, f"fuera de tolerancia float32: {bad}"
+
+
+@pytest.fixture(scope="module")
+def ohlcv() -> pd.DataFrame:
+    return synthetic_ohlcv(BARS)
+
+
+def test_compact_frame_dtypes(ohlcv):
+    small = compact_frame(add_financial_metrics(ohlcv.set_index("date"), compact=False))
+    assert "cum_max" not in small.columns
+    assert (small[["open", "high", "low", "close", "drawdown"]].dtypes == "float32").all()
+    assert small["volume"].dtype == "int32"
+    assert (small["volume"].to_numpy() == ohlcv["volume"].to_numpy()).all()
+
+
+def test_financial_metrics_match_float64(ohlcv):
+    df = ohlcv.set_index("date")
+    full = add_financial_metrics(df, compact=False)
+    small = add_financial_metrics(compact_frame(df), compact=True)
+    assert_within_tolerance(full, small)
+
+
+def test_basic_metrics_match_float64(ohlcv):
+    full = basic_metrics(ohlcv)
+    small = compact_frame(basic_metrics(compact_frame(ohlcv)))
+    assert_within_tolerance(full, small)
+
+
+def test_panel_metrics_match_float64():
+    prices = synthetic_panel(50, BARS)
+    metrics = ["return", "sma_50", "volatility_20", "drawdown"]
+    full = compute_panel_metrics(prices, metrics)
+    small = compute_panel_metrics(compact_frame(prices), metrics)
+    flat_full = pd.DataFrame({name: full[name].to_numpy().ravel() for name in metrics})
+    flat_small = pd.DataFrame({name: small[name].to_numpy().ravel() for name in metrics})
+    assert_within_tolerance(flat_full, flat_small)
+
+
+@pytest.mark.parametrize("rule", ["W-FRI", "ME", "YE"])
+def test_resample_matches_float64(ohlcv, rule):
+    full = resample_ohlcv(basic_metrics(ohlcv), rule)
+    small = resample_ohlcv(compact_frame(basic_metrics(compact_frame(ohlcv))), rule)
+
+    assert len(small) == len(full)
+    assert (small["date"].to_numpy() == full["date"].to_numpy()).all()
+    assert_within_tolerance(full, small)
+    # La suma de volumen en enteros pequeños no debe desbordarse
+    assert np.array_equal(small["volume"].to_numpy(dtype="int64"), full["volume"].to_numpy(dtype="int64"))
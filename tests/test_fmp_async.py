@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Descarga concurrente (fmp_async) contra el servidor FMP falso: mismos datos que el cliente secuencial."""
+
+import pandas as pd
+import pytest
+
+import fmp_client
+import rate_limit
+from bench_fetch_async import sequential_loop
+from fmp_async import fetch_historical_many
+from fmp_stub_server import start_stub_process
+
+START, END = "2024-01-01", "2024-06-30"
+SYMBOLS = [f"SYM{i:02d}" for i in range(12)]
+
+
+@pytest.fixture(scope="module")
+def stub():
+    proc, base_url = start_stub_process(latency=0.01)
+    try:
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    monkeypatch.setattr(fmp_client, "BASE_URL", stub)
+    monkeypatch.setattr(fmp_client, "API_KEY", "stub")
+    monkeypatch.setattr(rate_limit, "limiter", rate_limit.RateLimiter(rpm=1_000_000, burst=16))
+
+
+def test_same_frames_as_sequential(client):
+    seq = sequential_loop(SYMBOLS, START, END)
+    conc = fetch_historical_many(SYMBOLS, START, END, max_concurrency=8)
+
+    assert list(conc) == SYMBOLS
+    for symbol in SYMBOLS:
+        assert not seq[symbol].empty
+        pd.testing.assert_frame_equal(conc[symbol], seq[symbol])
+
+
+def test_per_symbol_ranges_and_long_format(client):
+    ranges = {"SYM00": ("2024-03-01", "2024-03-31")}
+    long_df = fetch_historical_many(["SYM00", "SYM01", "SYM00"], START, END, ranges=ranges, long_format=True)
+
+    assert list(long_df.columns) == ["symbol"] + fmp_client.OHLCV_COLUMNS
+    sym00 = long_df[long_df["symbol"] == "SYM00"]
+    assert sym00["date"].min() >= pd.Timestamp("2024-03-01")
+    assert sym00["date"].max() <= pd.Timestamp("2024-03-31")
+
+    expected = sequential_loop(["SYM01"], START, END)["SYM01"]
+    got = long_df[long_df["symbol"] == "SYM01"].drop(columns="symbol").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected)
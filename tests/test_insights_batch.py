@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""insights_batch.chat: reintentos propios ante 429, devolución de tokens y clave de caché."""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+import insights_batch
+import llm_cache
+
+
+class FlakyClient:
+    """Cliente OpenAI falso: responde 429 las primeras `fail` veces."""
+
+    def __init__(self, fail: int = 0):
+        self.fail = fail
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if len(self.calls) <= self.fail:
+            request = httpx.Request("POST", "http://openai.test/v1/chat/completions")
+            response = httpx.Response(429, headers={"retry-after": "0"}, request=request)
+            raise RateLimitError("rate limited", response=response, body=None)
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        message = SimpleNamespace(content=f"respuesta {len(self.calls)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture(autouse=True)
+def no_wait(tmp_path, monkeypatch):
+    monkeypatch.setattr(insights_batch, "OPENAI_BACKOFF_BASE", 0.0)
+    monkeypatch.setattr(llm_cache, "ENABLED", True)
+    monkeypatch.setattr(llm_cache, "CACHE_PATH", tmp_path / "llm_cache.sqlite")
+
+
+def test_throttled_request_refunds_its_tokens(monkeypatch):
+    requests_limiter, tokens_limiter = insights_batch.make_limiters(rpm=6000, tpm=600_000)
+    refunds = []
+    refund = tokens_limiter.refund
+    monkeypatch.setattr(tokens_limiter, "refund", lambda amount: (refunds.append(amount), refund(amount)))
+    client = FlakyClient(fail=1)
+
+    r = insights_batch.chat(client, "prompt", 100, (requests_limiter, tokens_limiter))
+
+    assert len(client.calls) == 2 and not r["cached"]
+    cost = insights_batch.estimate_tokens("prompt") + 100
+    # El 429 devuelve la reserva entera; la respuesta buena, lo no usado
+    assert refunds == [cost, cost - 15]
+
+
+def test_retries_use_openai_settings(monkeypatch):
+    monkeypatch.setattr(insights_batch, "OPENAI_MAX_RETRIES", 2)
+    client = FlakyClient(fail=10)
+
+    with pytest.raises(RateLimitError):
+        insights_batch.chat(client, "prompt", 100, insights_batch.make_limiters(rpm=6000, tpm=600_000))
+    assert len(client.calls) == 3
+
+
+def test_cache_key_includes_max_tokens():
+    limiters = insights_batch.make_limiters(rpm=6000, tpm=600_000)
+    client = FlakyClient()
+
+    first = insights_batch.chat(client, "prompt", 100, limiters)
+    again = insights_batch.chat(client, "prompt", 100, limiters)
+    other = insights_batch.chat(client, "prompt", 400, limiters)
+
+    assert again["cached"] and again["content"] == first["content"]
+    assert not other["cached"]
+    assert [c["max_tokens"] for c in client.calls] == [100, 400]
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Servicio live_trader: solo velas de sesiones cerradas y espera a la vela del cierre."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import live_trader
+from fake_broker import FakeTradingClient
+from tradin_bot_script5 import STATE_PATH, compute_signal
+
+FAST, SLOW = 5, 12
+
+
+class FakeBars:
+    """Sustituye al almacén de velas: devuelve lo que haya en self.df."""
+
+    def __init__(self, df):
+        self.df = df
+
+    def recent(self, symbol, bars, path=None):
+        return self.df.tail(bars).reset_index(drop=True)
+
+    def between(self, symbol, start, end, path=None):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        return self.df[(self.df["date"] >= start) & (self.df["date"] <= end)].reset_index(drop=True)
+
+
+def clock(now: datetime, is_open: bool):
+    return SimpleNamespace(timestamp=now, is_open=is_open,
+                           next_open=now + timedelta(days=1), next_close=now + timedelta(hours=2))
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    today = pd.Timestamp(datetime.now(timezone.utc).date())
+    dates = pd.date_range(end=today, periods=80)
+    close = 100 + 10 * np.sin(np.arange(80) / 5)
+    bars = pd.DataFrame({"date": dates, "close": close})
+
+    source = FakeBars(bars.iloc[:-1].copy())  # hoy aún sin vela
+    monkeypatch.setattr(live_trader, "get_recent_bars", source.recent)
+    monkeypatch.setattr(live_trader, "get_bars", source.between)
+    monkeypatch.setattr(live_trader, "STATE_PATH", tmp_path / "bot_state_TEST.json")
+    monkeypatch.setattr("audit_log.AUDIT_LOG_PATH", tmp_path / "audit.jsonl")
+
+    trader = live_trader.LiveTrader(FakeTradingClient(prices={"TEST": 100.0}), "TEST", FAST, SLOW, days=80)
+    return trader, source, bars, today
+
+
+def test_evaluation_during_session_ignores_partial_bar(setup):
+    trader, source, bars, today = setup
+    partial = bars.copy()
+    partial.loc[partial.index[-1], "close"] = 500.0  # vela de hoy, provisional y disparatada
+    source.df = partial
+
+    now = datetime.now(timezone.utc)
+    trader.evaluate(clock(now, is_open=True))
+    assert trader.signal.last_date == str((today - timedelta(days=1)).date())
+
+
+def test_waits_for_the_closed_session_bar_then_uses_final_close(setup):
+    trader, source, bars, today = setup
+    now = datetime.now(timezone.utc)
+    trader.evaluate(clock(now, is_open=True))
+
+    # Tras el cierre: FMP aún no tiene la vela de hoy -> reintentar
+    after_close = clock(now, is_open=False)
+    with pytest.raises(live_trader.BarNotReadyError):
+        trader.evaluate(after_close, expected_date=today.date())
+
+    source.df = bars  # ya publicada
+    sig = trader.evaluate(after_close, expected_date=today.date())
+    assert trader.signal.last_date == str(today.date())
+    assert sig == compute_signal(bars, FAST, SLOW)
+    assert trader.evaluate(after_close, expected_date=today.date()) == 0  # nada nuevo
+
+
+def test_run_evaluates_each_closed_session_with_fake_broker(tmp_path, monkeypatch):
+    """
+    Dos iteraciones de run() con el reloj del bróker falso y el tiempo
+    simulado. Arranca el miércoles tras el cierre, antes de que FMP publique
+    la vela (lo hace a las 21:00 UTC): espera a la del miércoles, y tras el
+    cierre del jueves a la del jueves.
+    """
+    sim = SimpleNamespace(now=datetime(2026, 10, 14, 20, 30, tzinfo=timezone.utc))  # miércoles
+    dates = pd.bdate_range(end="2026-10-15", periods=80)
+    bars = pd.DataFrame({"date": dates, "close": 100 + 10 * np.sin(np.arange(80) / 5)})
+
+    def published():
+        cutoff = sim.now.replace(tzinfo=None) - timedelta(hours=21)
+        return bars[bars["date"] <= cutoff].reset_index(drop=True)
+
+    source = FakeBars(published())
+    monkeypatch.setattr(live_trader, "get_recent_bars", source.recent)
+    monkeypatch.setattr(live_trader, "get_bars", source.between)
+    monkeypatch.setattr(live_trader, "STATE_PATH", tmp_path / "bot_state_TEST.json")
+    monkeypatch.setattr(live_trader, "seconds_until", lambda when: max(0.0, (when - sim.now).total_seconds()))
+    monkeypatch.setattr("audit_log.AUDIT_LOG_PATH", tmp_path / "audit.jsonl")
+
+    broker = FakeTradingClient(prices={"TEST": 100.0}, now=lambda: sim.now)
+    trader = live_trader.LiveTrader(broker, "TEST", FAST, SLOW, days=80)
+    evaluated = []
+    evaluate = trader.evaluate
+
+    def counting_evaluate(clock, expected_date=None):
+        sig = evaluate(clock, expected_date)
+        evaluated.append((sim.now, trader.signal.last_date))
+        if len(evaluated) == 2:
+            trader.stop()
+        return sig
+
+    async def fake_sleep(seconds):
+        sim.now += timedelta(seconds=seconds)
+        source.df = published()
+        return trader.stop_event.is_set()
+
+    trader.evaluate = counting_evaluate
+    trader.sleep = fake_sleep
+    asyncio.run(trader.run(offset_min=15))
+
+    assert [day for _, day in evaluated] == ["2026-10-14", "2026-10-15"]
+    assert evaluated[0][0] >= datetime(2026, 10, 14, 21, tzinfo=timezone.utc)
+    assert evaluated[1][0] >= datetime(2026, 10, 15, 21, tzinfo=timezone.utc)
+
+
+def test_fake_clock_follows_sessions():
+    sim = SimpleNamespace(now=datetime(2026, 10, 16, 15, tzinfo=timezone.utc))  # viernes, en sesión
+    broker = FakeTradingClient(now=lambda: sim.now)
+
+    c = broker.get_clock()
+    assert c.is_open and c.next_close == datetime(2026, 10, 16, 20, tzinfo=timezone.utc)
+    assert c.next_open.date().isoformat() == "2026-10-19"
+
+    sim.now = datetime(2026, 10, 16, 21, tzinfo=timezone.utc)  # viernes tras el cierre
+    c = broker.get_clock()
+    assert not c.is_open and c.next_close.date().isoformat() == "2026-10-19"
+    assert live_trader.last_session_date(broker, c).isoformat() == "2026-10-16"
+
+    sim.now = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)  # domingo
+    assert live_trader.last_session_date(broker, broker.get_clock()).isoformat() == "2026-10-16"
+
+
+def test_state_file_is_separate_from_cron_bot(setup):
+    trader, _, _, _ = setup
+    assert trader.state_path.name == "live_state_TEST.json"
+    assert trader.state_path.name != STATE_PATH.name
+
+
+def test_cli_live_passes_strategy_options(tmp_path, monkeypatch):
+    import cli
+
+    seen = {}
+
+    async def fake_run(self, offset_min):
+        seen.update(symbol=self.symbol, fast=self.fast, slow=self.slow, qty=self.qty,
+                    days=self.days, offset_min=offset_min)
+
+    monkeypatch.setattr(live_trader, "STATE_PATH", tmp_path / "bot_state_TEST.json")
+    monkeypatch.setattr(live_trader, "get_trading_client", lambda fake=False: FakeTradingClient())
+    monkeypatch.setattr(live_trader.LiveTrader, "run", fake_run)
+
+    cli.main(["bot", "MSFT", "--live", "--fake", "--fast", "7", "--slow", "150", "--qty", "3", "--offset-min", "20"])
+
+    assert seen == {"symbol": "MSFT", "fast": 7, "slow": 150, "qty": 3, "days": 160, "offset_min": 20}
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Caché de respuestas de ChatGPT (llm_cache) contra el servidor OpenAI falso."""
+
+import pytest
+
+import insights_with_chatgpt
+import llm_cache
+import telegram_alerts
+from fake_openai_server import start_fake_openai
+
+MODEL, TEMPERATURE = "gpt-4o-mini", 0.3
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    srv, base_url = start_fake_openai()
+    monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+    monkeypatch.setattr(llm_cache, "CACHE_PATH", tmp_path / "llm_cache.sqlite")
+    monkeypatch.setattr(llm_cache, "ENABLED", True)
+    # Clientes memoizados de otros tests pueden apuntar a otro servidor
+    for module in (insights_with_chatgpt, telegram_alerts):
+        module.make_openai_client.cache_clear()
+    yield srv
+    srv.shutdown()
+
+
+def make_client():
+    return insights_with_chatgpt.make_openai_client()
+
+
+def messages(text: str) -> list:
+    return [{"role": "user", "content": text}]
+
+
+def test_second_pass_makes_no_requests(server):
+    contexts = {f"SYM{i}": f"Price trend (60d): uptrend, change: {i * 0.7:.2f}%" for i in range(5)}
+
+    first = {s: telegram_alerts.generate_insights(s, c) for s, c in contexts.items()}
+    assert server.hits == len(contexts)
+
+    second = {s: telegram_alerts.generate_insights(s, c) for s, c in contexts.items()}
+    assert server.hits == len(contexts)
+    assert second == first
+
+
+def test_changed_prompt_or_params_is_a_new_request(server):
+    llm_cache.cached_chat(make_client, MODEL, messages("hola"), TEMPERATURE)
+    llm_cache.cached_chat(make_client, MODEL, messages("hola"), TEMPERATURE)
+    assert server.hits == 1
+
+    llm_cache.cached_chat(make_client, MODEL, messages("hola (nuevo)"), TEMPERATURE)
+    assert server.hits == 2
+
+    # max_tokens distinto: una respuesta truncada no sirve para otra petición
+    llm_cache.cached_chat(make_client, MODEL, messages("hola"), TEMPERATURE, max_tokens=50)
+    assert server.hits == 3
+    llm_cache.cached_chat(make_client, MODEL, messages("hola"), TEMPERATURE, max_tokens=50)
+    assert server.hits == 3
+
+
+def test_hit_does_not_build_a_client(server):
+    llm_cache.cached_chat(make_client, MODEL, messages("x"), TEMPERATURE)
+
+    def no_client():
+        raise AssertionError("no debería crearse el cliente con acierto de caché")
+
+    assert llm_cache.cached_chat(no_client, MODEL, messages("x"), TEMPERATURE)
+
+
+def test_cache_key_includes_params():
+    base = llm_cache.cache_key(MODEL, TEMPERATURE, messages("x"))
+    assert base == llm_cache.cache_key(MODEL, TEMPERATURE, messages("x"), {})
+    assert base != llm_cache.cache_key(MODEL, TEMPERATURE, messages("x"), {"max_tokens": 400})
+    assert base != llm_cache.cache_key(MODEL, 0.0, messages("x"))
+
+
+def test_expired_entry_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "ENABLED", True)
+    path = tmp_path / "ttl.sqlite"
+    llm_cache.store("m", 0.3, messages("ttl"), "x", path=path)
+    assert llm_cache.lookup("m", 0.3, messages("ttl"), path=path) == "x"
+    assert llm_cache.lookup("m", 0.3, messages("ttl"), ttl=0, path=path) is None
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path, monkeypatch):
+    """1 KB por respuesta, máximo 10 KB: se llena, se usa keep y se añaden 5 más."""
+    monkeypatch.setattr(llm_cache, "ENABLED", True)
+    path = tmp_path / "size.sqlite"
+    keep = messages("keep")
+
+    llm_cache.store("m", 0.3, keep, "k" * 1000, max_bytes=10_000, path=path)
+    for i in range(14):
+        if i == 9:
+            llm_cache.lookup("m", 0.3, keep, path=path)
+        llm_cache.store("m", 0.3, messages(str(i)), "v" * 1000, max_bytes=10_000, path=path)
+
+    info = llm_cache.cache_info(path)
+    assert info["mb"] * 1e6 <= 10_000
+    assert llm_cache.lookup("m", 0.3, keep, path=path) is not None
+    assert llm_cache.lookup("m", 0.3, messages("0"), path=path) is None
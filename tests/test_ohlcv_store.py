@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Cobertura del almacén de velas (ohlcv_store): solo se marca lo que FMP devuelve."""
+
+from datetime import date, timedelta
+
+import pytest
+
+import ohlcv_store
+
+
+def bar(day: date, close: float = 100.0) -> dict:
+    return {"date": day.isoformat(), "open": close, "high": close, "low": close, "close": close, "volume": 1000}
+
+
+def weekdays(start: date, end: date) -> list:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)
+            if (start + timedelta(days=i)).weekday() < 5]
+
+
+@pytest.fixture
+def fmp(monkeypatch):
+    """FMP falso: responde con las velas de self.days dentro del rango pedido."""
+    class Fake:
+        days, calls, payload = [], 0, None
+
+        def __call__(self, endpoint, params):
+            self.calls += 1
+            if self.payload is not None:
+                return self.payload
+            lo, hi = date.fromisoformat(params["from"]), date.fromisoformat(params["to"])
+            return {"historical": [bar(d) for d in reversed(self.days) if lo <= d <= hi]}
+
+    fake = Fake()
+    monkeypatch.setattr(ohlcv_store, "call_fmp", fake)
+    return fake
+
+
+def test_error_response_is_not_covered(tmp_path, fmp):
+    path = tmp_path / "store.sqlite"
+    start, end = date(2020, 1, 6), date(2020, 1, 31)
+    for payload in ({"Error Message": "Invalid API KEY"}, []):
+        fmp.payload = payload
+        assert ohlcv_store.get_bars("XXX", start, end, path).empty
+
+    fmp.payload, fmp.calls = None, 0
+    fmp.days = weekdays(start, end)
+    assert len(ohlcv_store.get_bars("XXX", start, end, path)) == len(fmp.days)
+    assert fmp.calls == 1
+
+
+def test_empty_settled_range_is_covered(tmp_path, fmp):
+    path = tmp_path / "store.sqlite"
+    # Viernes santo y el fin de semana: ninguna vela, pero el rango ya es definitivo
+    start, end = date(2020, 4, 10), date(2020, 4, 12)
+    for _ in range(2):
+        assert ohlcv_store.get_bars("AAA", start, end, path).empty
+    assert fmp.calls == 1
+
+
+def test_empty_recent_range_is_not_covered(tmp_path, fmp):
+    path = tmp_path / "store.sqlite"
+    start = date.today() - timedelta(days=3)
+    for _ in range(2):
+        assert ohlcv_store.get_bars("AAA", start, start, path).empty
+    assert fmp.calls == 2
+
+
+def test_recent_range_covered_only_up_to_last_returned_bar(tmp_path, fmp):
+    path = tmp_path / "store.sqlite"
+    today = date.today()
+    start = today - timedelta(days=30)
+    # Primera hora: la vela de ayer (y la de hoy) aún no está publicada
+    fmp.days = weekdays(start, today - timedelta(days=3))
+    ohlcv_store.get_bars("AAA", start, today, path)
+
+    fmp.days = weekdays(start, today - timedelta(days=1))
+    df = ohlcv_store.get_bars("AAA", start, today, path)
+    assert df["date"].iloc[-1].date() == fmp.days[-1]
+
+
+def test_invalidate_forces_a_new_download(tmp_path, fmp):
+    path = tmp_path / "store.sqlite"
+    start, end = date(2020, 1, 6), date(2020, 1, 31)
+    fmp.days = weekdays(start, end)
+    ohlcv_store.get_bars("AAA", start, end, path)
+    calls = fmp.calls
+
+    ohlcv_store.get_bars("AAA", start, end, path)
+    assert fmp.calls == calls  # todo en disco
+
+    assert ohlcv_store.invalidate("AAA", path) == len(fmp.days)
+    ohlcv_store.get_bars("AAA", start, end, path)
+    assert fmp.calls == calls + 1
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""parquet_store: tipos al normalizar y lectura de varios años."""
+
+import numpy as np
+import pandas as pd
+
+from parquet_store import normalize_types, read_bars, write_bars
+
+
+def bars(dates, volume) -> pd.DataFrame:
+    n = len(dates)
+    return pd.DataFrame({
+        "date": pd.to_datetime(dates),
+        "open": np.arange(n, dtype=float) + 1,
+        "high": np.arange(n, dtype=float) + 2,
+        "low": np.arange(n, dtype=float),
+        "close": [str(x + 1.5) for x in range(n)],  # como llega de un CSV mal tipado
+        "volume": volume,
+        "label": [f"día {i}" for i in range(n)],
+    })
+
+
+def test_normalize_types_keeps_strings_and_volume_gaps():
+    df = normalize_types(bars(["2024-01-03", "2024-01-02"], [100.0, np.nan]))
+
+    assert df["date"].is_monotonic_increasing
+    assert df["close"].dtype == "float64" and df["close"].iloc[0] == 1.5 + 1
+    assert df["label"].tolist() == ["día 1", "día 0"]  # texto intacto, no NaN
+    assert df["volume"].dtype == "float64"
+    assert np.isnan(df["volume"].iloc[0])  # hueco, no volumen 0
+
+
+def test_complete_volume_is_int64():
+    df = normalize_types(bars(["2024-01-02", "2024-01-03"], ["100", "200"]))
+    assert df["volume"].dtype == "int64"
+    assert df["volume"].tolist() == [100, 200]
+
+
+def test_years_with_and_without_volume_gaps_read_together(tmp_path):
+    df = pd.concat([bars(["2023-12-28", "2023-12-29"], [np.nan, 5.0]),
+                    bars(["2024-01-02", "2024-01-03"], [7, 8])], ignore_index=True)
+    write_bars(df.iloc[:2], "SYN", base_dir=tmp_path)
+    write_bars(df.iloc[2:], "SYN", base_dir=tmp_path)
+
+    out = read_bars("SYN", columns=["close", "volume", "label"], base_dir=tmp_path)
+    assert len(out) == 4
+    assert out["volume"].isna().sum() == 1
+    assert out["volume"].iloc[2:].tolist() == [7, 8]
+    assert out["label"].iloc[0] == "día 0"
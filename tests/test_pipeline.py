@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""pipeline.run_dag: orden de dependencias, ciclos y propagación de errores."""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import audit_log
+import telegram_alerts
+from audit_log import DecisionRecord
+from pipeline import run_dag, run_pipeline
+
+
+@pytest.fixture(autouse=True)
+def audit_path(tmp_path, monkeypatch):
+    path = tmp_path / "audit.jsonl"
+    monkeypatch.setattr(audit_log, "AUDIT_LOG_PATH", path)
+    return path
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as p:
+        yield p
+
+
+def test_tasks_run_after_their_dependencies(pool):
+    order, lock = [], threading.Lock()
+
+    def task(name, value):
+        def fn(**deps):
+            time.sleep(0.01)
+            with lock:
+                order.append(name)
+            return value + sum(deps.values())
+        return fn
+
+    tasks = {
+        "c": (task("c", 100), ["a", "b"]),
+        "a": (task("a", 1), []),
+        "b": (task("b", 10), ["a"]),
+        "d": (task("d", 1000), []),
+    }
+    rec = DecisionRecord("test")
+    results = run_dag(tasks, pool, rec)
+
+    assert results == {"a": 1, "b": 11, "c": 112, "d": 1000}
+    assert order.index("a") < order.index("b") < order.index("c")
+    assert set(rec.stages) == set(tasks)
+
+
+def test_independent_tasks_run_in_parallel(pool):
+    barrier = threading.Barrier(2, timeout=2)
+    tasks = {
+        "x": (lambda: barrier.wait(), []),
+        "y": (lambda: barrier.wait(), []),
+    }
+    # Si fueran en serie, la barrera (2 hilos) daría timeout
+    assert set(run_dag(tasks, pool)) == {"x", "y"}
+
+
+def test_cycle_is_detected(pool):
+    tasks = {
+        "a": (lambda: 1, []),
+        "b": (lambda a, c: a, ["a", "c"]),
+        "c": (lambda b: b, ["b"]),
+    }
+    with pytest.raises(ValueError, match="circulares"):
+        run_dag(tasks, pool)
+
+
+def test_unknown_dependency_is_rejected(pool):
+    with pytest.raises(ValueError, match="desconocidas"):
+        run_dag({"a": (lambda missing: 1, ["missing"])}, pool)
+
+
+def test_error_stops_dependents_and_is_raised(pool):
+    calls = []
+
+    def boom():
+        raise RuntimeError("fallo en a")
+
+    tasks = {
+        "a": (boom, []),
+        "b": (lambda a: calls.append("b"), ["a"]),
+    }
+    rec = DecisionRecord("test")
+    with pytest.raises(RuntimeError, match="fallo en a"):
+        run_dag(tasks, pool, rec)
+    assert calls == []
+    assert rec.error == "a: fallo en a"
+
+
+def test_run_pipeline_isolates_failing_symbol(audit_path):
+    def build_tasks(symbol):
+        def price():
+            if symbol == "BAD":
+                raise RuntimeError("sin datos")
+            return symbol.lower()
+        return {"price": (price, [])}
+
+    done = []
+    records = run_pipeline(["AAA", "BAD", "CCC"], build_tasks,
+                           on_done=lambda s, r: done.append((s, r["price"])), max_concurrency=2)
+
+    assert sorted(done) == [("AAA", "aaa"), ("CCC", "ccc")]
+    errors = {r["symbol"]: r["error"] for r in records}
+    assert errors == {"AAA": None, "BAD": "price: sin datos", "CCC": None}
+    assert len(audit_path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_alerts_send_follow_up_when_excel_fails(pool, monkeypatch):
+    sent = []
+    monkeypatch.setattr(telegram_alerts, "get_price_summary", lambda symbol, days: "precio")
+    monkeypatch.setattr(telegram_alerts, "get_fundamentals", lambda symbol: "fundamentales")
+    monkeypatch.setattr(telegram_alerts, "get_news", lambda symbol, limit: "noticias")
+    monkeypatch.setattr(telegram_alerts, "generate_insights", lambda symbol, context: "insights")
+    monkeypatch.setattr(telegram_alerts, "send_telegram_message", sent.append)
+
+    def broken_export(*args):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(telegram_alerts, "export_to_excel", broken_export)
+
+    with pytest.raises(OSError, match="disco lleno"):
+        run_dag(telegram_alerts.build_tasks("AAPL"), pool)
+
+    assert not any("Excel generado" in m for m in sent)
+    assert any("no se pudo generar el Excel" in m for m in sent)
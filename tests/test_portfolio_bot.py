@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""portfolio_bot con el bróker falso: señales -> plan_orders -> órdenes -> posiciones."""
+
+import json
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import audit_log
+from fake_broker import FakeTradingClient
+from portfolio_bot import evaluate_signals, get_positions, plan_orders, run_portfolio, submit_orders
+from signals import last_signal
+
+FAST, SLOW = 5, 12
+
+
+@pytest.fixture(autouse=True)
+def audit_path(tmp_path, monkeypatch):
+    path = tmp_path / "audit.jsonl"
+    monkeypatch.setattr(audit_log, "AUDIT_LOG_PATH", path)
+    return path
+
+
+def make_panel(n: int = 90) -> pd.DataFrame:
+    dates = pd.bdate_range("2024-01-01", periods=n)
+    t = np.arange(n)
+    return pd.DataFrame({
+        "AAA": 100 + 10 * np.sin(t / 5),
+        "BBB": 50 + 5 * np.cos(t / 4),
+        "CCC": 20 + 0.1 * t,
+    }, index=dates)
+
+
+def test_signals_with_gaps_use_each_symbol_own_series():
+    panel = make_panel()
+    panel.iloc[40, 0] = np.nan        # hueco en medio de AAA
+    panel.iloc[-1, 1] = np.nan        # BBB aún sin vela en la última fecha
+
+    got = evaluate_signals(panel, FAST, SLOW)
+    for symbol in panel.columns:
+        assert got[symbol] == last_signal(panel[symbol].dropna(), FAST, SLOW)
+
+
+def test_signals_without_gaps_match_per_symbol():
+    panel = make_panel()
+    got = evaluate_signals(panel, FAST, SLOW)
+    assert got.to_dict() == {s: last_signal(panel[s], FAST, SLOW) for s in panel.columns}
+
+
+def test_plan_orders_fills_and_positions():
+    broker = FakeTradingClient(cash=10_000, prices={"AAA": 100.0, "BBB": 50.0, "CCC": 20.0, "DDD": 10.0},
+                               positions={"BBB": 3, "CCC": 2}, fail_symbols={"DDD"})
+    signals = pd.Series({"AAA": 1, "BBB": -1, "CCC": 0, "DDD": 1}, dtype="int8")
+
+    orders = plan_orders(signals, get_positions(broker), qty=2)
+    assert [(s, side.value, q) for s, side, q in orders] == [("AAA", "buy", 2), ("BBB", "sell", 3), ("DDD", "buy", 2)]
+
+    results = {r["symbol"]: r for r in submit_orders(broker, orders)}
+    assert results["AAA"]["error"] is None and results["BBB"]["error"] is None
+    assert "not tradable" in results["DDD"]["error"]  # el fallo no para las demás
+
+    assert get_positions(broker) == {"AAA": 2, "CCC": 2}
+    assert float(broker.get_account().cash) == pytest.approx(10_000 - 2 * 100.0 + 3 * 50.0)
+
+    # Segunda pasada con las mismas señales: ya comprado / ya vendido -> nada
+    assert plan_orders(signals.drop("DDD"), get_positions(broker), qty=2) == []
+
+
+def test_run_portfolio_with_fake_broker_is_audited(audit_path):
+    panel = make_panel()
+    broker = FakeTradingClient(prices=panel.iloc[-1].to_dict())
+    out = run_portfolio(broker, list(panel.columns), FAST, SLOW, qty=1, closes=panel)
+
+    expected = {s for s, sig in out["signals"].items() if sig == 1}
+    assert set(get_positions(broker)) == expected
+    assert out["account"].cash == broker.get_account().cash
+
+    record = json.loads(audit_path.read_text(encoding="utf-8").splitlines()[-1])
+    assert {"signal", "position", "order", "account"} <= set(record["stages_ms"])
+
+
+def test_run_portfolio_ignores_open_session_bar():
+    panel = make_panel()
+    panel.iloc[-1] = panel.iloc[-1] * 3  # vela de hoy, provisional: dispararía compras
+    today = panel.index[-1]
+    broker = FakeTradingClient(prices=panel.iloc[-1].to_dict(),
+                               now=lambda: datetime(today.year, today.month, today.day, 15, tzinfo=timezone.utc))
+    assert broker.get_clock().is_open
+
+    out = run_portfolio(broker, list(panel.columns), FAST, SLOW, qty=1, closes=panel)
+
+    assert out["closes"].index[-1] == panel.index[-2]
+    assert out["signals"].to_dict() == evaluate_signals(panel.iloc[:-1], FAST, SLOW).to_dict()
+    assert out["signals"].to_dict() != evaluate_signals(panel, FAST, SLOW).to_dict()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""quotes: troceo de la lista de símbolos, caché con TTL y símbolos repetidos."""
+
+import pytest
+
+import quotes
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Sustituye a FMP: devuelve una cotización por símbolo y apunta cada llamada."""
+    calls = []
+
+    def fake_call_fmp(endpoint, params=None, api_key=None):
+        symbols = endpoint.split("/", 1)[1].split(",")
+        calls.append(symbols)
+        return [{"symbol": s, "price": 100.0 + len(calls)} for s in symbols]
+
+    monkeypatch.setattr(quotes, "call_fmp", fake_call_fmp)
+    quotes.clear_cache()
+    yield calls
+    quotes.clear_cache()
+
+
+def test_chunk_symbols_by_count():
+    symbols = [f"S{i}" for i in range(7)]
+    chunks = quotes.chunk_symbols(symbols, chunk_size=3)
+    assert chunks == [["S0", "S1", "S2"], ["S3", "S4", "S5"], ["S6"]]
+
+
+def test_chunk_symbols_by_encoded_length():
+    # "^GSPC" ocupa 7 caracteres codificado (%5EGSPC) y cada separador cuenta 3
+    symbols = ["^GSPC"] * 4
+    chunks = quotes.chunk_symbols(symbols, chunk_size=50, max_chars=7 + 3 + 7)
+    assert [len(c) for c in chunks] == [2, 2]
+    assert quotes.chunk_symbols([]) == []
+
+
+def test_duplicates_and_case_fetch_once(api):
+    out = quotes.get_quotes(["aapl", "AAPL", "msft"])
+    assert list(out) == ["AAPL", "MSFT"]
+    assert api == [["AAPL", "MSFT"]]
+
+
+def test_fresh_quotes_come_from_cache(api):
+    quotes.get_quotes(["AAPL", "MSFT"], ttl=60)
+    out = quotes.get_quotes(["MSFT", "NVDA"], ttl=60)
+
+    assert api == [["AAPL", "MSFT"], ["NVDA"]]  # solo se pide lo que falta
+    assert out["MSFT"]["price"] == 101.0      # de la primera llamada
+
+    quotes.get_quotes(["MSFT"], ttl=0)        # caducada -> se vuelve a pedir
+    assert api[-1] == ["MSFT"]
+
+
+def test_many_symbols_are_fetched_in_chunks(api):
+    symbols = [f"S{i:03d}" for i in range(quotes.CHUNK_SIZE * 2 + 5)]
+
+    out = quotes.get_quotes(symbols)
+    assert list(out) == symbols
+    assert sorted(len(c) for c in api) == [5, quotes.CHUNK_SIZE, quotes.CHUNK_SIZE]
+    assert quotes.get_quote("s001")["symbol"] == "S001"
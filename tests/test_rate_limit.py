@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""rate_limit: token bucket, ajuste AIMD ante 429, Retry-After y presupuesto diario (reloj simulado)."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limit
+from rate_limit import QuotaExceededError, RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Sustituye time.monotonic/sleep de rate_limit: el tiempo solo avanza con advance() o sleep()."""
+    sim = SimpleNamespace(now=1000.0, slept=[])
+
+    def sleep(seconds):
+        sim.slept.append(seconds)
+        sim.now += seconds
+
+    sim.advance = lambda seconds: setattr(sim, "now", sim.now + seconds)
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: sim.now, sleep=sleep))
+    return sim
+
+
+def test_burst_then_borrowed_tokens_wait_their_turn(clock):
+    limiter = RateLimiter(rpm=60, burst=3)  # 1 ficha por segundo
+
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Sin fichas: se toman prestadas y cada una espera un segundo más
+    assert limiter.reserve() == pytest.approx(1.0)
+    assert limiter.reserve() == pytest.approx(2.0)
+
+    clock.advance(2.0)  # se devuelve la deuda
+    assert limiter.reserve() == pytest.approx(1.0)
+
+    clock.advance(10.0)  # el cubo se llena, pero nunca por encima de la ráfaga
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(1.0)
+
+
+def test_cost_and_refund_for_token_limits(clock):
+    limiter = RateLimiter(rpm=600, burst=100)  # 10 fichas por segundo
+
+    assert limiter.reserve(cost=80) == 0.0
+    assert limiter.reserve(cost=50) == pytest.approx(3.0)  # 30 prestadas a 10/s
+    limiter.refund(40)                                     # no se usaron
+    assert limiter.tokens == pytest.approx(10)
+    limiter.refund(1_000)
+    assert limiter.tokens == limiter.capacity
+
+
+def test_acquire_sleeps_the_wait(clock):
+    limiter = RateLimiter(rpm=60, burst=1)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.slept == [pytest.approx(1.0)]
+
+    clock.advance(5)
+    asyncio.run(limiter.acquire_async())  # con ficha disponible no espera
+    assert limiter.tokens == pytest.approx(0.0)
+
+
+def test_throttled_halves_rate_and_success_recovers_additively(clock):
+    limiter = RateLimiter(rpm=600, burst=10)
+
+    limiter.on_throttled()
+    assert limiter.status()["rpm"] == 300
+    assert limiter.tokens == 0.0  # la ráfaga se pierde tras un 429
+    limiter.on_throttled()
+    assert limiter.status()["rpm"] == 150
+
+    limiter.on_success()
+    assert limiter.status()["rpm"] == pytest.approx(150 + 600 * rate_limit.RECOVERY_STEP)
+    for _ in range(200):
+        limiter.on_success()
+    assert limiter.status()["rpm"] == 600  # tope: el ritmo configurado
+
+    for _ in range(50):
+        limiter.on_throttled()
+    assert limiter.status()["rpm"] == pytest.approx(600 * rate_limit.MIN_RATE_FRACTION)  # suelo
+
+
+def test_retry_after_blocks_until_it_expires(clock):
+    limiter = RateLimiter(rpm=6000, burst=10)
+    limiter.on_throttled(retry_after=30)
+
+    assert limiter.reserve() == pytest.approx(30.0)
+    clock.advance(20)
+    assert limiter.reserve() == pytest.approx(10.0)
+    clock.advance(10)
+    assert limiter.reserve() == pytest.approx(0.0, abs=0.05)
+
+
+def test_daily_budget(clock):
+    limiter = RateLimiter(rpm=6000, burst=10, daily_limit=2)
+    limiter.reserve()
+    limiter.reserve()
+    with pytest.raises(QuotaExceededError):
+        limiter.reserve()
+    assert limiter.status()["used_today"] == 2
+
+    limiter.day -= timedelta(days=1)  # cambio de día (UTC): el contador vuelve a cero
+    limiter.reserve()
+    assert limiter.status()["used_today"] == 1
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 0.0), ("", 0.0), ("7", 7.0), ("1.5", 1.5), ("-3", 0.0), ("pronto", 0.0),
+])
+def test_retry_after_seconds(value, expected):
+    assert rate_limit.retry_after_seconds(value) == expected
+
+
+def test_retry_after_http_date():
+    future = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert rate_limit.retry_after_seconds(format_datetime(future, usegmt=True)) == pytest.approx(30, abs=2)
+    past = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert rate_limit.retry_after_seconds(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_backoff_delay_is_capped_full_jitter(monkeypatch):
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda lo, hi: hi)  # el peor caso
+    assert [rate_limit.backoff_delay(a, 1, 60) for a in range(8)] == [1, 2, 4, 8, 16, 32, 60, 60]
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda lo, hi: lo)
+    assert rate_limit.backoff_delay(5, 1, 60) == 0
+
+
+def test_retry_wait_prefers_retry_after_and_throttles_on_429(clock, monkeypatch):
+    shared = RateLimiter(rpm=600, burst=10)
+    monkeypatch.setattr(rate_limit, "limiter", shared)
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda lo, hi: hi)
+
+    assert rate_limit.retry_wait(0, 429, "20") == 20
+    assert shared.status()["rpm"] == 300
+    assert rate_limit.retry_wait(3, 503, None) == 8  # un 5xx no baja el ritmo
+    assert shared.status()["rpm"] == 300